@@ -0,0 +1,4 @@
+"""Micro-benchmarks for performance-sensitive pipeline stages.
+
+Run individual benchmarks as modules, e.g. `python -m benchmarks.bench_cleaner`.
+"""
@@ -0,0 +1,265 @@
+"""Chunking benchmark and profile: every chunker over a grid of settings.
+
+Runs each strategy in `chunking.run_chunking.CHUNKER_TYPES` over synthetic
+documents of several sizes (and optionally a real documents file) for every
+`max_tokens`/`overlap` combination, and reports per run:
+
+- seconds (best of `repeat`), chunks/s and documents/s;
+- tokenizer calls per document: `count` calls, texts passed to
+  `count_many`, token-count cache misses, and texts the encoder actually
+  encoded (0 when counting words without tiktoken);
+- tracemalloc peak, plus memory and blocks still allocated after the run
+  (from a separate, traced run);
+- the top cProfile hotspots by own time (from a separate, profiled run).
+
+Usage:
+    python -m benchmarks.bench_chunking [--sizes 1000,20000,200000]
+        [--docs N] [--max-tokens 256,512,1024] [--overlap 0,50]
+        [--chunkers fixed,semantic] [--documents processed/documents.jsonl]
+        [--no-profile] [--output report.json]
+
+Keys are sorted, so reports from two versions can be compared with `diff`.
+"""
+import argparse
+import cProfile
+import inspect
+import json
+import platform
+import pstats
+import random
+import sys
+import time
+import tracemalloc
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from benchmarks.synthetic import make_markdown
+from chunking.base import BaseChunker
+from chunking.run_chunking import CHUNKER_TYPES
+from chunking.sentences import resolve_splitter
+from chunking.tokenizer import TokenCounter
+from common.logger import configure_logger
+from common.records import iter_documents
+from common.schemas import DocumentSchema
+from common.tokenizer import TokenizerService, get_tokenizer
+
+
+class _CountingEncoder:
+    """Proxy of a tiktoken encoding that counts encoded texts."""
+
+    def __init__(self, encoder: Any, stats: Dict[str, int]) -> None:
+        self._encoder = encoder
+        self._stats = stats
+
+    @property
+    def name(self) -> str:
+        return self._encoder.name
+
+    def encode(self, text: str, *args, **kwargs):
+        self._stats["encoded_texts"] += 1
+        return self._encoder.encode(text, *args, **kwargs)
+
+    def encode_ordinary(self, text: str):
+        self._stats["encoded_texts"] += 1
+        return self._encoder.encode_ordinary(text)
+
+    def encode_batch(self, texts: Sequence[str], *args, **kwargs):
+        self._stats["encoded_texts"] += len(texts)
+        return self._encoder.encode_batch(texts, *args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._encoder, name)
+
+
+class CountingService(TokenizerService):
+    """A fresh `TokenizerService` (own cache) that records how it is used."""
+
+    def __init__(self, base: TokenizerService) -> None:
+        super().__init__(base.encoding_name)
+        self.stats = {"count_calls": 0, "count_many_texts": 0, "encoded_texts": 0}
+        encoder = base.encoder
+        self._encoder = _CountingEncoder(encoder, self.stats) if encoder is not None else None
+        self._loaded = True
+
+    def count(self, text: str) -> int:
+        self.stats["count_calls"] += 1
+        return super().count(text)
+
+    def count_many(self, texts: Sequence[str], num_threads: Optional[int] = None) -> List[int]:
+        self.stats["count_many_texts"] += len(texts)
+        return super().count_many(texts, num_threads)
+
+
+def _make_chunker(name: str, max_tokens: int, overlap: Optional[int], service: TokenizerService) -> BaseChunker:
+    kwargs: Dict[str, Any] = {"max_tokens": max_tokens}
+    if overlap is not None:
+        kwargs["overlap"] = overlap
+    chunker = CHUNKER_TYPES[name](**kwargs)
+    counter = TokenCounter(service=service)
+    chunker.tokenizer = counter
+    semantic = getattr(chunker, "_semantic", None)
+    if semantic is not None:
+        semantic.tokenizer = counter
+    return chunker
+
+
+def _takes_overlap(name: str) -> bool:
+    return "overlap" in inspect.signature(CHUNKER_TYPES[name]).parameters
+
+
+def _chunk_all(chunker: BaseChunker, docs: List[DocumentSchema]) -> int:
+    return sum(len(chunker.chunk(doc)) for doc in docs)
+
+
+def _hotspots(profile: cProfile.Profile, top: int) -> List[Dict[str, Any]]:
+    stats = pstats.Stats(profile)
+    rows = []
+    for (filename, line, func), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "function": f"{Path(filename).name}:{line}({func})",
+            "calls": calls,
+            "tottime": round(tottime, 6),
+            "cumtime": round(cumtime, 6),
+        })
+    rows.sort(key=lambda r: r["tottime"], reverse=True)
+    return rows[:top]
+
+
+def bench_one(
+    name: str,
+    docs: List[DocumentSchema],
+    max_tokens: int,
+    overlap: Optional[int],
+    repeat: int = 3,
+    profile: bool = True,
+    top: int = 10,
+) -> Dict[str, Any]:
+    base = get_tokenizer()
+
+    # Timed runs; the tokenizer stats come from the first (cold cache) run.
+    best = float("inf")
+    calls: Dict[str, int] = {}
+    chunks = 0
+    for i in range(repeat):
+        service = CountingService(base)
+        chunker = _make_chunker(name, max_tokens, overlap, service)
+        started = time.perf_counter()
+        chunks = _chunk_all(chunker, docs)
+        best = min(best, time.perf_counter() - started)
+        if i == 0:
+            calls = {**service.stats, "cache_misses": service.misses}
+
+    result: Dict[str, Any] = {
+        "chunker": name,
+        "max_tokens": max_tokens,
+        "overlap": overlap,
+        "seconds": round(best, 6),
+        "chunks": chunks,
+        "chunks_per_sec": round(chunks / best, 1) if best else None,
+        "docs_per_sec": round(len(docs) / best, 2) if best else None,
+        "tokenizer_calls_per_doc": {k: round(v / len(docs), 2) for k, v in calls.items()},
+    }
+
+    chunker = _make_chunker(name, max_tokens, overlap, CountingService(base))
+    tracemalloc.start()
+    _chunk_all(chunker, docs)
+    _, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    result["alloc_peak_kb"] = round(peak / 1024, 1)
+    retained = snapshot.statistics("filename")
+    result["alloc_retained_kb"] = round(sum(stat.size for stat in retained) / 1024, 1)
+    result["alloc_retained_blocks"] = sum(stat.count for stat in retained)
+
+    if profile:
+        chunker = _make_chunker(name, max_tokens, overlap, CountingService(base))
+        profiler = cProfile.Profile()
+        profiler.enable()
+        _chunk_all(chunker, docs)
+        profiler.disable()
+        result["hotspots"] = _hotspots(profiler, top)
+    return result
+
+
+def synthetic_corpora(sizes: Sequence[int], docs: int, seed: int = 0) -> Dict[str, List[DocumentSchema]]:
+    """`docs` synthetic documents of each size (in words), keyed by label."""
+    rng = random.Random(seed)
+    return {
+        f"synthetic_{size}w": [
+            DocumentSchema(content=make_markdown(rng, size), metadata={"source": f"synthetic_{size}_{i}.md"})
+            for i in range(docs)
+        ]
+        for size in sizes
+    }
+
+
+def run(
+    sizes: Sequence[int] = (1_000, 20_000, 200_000),
+    docs: int = 4,
+    max_tokens: Sequence[int] = (256, 512, 1024),
+    overlaps: Sequence[int] = (0, 50),
+    chunkers: Optional[Sequence[str]] = None,
+    documents: Optional[Path] = None,
+    limit: int = 100,
+    repeat: int = 3,
+    profile: bool = True,
+) -> dict:
+    corpora = synthetic_corpora(sizes, docs)
+    if documents is not None:
+        corpora[f"file:{documents.name}"] = list(islice(iter_documents(documents, on_error="skip"), limit))
+
+    encoder = get_tokenizer().encoder
+    report: Dict[str, Any] = {
+        "python": platform.python_version(),
+        "tokenizer": f"tiktoken:{encoder.name}" if encoder is not None else "words",
+        "sentence_splitter": resolve_splitter(),
+        "corpora": {
+            label: {"docs": len(corpus), "chars": sum(len(d.content) for d in corpus)}
+            for label, corpus in corpora.items()
+        },
+        "results": [],
+    }
+    for label, corpus in corpora.items():
+        if not corpus:
+            continue
+        for name in chunkers or CHUNKER_TYPES:
+            for size in max_tokens:
+                for overlap in (overlaps if _takes_overlap(name) else [None]):
+                    result = bench_one(name, corpus, size, overlap, repeat, profile)
+                    report["results"].append({"corpus": label, **result})
+    return report
+
+
+def _ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=_ints, default=[1_000, 20_000, 200_000], help="Synthetic document sizes in words")
+    parser.add_argument("--docs", type=int, default=4, help="Synthetic documents per size")
+    parser.add_argument("--max-tokens", type=_ints, default=[256, 512, 1024])
+    parser.add_argument("--overlap", type=_ints, default=[0, 50])
+    parser.add_argument("--chunkers", type=lambda v: v.split(","), help="Default: every chunker")
+    parser.add_argument("--documents", type=Path, help="Also benchmark documents from this JSONL/EGPR file")
+    parser.add_argument("--limit", type=int, default=100, help="Documents read from --documents")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-profile", dest="profile", action="store_false")
+    parser.add_argument("--output", type=Path, help="Also write the report to this file")
+    args = parser.parse_args()
+
+    # Keep stdout for the JSON report.
+    configure_logger("WARNING", sys.stderr)
+    report = run(
+        args.sizes, args.docs, args.max_tokens, args.overlap, args.chunkers,
+        args.documents, args.limit, args.repeat, args.profile,
+    )
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
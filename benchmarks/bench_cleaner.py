@@ -0,0 +1,78 @@
+"""Micro-benchmark: fused `clean_text` against the original implementation.
+
+Usage:
+    python -m benchmarks.bench_cleaner [--pages N] [--words N] [--repeat N]
+"""
+import argparse
+import json
+import random
+import re
+import timeit
+import unicodedata
+from typing import List, Optional
+
+from ingestion.parsers.cleaner import clean_text, clean_texts
+
+
+def legacy_clean_text(text: Optional[str]) -> str:
+    """The pre-optimization cleaner, kept verbatim as the baseline."""
+    if not text:
+        return ""
+    normalized = unicodedata.normalize("NFC", text)
+    collapsed = re.sub(r"\s+", " ", normalized)
+    collapsed = collapsed.replace("\x00", "")
+    return collapsed.strip()
+
+
+def make_pages(pages: int, words: int, seed: int = 0) -> List[str]:
+    """Synthetic PDF-like pages: ragged whitespace, newlines, rare NULs."""
+    rng = random.Random(seed)
+    vocab = ["policy", "retention", "data", "owner", "shall", "approve", "résumé", "§4.2", "the", "of"]
+    separators = [" ", " ", " ", "  ", "\n", "\t", " \n "]
+    out = []
+    for _ in range(pages):
+        parts = []
+        for _ in range(words):
+            parts.append(rng.choice(vocab))
+            parts.append(rng.choice(separators))
+        if rng.random() < 0.05:
+            parts.insert(rng.randrange(len(parts)), "\x00")
+        out.append("".join(parts))
+    return out
+
+
+def run(pages: int = 200, words: int = 400, repeat: int = 5) -> dict:
+    corpus = make_pages(pages, words)
+
+    mismatches = sum(
+        1 for t in corpus
+        if legacy_clean_text(t.replace("\x00", "")) != clean_text(t.replace("\x00", ""))
+    )
+
+    legacy = min(timeit.repeat(lambda: [legacy_clean_text(t) for t in corpus], number=1, repeat=repeat))
+    fused = min(timeit.repeat(lambda: clean_texts(corpus), number=1, repeat=repeat))
+    chars = sum(len(t) for t in corpus)
+
+    return {
+        "pages": pages,
+        "chars": chars,
+        "legacy_seconds": legacy,
+        "fused_seconds": fused,
+        "legacy_mb_per_sec": chars / legacy / 1e6,
+        "fused_mb_per_sec": chars / fused / 1e6,
+        "speedup": legacy / fused if fused else float("inf"),
+        "mismatches_without_nul": mismatches,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--words", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(args.pages, args.words, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
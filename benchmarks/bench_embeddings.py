@@ -0,0 +1,70 @@
+"""Benchmark: `HuggingFaceEmbedder` per batch size against a plain encode call.
+
+Usage:
+    python -m benchmarks.bench_embeddings [--texts N] [--batch-sizes 16,32,64]
+        [--model all-MiniLM-L6-v2]
+
+Texts mimic chunk output: mostly short with a long tail. The baseline is
+the original `model.encode(texts)` call; each batch-size run reuses the
+same loaded model and is timed both through `embed` (lists of floats) and
+`embed_array` (one float32 array). Needs the SentenceTransformer model (downloaded or cached).
+"""
+import argparse
+import json
+import random
+import time
+from typing import List
+
+from benchmarks.synthetic import make_words
+from embeddings.hf_embedder import HuggingFaceEmbedder
+
+
+def make_texts(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    return [" ".join(make_words(rng, min(400, int(rng.paretovariate(1.2) * 20)))) for _ in range(count)]
+
+
+def run(texts: int = 2000, batch_sizes=(16, 32, 64), model: str = "all-MiniLM-L6-v2") -> dict:
+    corpus = make_texts(texts)
+    embedder = HuggingFaceEmbedder(model)
+    embedder.embed(corpus[:8])  # warm up
+
+    started = time.perf_counter()
+    embedder.model.encode(corpus, convert_to_numpy=True, show_progress_bar=False)
+    baseline = time.perf_counter() - started
+
+    report = {
+        "model": model,
+        "texts": texts,
+        "mean_chars": round(sum(map(len, corpus)) / texts, 1),
+        "baseline": {"seconds": round(baseline, 3), "texts_per_sec": round(texts / baseline, 1)},
+        "batched": {},
+    }
+    for size in batch_sizes:
+        embedder.batch_size = size
+        started = time.perf_counter()
+        embedder.embed(corpus)
+        seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        embedder.embed_array(corpus)
+        array_seconds = time.perf_counter() - started
+        report["batched"][str(size)] = {
+            "seconds": round(seconds, 3),
+            "texts_per_sec": round(texts / seconds, 1),
+            "speedup": round(baseline / seconds, 2),
+            "array_seconds": round(array_seconds, 3),
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--batch-sizes", type=lambda v: [int(x) for x in v.split(",")], default=[16, 32, 64])
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    args = parser.parse_args()
+    print(json.dumps(run(args.texts, args.batch_sizes, args.model), indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Benchmark: single-pass `FixedChunker` against the word-at-a-time original.
+
+Usage:
+    python -m benchmarks.bench_fixed_chunker [--tokens N] [--max-tokens N] [--overlap N]
+
+Without a cached tiktoken encoding (e.g. offline) `TokenCounter` falls back
+to counting words; the report's `tokenizer` field says which one ran.
+"""
+import argparse
+import json
+import random
+import time
+from typing import List
+
+from benchmarks.synthetic import make_words
+from chunking.fixed import FixedChunker
+from chunking.tokenizer import TokenCounter
+from common.schemas import DocumentSchema
+from common.tokenizer import TokenizerService
+
+
+def legacy_chunk(counter: TokenCounter, document: DocumentSchema, max_tokens: int, overlap: int) -> List[DocumentSchema]:
+    """The pre-optimization loop, kept verbatim as the baseline."""
+    words = document.content.split()
+    chunks: List[DocumentSchema] = []
+    n = len(words)
+    start = 0
+    while start < n:
+        end = start + 1
+        while end <= n:
+            candidate = " ".join(words[start:end])
+            token_count = counter.count(candidate)
+            if token_count >= max_tokens or end == n:
+                break
+            end += 1
+        content = " ".join(words[start:end])
+        chunks.append(
+            DocumentSchema(
+                content=content,
+                metadata={**document.metadata, "chunk_type": "fixed", "token_count": counter.count(content)},
+            )
+        )
+        start = max(end - overlap, end if end == start else start + 1)
+    return chunks
+
+
+def make_document(counter: TokenCounter, tokens: int, seed: int = 0) -> DocumentSchema:
+    """A synthetic document of roughly `tokens` tokens."""
+    rng = random.Random(seed)
+    words: List[str] = []
+    while True:
+        words.extend(make_words(rng, 1000))
+        if counter.count(" ".join(words)) >= tokens:
+            break
+    return DocumentSchema(content=" ".join(words), metadata={"source": "synthetic"})
+
+
+def run(tokens: int = 100_000, max_tokens: int = 512, overlap: int = 50, legacy: bool = True) -> dict:
+    chunker = FixedChunker(max_tokens=max_tokens, overlap=overlap)
+    doc = make_document(chunker.tokenizer, tokens)
+    encoder = chunker.tokenizer.service.encoder
+
+    started = time.perf_counter()
+    chunks = chunker.chunk(doc)
+    fast = time.perf_counter() - started
+
+    report = {
+        "tokenizer": f"tiktoken:{encoder.name}" if encoder else "words",
+        "document_tokens": chunker.tokenizer.count(doc.content),
+        "max_tokens": max_tokens,
+        "overlap": overlap,
+        "chunks": len(chunks),
+        "seconds": fast,
+    }
+    if legacy:
+        started = time.perf_counter()
+        # The original counter had no cache.
+        service = TokenizerService(chunker.tokenizer.service.encoding_name, cache_size=0, encoder=encoder)
+        expected = legacy_chunk(TokenCounter(service=service), doc, max_tokens, overlap)
+        slow = time.perf_counter() - started
+        report.update(
+            legacy_seconds=slow,
+            speedup=slow / fast if fast else float("inf"),
+            identical=[(c.content, c.metadata) for c in chunks] == [(c.content, c.metadata) for c in expected],
+        )
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=100_000)
+    parser.add_argument("--max-tokens", type=int, default=512)
+    parser.add_argument("--overlap", type=int, default=50)
+    parser.add_argument("--no-legacy", dest="legacy", action="store_false", help="Skip the slow baseline")
+    args = parser.parse_args()
+    print(json.dumps(run(args.tokens, args.max_tokens, args.overlap, args.legacy), indent=2))
+
+
+if __name__ == "__main__":
+    main()
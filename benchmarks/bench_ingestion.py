@@ -0,0 +1,171 @@
+"""Ingestion throughput benchmark, stage by stage, on a synthetic corpus.
+
+Generates PDFs and text files locally, then times each stage of
+`ingestion.run_ingestion` in isolation (load, clean, enrich, serialize)
+followed by an end-to-end `ingest()`. The JSON report has stable keys so
+runs from two versions can be diffed directly.
+
+Usage:
+    python -m benchmarks.bench_ingestion [--pdfs N] [--pages-per-pdf N]
+        [--texts N] [--text-kb N] [--workers N] [--output report.json]
+
+`peak_rss_mb` is the process high-water mark after the stage, so it only
+grows; a stage that raises it is the one that allocated the memory. For
+`ingest` with workers, `children_peak_rss_mb` covers the pool processes.
+"""
+import argparse
+import io
+import json
+import platform
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.synthetic import make_corpus
+from common.logger import configure_logger
+from common.records import RecordWriter
+from common.schemas import DocumentSchema
+from ingestion import run_ingestion
+from ingestion.loaders.pdf_loader import iter_pdf
+from ingestion.loaders.text_loader import iter_text
+from ingestion.metadata.enrich import enrich_metadata
+from ingestion.parsers.cleaner import clean_texts
+
+
+def _rss_mb(who: int = resource.RUSAGE_SELF) -> float:
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _stage(fn: Callable[[], Optional[int]], pages: int, nbytes: int, repeat: int = 1) -> Dict[str, float]:
+    """Time `fn` (best of `repeat`) and derive throughput for `pages`/`nbytes` of input."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return {
+        "seconds": round(best, 6),
+        "pages": pages,
+        "mb": round(nbytes / 1e6, 3),
+        "pages_per_sec": round(pages / best, 1) if best else None,
+        "mb_per_sec": round(nbytes / 1e6 / best, 3) if best else None,
+        "peak_rss_mb": round(_rss_mb(), 1),
+    }
+
+
+def _load(paths: List[Path]) -> List[DocumentSchema]:
+    docs: List[DocumentSchema] = []
+    for path in paths:
+        loader = iter_pdf if path.suffix.lower() in run_ingestion.PDF_SUFFIXES else iter_text
+        docs.extend(loader(path))
+    return docs
+
+
+def _serialize(docs: List[DocumentSchema], fmt: str) -> int:
+    buf = io.BytesIO()
+    writer = RecordWriter(buf, fmt)
+    for doc in docs:
+        writer.write(doc)
+    writer.flush()
+    return buf.tell()
+
+
+def _ingest(raw: Path, out: Path, workers: int) -> None:
+    saved = run_ingestion.RAW_DIR, run_ingestion.OUT_DIR
+    run_ingestion.RAW_DIR, run_ingestion.OUT_DIR = raw, out
+    try:
+        run_ingestion.ingest(workers=workers, resume=False)
+    finally:
+        run_ingestion.RAW_DIR, run_ingestion.OUT_DIR = saved
+
+
+def run(
+    pdfs: int = 4,
+    pages_per_pdf: int = 50,
+    texts: int = 20,
+    text_kb: int = 64,
+    words_per_page: int = 400,
+    workers: int = 1,
+    repeat: int = 3,
+) -> dict:
+    with tempfile.TemporaryDirectory(prefix="bench_ingestion_") as tmp:
+        raw = Path(tmp) / "raw"
+        paths = make_corpus(raw, pdfs, pages_per_pdf, texts, text_kb, words_per_page)
+        input_bytes = sum(p.stat().st_size for p in paths)
+
+        stages: Dict[str, dict] = {}
+        docs: List[DocumentSchema] = []
+
+        def load() -> None:
+            docs[:] = _load(paths)
+
+        stages["load"] = _stage(load, pdfs * pages_per_pdf + texts, input_bytes)
+        pages = len(docs)
+        text_bytes = sum(len(d.content.encode("utf-8")) for d in docs)
+        raw_texts = [d.content for d in docs]
+
+        stages["clean"] = _stage(lambda: clean_texts(raw_texts), pages, text_bytes, repeat)
+        for doc, text in zip(docs, clean_texts(raw_texts)):
+            doc.content = text
+
+        def enrich() -> None:
+            for doc in docs:
+                doc.metadata = enrich_metadata(doc.metadata)
+
+        stages["enrich"] = _stage(enrich, pages, text_bytes, repeat)
+        for fmt in ("jsonl", "egpr"):
+            stages[f"serialize_{fmt}"] = _stage(lambda: _serialize(docs, fmt), pages, text_bytes, repeat)
+            stages[f"serialize_{fmt}"]["output_mb"] = round(_serialize(docs, fmt) / 1e6, 3)
+
+        stages["ingest"] = _stage(
+            lambda: _ingest(raw, Path(tmp) / "processed", workers), pages, input_bytes
+        )
+        stages["ingest"]["children_peak_rss_mb"] = round(_rss_mb(resource.RUSAGE_CHILDREN), 1)
+
+    return {
+        "python": platform.python_version(),
+        "corpus": {
+            "pdfs": pdfs,
+            "pages_per_pdf": pages_per_pdf,
+            "texts": texts,
+            "text_kb": text_kb,
+            "words_per_page": words_per_page,
+            "documents": pages,
+            "input_mb": round(input_bytes / 1e6, 3),
+        },
+        "workers": workers,
+        "stages": stages,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pdfs", type=int, default=4)
+    parser.add_argument("--pages-per-pdf", type=int, default=50)
+    parser.add_argument("--texts", type=int, default=20)
+    parser.add_argument("--text-kb", type=int, default=64)
+    parser.add_argument("--words-per-page", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="Also write the report to this file")
+    args = parser.parse_args()
+
+    # Keep stdout for the JSON report.
+    configure_logger("WARNING", sys.stderr)
+    report = run(
+        args.pdfs, args.pages_per_pdf, args.texts, args.text_kb,
+        args.words_per_page, args.workers, args.repeat,
+    )
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
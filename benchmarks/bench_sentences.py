@@ -0,0 +1,99 @@
+"""Benchmark: built-in rule sentence splitter against NLTK punkt.
+
+Usage:
+    python -m benchmarks.bench_sentences [--docs N] [--sentences N] [--repeat N]
+
+Reports the throughput of each splitter and, when punkt data is installed,
+how well the rules agree with it (precision/recall of sentence end offsets,
+with punkt as the reference). Without punkt only the rules are timed.
+"""
+import argparse
+import json
+import random
+import time
+from typing import Callable, Dict, List, Set
+
+from benchmarks.synthetic import make_words
+from chunking.sentences import Span, punkt_available, punkt_spans, rule_spans
+
+_OPENERS = ["Dr. Smith", "The policy", "Section 4.2", "Mr. Jones", "Records", "Approx. 3.5 days", "J. Doe"]
+_ENDINGS = [".", ".", ".", "!", "?", "...", " (see Fig. 2).", ', e.g. audits.', ' etc.', '."']
+
+
+def make_text(rng: random.Random, sentences: int) -> str:
+    """Policy-like prose with abbreviations, decimals and numbered lists."""
+    parts: List[str] = []
+    for i in range(sentences):
+        if rng.random() < 0.1:
+            parts.append(f"\n{rng.randint(1, 9)}. ")
+        body = " ".join(make_words(rng, rng.randint(4, 18)))
+        parts.append(f"{rng.choice(_OPENERS)} {body}{rng.choice(_ENDINGS)} ")
+    return "".join(parts)
+
+
+def _ends(spans: List[Span]) -> Set[int]:
+    return {end for _, end in spans}
+
+
+def _time(split: Callable[[str], List[Span]], texts: List[str], repeat: int) -> Dict[str, float]:
+    best = float("inf")
+    sentences = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        sentences = sum(len(split(t)) for t in texts)
+        best = min(best, time.perf_counter() - started)
+    chars = sum(len(t) for t in texts)
+    return {
+        "seconds": best,
+        "sentences": sentences,
+        "mb_per_s": chars / 1e6 / best if best else float("inf"),
+    }
+
+
+def run(docs: int = 200, sentences: int = 100, repeat: int = 3, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    texts = [make_text(rng, sentences) for _ in range(docs)]
+
+    started = time.perf_counter()
+    rule_spans("Warm up. Done.")
+    report = {
+        "docs": docs,
+        "chars": sum(len(t) for t in texts),
+        "rules": {"first_call_seconds": time.perf_counter() - started, **_time(rule_spans, texts, repeat)},
+    }
+
+    started = time.perf_counter()
+    if not punkt_available():
+        report["punkt"] = "unavailable"
+        return report
+    punkt_spans("Warm up. Done.")
+    report["punkt"] = {"first_call_seconds": time.perf_counter() - started, **_time(punkt_spans, texts, repeat)}
+    report["speedup"] = report["punkt"]["seconds"] / report["rules"]["seconds"]
+
+    tp = fp = fn = 0
+    for text in texts:
+        ours, reference = _ends(rule_spans(text)), _ends(punkt_spans(text))
+        tp += len(ours & reference)
+        fp += len(ours - reference)
+        fn += len(reference - ours)
+    precision = tp / (tp + fp) if tp + fp else 1.0
+    recall = tp / (tp + fn) if tp + fn else 1.0
+    report["agreement"] = {
+        "precision": precision,
+        "recall": recall,
+        "f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+    }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--sentences", type=int, default=100, help="Sentences per document")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps(run(args.docs, args.sentences, args.repeat), indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
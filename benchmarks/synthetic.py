@@ -0,0 +1,102 @@
+"""Synthetic source files for benchmarks: plain text and minimal PDFs."""
+import random
+from pathlib import Path
+from typing import List, Sequence
+
+VOCAB = [
+    "policy", "retention", "data", "owner", "shall", "approve", "records", "access",
+    "review", "the", "of", "and", "to", "quarterly", "audit", "controls", "section",
+    "4.2", "exception", "risk", "register", "incident", "report", "within", "days",
+]
+
+
+def make_words(rng: random.Random, count: int) -> List[str]:
+    return [rng.choice(VOCAB) for _ in range(count)]
+
+
+def make_page(rng: random.Random, words: int, line_words: int = 12) -> List[str]:
+    """One page of text as lines of roughly `line_words` words."""
+    tokens = make_words(rng, words)
+    return [" ".join(tokens[i:i + line_words]) for i in range(0, len(tokens), line_words)]
+
+
+def make_markdown(rng: random.Random, words: int, section_words: int = 300) -> str:
+    """Markdown-ish prose of about `words` words: headed sections of sentences."""
+    parts: List[str] = []
+    written = 0
+    while written < words:
+        parts.append(f"\n## Section {len(parts) + 1}\n")
+        in_section = 0
+        while in_section < section_words and written < words:
+            n = rng.randint(5, 25)
+            sentence = " ".join(make_words(rng, n))
+            parts.append(sentence[0].upper() + sentence[1:] + rng.choice([". ", ". ", "? ", "! "]))
+            in_section += n
+            written += n
+    return "".join(parts).strip()
+
+
+def write_pdf(path: Path, pages: Sequence[Sequence[str]]) -> Path:
+    """Write a minimal uncompressed Helvetica PDF, one list of lines per page.
+
+    Lines must not contain parentheses or backslashes.
+    """
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # pages tree, filled in below
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for lines in pages:
+        body = " T* ".join(f"({line}) Tj" for line in lines)
+        stream = f"BT /F1 10 Tf 12 TL 50 750 Td {body} ET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (i, obj)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for off in offsets:
+        out += b"%010d 00000 n \n" % off
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(bytes(out))
+    return path
+
+
+def make_corpus(
+    root: Path,
+    pdfs: int = 4,
+    pages_per_pdf: int = 50,
+    texts: int = 20,
+    text_kb: int = 64,
+    words_per_page: int = 400,
+    seed: int = 0,
+) -> List[Path]:
+    """Write `pdfs` PDFs and `texts` text files under `root`; returns their paths."""
+    rng = random.Random(seed)
+    root.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(pdfs):
+        pages = [make_page(rng, words_per_page) for _ in range(pages_per_pdf)]
+        paths.append(write_pdf(root / f"synthetic_{i:04d}.pdf", pages))
+    for i in range(texts):
+        lines = []
+        size = 0
+        while size < text_kb * 1024:
+            line = "  ".join(make_page(rng, 40)) + "\n"
+            lines.append(line)
+            size += len(line)
+        path = root / f"synthetic_{i:04d}.txt"
+        path.write_text("".join(lines), encoding="utf-8")
+        paths.append(path)
+    return sorted(paths)
@@ -1,12 +1,19 @@
 """Chunking package exports for convenience."""
 
+from .analysis import DocumentAnalysis
 from .base import BaseChunker
+from .engine import ChunkingEngine
 from .fixed import FixedChunker
 from .semantic import SemanticChunker
+from .spans import ChunkResolver, ChunkSpan
 from .structural import StructuralChunker
 
 __all__ = [
 	"BaseChunker",
+	"ChunkResolver",
+	"ChunkSpan",
+	"ChunkingEngine",
+	"DocumentAnalysis",
 	"FixedChunker",
 	"SemanticChunker",
 	"StructuralChunker",
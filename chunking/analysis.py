@@ -0,0 +1,136 @@
+"""Per-document text analysis shared by the chunking strategies.
+
+Every strategy needs some of the same facts about a document: its words
+and their token counts, its sentences, its Markdown sections. A
+`DocumentAnalysis` computes each of them at most once, on first use, so
+running several strategies over one document splits and tokenizes it
+once instead of once per strategy.
+"""
+
+from __future__ import annotations
+
+import re
+from functools import cached_property
+from typing import Dict, List, Optional, Tuple
+
+from chunking.sentences import resolve_splitter, sentence_spans
+from chunking.tokenizer import TokenCounter
+from common.schemas import DocumentSchema
+
+
+Span = Tuple[int, int]
+
+HEADER = re.compile(r"\n#{1,6}\s+")
+
+
+def _stripped(text: str, start: int, end: int) -> Span:
+    """Shrink `[start, end)` so it excludes surrounding whitespace."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _split_spans(text: str, separator: re.Pattern) -> List[Span]:
+    """Spans of the pieces of ``separator.split(text)``."""
+    spans = []
+    pos = 0
+    for match in separator.finditer(text):
+        spans.append((pos, match.start()))
+        pos = match.end()
+    spans.append((pos, len(text)))
+    return spans
+
+
+def section_spans(text: str) -> List[Span]:
+    """Spans of the non-blank pieces of `text` split on Markdown headers."""
+    return [(s, e) for s, e in _split_spans(text, HEADER) if text[s:e].strip()]
+
+
+class DocumentAnalysis:
+    """Lazily computed words, sentences, sections and token counts of a document.
+
+    Args:
+        document: the document to analyse.
+        tokenizer: counter shared by every strategy using this analysis.
+        sentence_splitter: name of the splitter behind the sentence
+            properties (see `chunking.sentences`); defaults to
+            `settings.SENTENCE_SPLITTER`.
+    """
+
+    def __init__(
+        self,
+        document: DocumentSchema,
+        tokenizer: TokenCounter,
+        sentence_splitter: Optional[str] = None,
+    ) -> None:
+        self.document = document
+        self.text = document.content
+        self.tokenizer = tokenizer
+        self.sentence_splitter = resolve_splitter(sentence_splitter)
+        self._siblings: Dict[str, DocumentAnalysis] = {self.sentence_splitter: self}
+
+    def for_splitter(self, sentence_splitter: Optional[str]) -> "DocumentAnalysis":
+        """This analysis with sentences from `sentence_splitter`.
+
+        Returns `self` when the splitter is the same; otherwise an analysis
+        of the same document that shares words and sections with this one.
+        """
+        name = resolve_splitter(sentence_splitter)
+        sibling = self._siblings.get(name)
+        if sibling is None:
+            sibling = DocumentAnalysis(self.document, self.tokenizer, name)
+            for shared in ("words", "word_segments", "section_spans", "sections", "section_counts"):
+                if shared in self.__dict__:
+                    sibling.__dict__[shared] = self.__dict__[shared]
+            sibling._siblings = self._siblings
+            self._siblings[name] = sibling
+        return sibling
+
+    @cached_property
+    def words(self) -> List[str]:
+        return self.text.split()
+
+    @cached_property
+    def word_segments(self) -> List[int]:
+        """`TokenCounter.segment_counts` of `words` (one encoding pass)."""
+        return self.tokenizer.segment_counts(self.words)
+
+    @cached_property
+    def sentence_spans(self) -> List[Span]:
+        return sentence_spans(self.text, self.sentence_splitter)
+
+    @cached_property
+    def sentences(self) -> List[str]:
+        return [self.text[s:e] for s, e in self.sentence_spans]
+
+    @cached_property
+    def sentence_counts(self) -> List[int]:
+        return self.tokenizer.count_many(self.sentences)
+
+    @cached_property
+    def section_spans(self) -> List[Span]:
+        return section_spans(self.text)
+
+    @cached_property
+    def sections(self) -> List[str]:
+        return [self.text[s:e] for s, e in self.section_spans]
+
+    @cached_property
+    def section_counts(self) -> List[int]:
+        return self.tokenizer.count_many(self.sections)
+
+    def sentences_in(self, span: Span) -> List[str]:
+        """The document's sentences clipped to `span`, stripped, non-empty."""
+        start, end = span
+        out = []
+        for s, e in self.sentence_spans:
+            if e <= start:
+                continue
+            if s >= end:
+                break
+            s, e = _stripped(self.text, max(s, start), min(e, end))
+            if s < e:
+                out.append(self.text[s:e])
+        return out
@@ -1,8 +1,20 @@
+from __future__ import annotations
+
+import json
 from abc import ABC, abstractmethod
-from typing import List
+from typing import TYPE_CHECKING, Any, Dict, List
 
 from common.schemas import DocumentSchema
 
+if TYPE_CHECKING:
+    from chunking.analysis import DocumentAnalysis
+
+
+# Bump when a chunking algorithm changes its output for the same parameters,
+# so cached chunks from older versions are not reused.
+# 2: sentence-based chunkers default to the built-in "rules" splitter.
+CHUNKER_CACHE_VERSION = 2
+
 
 class BaseChunker(ABC):
     """Abstract base class for document chunkers.
@@ -19,3 +31,32 @@ class BaseChunker(ABC):
             List[DocumentSchema]: list of chunk documents.
         """
         raise NotImplementedError
+
+    def chunk_analysis(self, analysis: "DocumentAnalysis") -> List[DocumentSchema]:
+        """Chunk a document from a shared `DocumentAnalysis`.
+
+        Strategies that can reuse the analysis override this; the default
+        simply chunks the underlying document.
+        """
+        return self.chunk(analysis.document)
+
+    def cache_params(self) -> Dict[str, Any]:
+        """Everything besides the text that determines this chunker's output.
+
+        Defaults to the public scalar attributes (e.g. ``max_tokens``) plus
+        the tokenizer in use; override to add hidden dependencies.
+        """
+        params: Dict[str, Any] = {
+            k: v for k, v in vars(self).items()
+            if not k.startswith("_") and isinstance(v, (bool, int, float, str))
+        }
+        tokenizer = getattr(self, "tokenizer", None)
+        if tokenizer is not None and hasattr(tokenizer, "fingerprint"):
+            params["tokenizer"] = tokenizer.fingerprint()
+        return params
+
+    def cache_key(self) -> str:
+        """Stable identifier of this chunker class and configuration."""
+        cls = type(self)
+        params = json.dumps(self.cache_params(), sort_keys=True)
+        return f"{cls.__module__}.{cls.__qualname__}/v{CHUNKER_CACHE_VERSION}:{params}"
@@ -0,0 +1,177 @@
+"""Persistent cache of chunker output.
+
+Entries are keyed by (document content hash, chunker cache key), where the
+chunker key names the class and its parameters (see
+`BaseChunker.cache_key`). Re-running chunking after re-ingestion or a
+parameter change only recomputes (document, strategy) pairs whose key is
+new.
+
+Only what a chunker adds is stored: the chunk text, id and the metadata
+entries that differ from the parent document's. The parent's current
+metadata (e.g. a fresh ``ingested_at``) is merged back in on read, so the
+cache is valid across re-ingestion of unchanged text.
+
+The cache is a SQLite database in WAL mode, so several chunking worker
+processes can read and write it at once. Writes and recency updates are
+buffered and committed together by `flush()` (the engine flushes once per
+document, and every `commit_every` puts flush on their own); each flush
+evicts the least recently used entries beyond `max_entries`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from common.config import settings
+from common.logger import logger
+from common.schemas import DocumentSchema
+
+
+def content_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+
+class ChunkCache:
+    """SQLite-backed LRU store of chunks per (document hash, chunker key).
+
+    Args:
+        path: database file.
+        max_entries: (document, chunker) entries kept before the least
+            recently used are evicted; defaults to
+            `settings.CHUNK_CACHE_MAX_ENTRIES`.
+        commit_every: buffered puts that trigger a flush.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        timeout: float = 60.0,
+        max_entries: Optional[int] = None,
+        commit_every: int = 64,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max(1, int(max_entries or settings.CHUNK_CACHE_MAX_ENTRIES))
+        self.commit_every = max(1, int(commit_every))
+        self.hits = 0
+        self.misses = 0
+        self._pending: Dict[Tuple[str, str], bytes] = {}
+        self._touched: Dict[Tuple[str, str], None] = {}
+        self._conn = sqlite3.connect(str(self.path), timeout=timeout)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            " doc_hash TEXT NOT NULL,"
+            " chunker TEXT NOT NULL,"
+            " payload BLOB NOT NULL,"
+            " last_used INTEGER NOT NULL DEFAULT 0,"
+            " PRIMARY KEY (doc_hash, chunker))"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(chunks)")}
+        if "last_used" not in columns:
+            # Caches written before eviction existed.
+            self._conn.execute("ALTER TABLE chunks ADD COLUMN last_used INTEGER NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS chunks_lru ON chunks (last_used)")
+        self._conn.commit()
+        self._tick, self._count = self._conn.execute(
+            "SELECT COALESCE(MAX(last_used), 0), COUNT(*) FROM chunks"
+        ).fetchone()
+
+    def get(self, document: DocumentSchema, chunker_key: str, doc_hash: Optional[str] = None) -> Optional[List[DocumentSchema]]:
+        """Return the cached chunks of `document`, or `None` on a miss."""
+        key = (doc_hash or content_hash(document.content), chunker_key)
+        payload = self._pending.get(key)
+        if payload is None:
+            row = self._conn.execute(
+                "SELECT payload FROM chunks WHERE doc_hash = ? AND chunker = ?", key
+            ).fetchone()
+            payload = row[0] if row is not None else None
+        if payload is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touched[key] = None
+        return [
+            DocumentSchema(content=content, metadata={**document.metadata, **extra}, id=chunk_id)
+            for content, extra, chunk_id in json.loads(zlib.decompress(payload))
+        ]
+
+    def put(
+        self,
+        document: DocumentSchema,
+        chunker_key: str,
+        chunks: List[DocumentSchema],
+        doc_hash: Optional[str] = None,
+    ) -> None:
+        """Buffer `chunks` for `document`; stored by the next `flush()`."""
+        parent = document.metadata
+        rows = [
+            [c.content, _metadata_delta(parent, c.metadata), c.id]
+            for c in chunks
+        ]
+        payload = zlib.compress(json.dumps(rows, ensure_ascii=False).encode("utf-8"))
+        self._pending[(doc_hash or content_hash(document.content), chunker_key)] = payload
+        if len(self._pending) >= self.commit_every:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered entries and recency updates in one transaction,
+        then evict beyond `max_entries`."""
+        if not self._pending and not self._touched:
+            return
+        self._tick += 1
+        with self._conn:
+            if self._touched:
+                self._conn.executemany(
+                    "UPDATE chunks SET last_used = ? WHERE doc_hash = ? AND chunker = ?",
+                    [(self._tick, *key) for key in self._touched if key not in self._pending],
+                )
+            if self._pending:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO chunks (doc_hash, chunker, payload, last_used) VALUES (?, ?, ?, ?)",
+                    [(*key, payload, self._tick) for key, payload in self._pending.items()],
+                )
+        self._count += len(self._pending)
+        self._pending.clear()
+        self._touched.clear()
+        if self._count > self.max_entries:
+            self._evict()
+
+    def _evict(self) -> None:
+        # Other processes write too, so recount before deleting.
+        self._count = len(self)
+        excess = self._count - self.max_entries
+        if excess <= 0:
+            return
+        with self._conn:
+            self._conn.execute(
+                "DELETE FROM chunks WHERE rowid IN (SELECT rowid FROM chunks ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+        self._count -= excess
+        logger.debug("Evicted {} cached chunk entries", excess)
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def clear(self) -> None:
+        self._pending.clear()
+        self._touched.clear()
+        self._conn.execute("DELETE FROM chunks")
+        self._conn.commit()
+        self._count = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
+
+
+def _metadata_delta(parent: Dict[str, Any], metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Entries of a chunk's `metadata` that it does not inherit from `parent`."""
+    return {k: v for k, v in metadata.items() if k not in parent or parent[k] != v}
@@ -0,0 +1,57 @@
+from typing import Dict, List, Optional
+
+from chunking.analysis import DocumentAnalysis
+from chunking.base import BaseChunker
+from chunking.cache import ChunkCache, content_hash
+from chunking.tokenizer import TokenCounter
+from common.schemas import DocumentSchema
+
+
+class ChunkingEngine:
+    """Run several chunking strategies over one shared analysis per document.
+
+    Sentence boundaries, header offsets and token counts are computed once
+    per document (see `DocumentAnalysis`) and every strategy derives its
+    chunks from them. Output order is strategy order, as when calling each
+    chunker's `chunk()` in turn.
+
+    With a `cache`, (document, strategy) pairs chunked before with the same
+    text and chunker configuration are served from it, and the analysis is
+    only computed for the strategies that miss.
+    """
+
+    def __init__(
+        self,
+        chunkers: Dict[str, BaseChunker],
+        tokenizer: Optional[TokenCounter] = None,
+        cache: Optional[ChunkCache] = None,
+    ) -> None:
+        self.chunkers = dict(chunkers)
+        self.tokenizer = tokenizer or TokenCounter()
+        self.cache = cache
+        self._cache_keys: Dict[str, str] = {}
+
+    def analyse(self, document: DocumentSchema) -> DocumentAnalysis:
+        return DocumentAnalysis(document, self.tokenizer)
+
+    def chunk(self, document: DocumentSchema) -> List[DocumentSchema]:
+        analysis = self.analyse(document)
+        chunks: List[DocumentSchema] = []
+        if self.cache is None:
+            for chunker in self.chunkers.values():
+                chunks.extend(chunker.chunk_analysis(analysis))
+            return chunks
+
+        doc_hash = content_hash(document.content)
+        for name, chunker in self.chunkers.items():
+            key = self._cache_keys.get(name)
+            if key is None:
+                key = self._cache_keys[name] = chunker.cache_key()
+            cached = self.cache.get(document, key, doc_hash)
+            if cached is None:
+                cached = chunker.chunk_analysis(analysis)
+                self.cache.put(document, key, cached, doc_hash)
+            chunks.extend(cached)
+        # One commit per document rather than per strategy.
+        self.cache.flush()
+        return chunks
@@ -1,6 +1,9 @@
+from bisect import bisect_left
+from itertools import accumulate
 from typing import List
 from pathlib import Path
 
+from chunking.analysis import DocumentAnalysis
 from chunking.base import BaseChunker
 from common.schemas import DocumentSchema
 from chunking.tokenizer import TokenCounter
@@ -11,6 +14,9 @@ class FixedChunker(BaseChunker):
 
     This implementation measures chunk size using `TokenCounter` so the
     `max_tokens` parameter refers to token counts rather than raw words.
+    Chunks end on word boundaries: each one is the shortest run of words
+    reaching `max_tokens`, and the next starts `overlap` words earlier.
+    The document is tokenized once, so chunking is O(n log n).
     """
 
     def __init__(self, max_tokens: int = 512, overlap: int = 50) -> None:
@@ -19,21 +25,30 @@ class FixedChunker(BaseChunker):
         self.tokenizer = TokenCounter()
 
     def chunk(self, document: DocumentSchema) -> List[DocumentSchema]:
-        words = document.content.split()
+        return self.chunk_analysis(DocumentAnalysis(document, self.tokenizer))
+
+    def chunk_analysis(self, analysis: DocumentAnalysis) -> List[DocumentSchema]:
+        document = analysis.document
+        words = analysis.words
         chunks: List[DocumentSchema] = []
 
         n = len(words)
-        start = 0
+        if n == 0:
+            return chunks
 
+        # One encoding pass: prefix[i] is the token count of words[1:i]
+        # joined with their leading spaces, so a window's count is
+        # count(words[start]) + prefix[end] - prefix[start + 1].
+        segments = analysis.word_segments
+        prefix = [0, 0] + list(accumulate(segments[1:]))
+
+        start = 0
         while start < n:
-            # Find the smallest `end` such that token_count >= max_tokens or end==n
-            end = start + 1
-            while end <= n:
-                candidate = " ".join(words[start:end])
-                token_count = self.tokenizer.count(candidate)
-                if token_count >= self.max_tokens or end == n:
-                    break
-                end += 1
+            # Smallest `end` such that token_count >= max_tokens or end == n
+            head = self.tokenizer.count(words[start])
+            target = self.max_tokens - head + prefix[start + 1]
+            end = min(bisect_left(prefix, target, start + 1, n + 1), n)
+            token_count = head + prefix[end] - prefix[start + 1]
 
             content = " ".join(words[start:end])
             chunks.append(
@@ -42,12 +57,12 @@ class FixedChunker(BaseChunker):
                     metadata={
                         **document.metadata,
                         "chunk_type": "fixed",
-                        "token_count": self.tokenizer.count(content),
+                        "token_count": token_count,
                     },
                 )
             )
 
             # Advance start with overlap; ensure progress
-            start = max(end - self.overlap, end if end == start else start + 1)
+            start = max(end - self.overlap, start + 1)
 
         return chunks
@@ -1,69 +1,203 @@
 from __future__ import annotations
 
+import shutil
+from itertools import islice
 from pathlib import Path
-from typing import Iterable, Dict
+from typing import Dict, Iterable, Iterator, List, Optional
 
 from tqdm import tqdm
 
 from common.config import settings
 from common.logger import logger
+from common.parallel import ordered_map
+from common.records import iter_records, open_writer, records_path
 from common.schemas import DocumentSchema
+from common.shards import ShardedWriter, shard_dir, spans_path
 
+from chunking.cache import ChunkCache
+from chunking.engine import ChunkingEngine
 from chunking.fixed import FixedChunker
 from chunking.semantic import SemanticChunker
+from chunking.spans import ChunkSpan, to_spans, write_spans
 from chunking.structural import StructuralChunker
 
 
-INPUT = settings.DATA_DIR / "processed" / "documents.jsonl"
-OUTPUT = settings.DATA_DIR / "processed" / "chunks.jsonl"
-
-
-def _serialize_doc(doc: DocumentSchema) -> str:
-    # Compatible with both Pydantic v1 and v2
-    if hasattr(doc, "model_dump_json"):
-        return doc.model_dump_json()
-    return doc.model_dump_json()
+INPUT = records_path(settings.DATA_DIR / "processed" / "documents.jsonl")
+OUTPUT = records_path(settings.DATA_DIR / "processed" / "chunks.jsonl")
+SPANS_OUTPUT = spans_path(OUTPUT)
+CACHE_PATH = settings.DATA_DIR / "cache" / "chunks.sqlite"
 
 
 def load_docs(path: Path) -> Iterable[DocumentSchema]:
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            try:
-                yield DocumentSchema.model_validate_json(line)
-            except Exception:
-                logger.exception("Failed to parse document line; skipping")
-
-
-def run(selected: Dict[str, bool] | None = None) -> None:
+    """Yield documents from a JSON lines or EGPR file, skipping bad records."""
+    for record in iter_records(path, on_error="skip"):
+        try:
+            yield DocumentSchema(**record)
+        except Exception:
+            logger.exception("Failed to parse document record; skipping")
+
+
+CHUNKER_TYPES = {
+    "fixed": FixedChunker,
+    "semantic": SemanticChunker,
+    "structural": StructuralChunker,
+}
+
+# Engine of the current process, built once by `_init_engine` (in each
+# pool worker when chunking in parallel).
+_engine: Optional[ChunkingEngine] = None
+_as_spans = False
+
+
+def build_engine(
+    selected: Dict[str, bool] | None = None,
+    params: Dict[str, dict] | None = None,
+    cache_path: Optional[Path] = None,
+) -> ChunkingEngine:
+    """A `ChunkingEngine` with every chunker not disabled in `selected`.
+
+    `params` maps chunker names to constructor arguments; with
+    `cache_path` chunks are reused from (and stored in) a `ChunkCache`.
+    """
+    selected = selected or {}
+    params = params or {}
+    return ChunkingEngine(
+        {
+            name: cls(**params.get(name, {}))
+            for name, cls in CHUNKER_TYPES.items()
+            if selected.get(name, True)
+        },
+        cache=ChunkCache(cache_path) if cache_path is not None else None,
+    )
+
+
+def _init_engine(
+    selected: Dict[str, bool],
+    params: Dict[str, dict],
+    cache_path: Optional[Path],
+    as_spans: bool = False,
+) -> None:
+    global _engine, _as_spans
+    _engine = build_engine(selected, params, cache_path)
+    _as_spans = as_spans
+
+
+def _chunk_batch(docs: List[DocumentSchema]) -> List[DocumentSchema] | List[ChunkSpan]:
+    """Chunk `docs` with every enabled chunker, in document then chunker order."""
+    out: list = []
+    for doc in docs:
+        chunks = _engine.chunk(doc)
+        out.extend(to_spans(doc, chunks) if _as_spans else chunks)
+    return out
+
+
+def _batched(items: Iterable[DocumentSchema], size: int) -> Iterator[List[DocumentSchema]]:
+    it = iter(items)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def chunk_documents(
+    docs: Iterable[DocumentSchema],
+    selected: Dict[str, bool] | None = None,
+    workers: Optional[int] = None,
+    batch_size: int = 8,
+    params: Dict[str, dict] | None = None,
+    cache_path: Optional[Path] = None,
+    as_spans: bool = False,
+) -> Iterator[DocumentSchema] | Iterator[ChunkSpan]:
+    """Yield the chunks of `docs`, streaming them through a process pool.
+
+    Documents are sent to `workers` processes (default
+    `settings.CHUNK_WORKERS`) in batches of `batch_size`; each worker builds
+    its chunking engine once, and each document is analysed once for all
+    enabled strategies. Chunks come back in the same order as a serial run.
+    `params` and `cache_path` are passed to `build_engine`. With
+    `as_spans` each chunk is yielded as a `ChunkSpan` into its document.
+    """
+    workers = settings.CHUNK_WORKERS if workers is None else workers
+    selected = dict(selected or {})
+    batches = ordered_map(
+        _chunk_batch,
+        _batched(docs, max(1, batch_size)),
+        workers=workers,
+        initializer=_init_engine,
+        initargs=(selected, dict(params or {}), cache_path, as_spans),
+    )
+    for chunks in batches:
+        yield from chunks
+
+
+def run(
+    selected: Dict[str, bool] | None = None,
+    workers: Optional[int] = None,
+    params: Dict[str, dict] | None = None,
+    use_cache: Optional[bool] = None,
+    spans: Optional[bool] = None,
+    shards: Optional[bool] = None,
+) -> None:
     """Run chunking for all documents in the processed data directory.
 
     Args:
         selected: optional mapping of chunker names to enable/disable.
+        workers: chunking processes; defaults to `settings.CHUNK_WORKERS`.
+        params: optional constructor arguments per chunker name, e.g.
+            ``{"fixed": {"max_tokens": 256}}``.
+        use_cache: reuse chunks of unchanged (document, chunker
+            configuration) pairs from `CACHE_PATH`; defaults to
+            `settings.CHUNK_CACHE`.
+        spans: write `ChunkSpan`s to `SPANS_OUTPUT` instead of full chunks
+            to `OUTPUT`. Any previous `OUTPUT` (file or shards) is removed,
+            and `common.shards.iter_chunks` (indexing, retrieval, graph
+            building) resolves the spans against `INPUT`. Defaults to
+            `settings.CHUNK_SPANS`.
+        shards: write one shard series per strategy plus an index into the
+            directory next to `OUTPUT` (``chunks/``, see `common.shards`)
+            instead of a single file. Defaults to `settings.CHUNK_SHARDS`.
     """
     settings.ensure_data_dir()
-
-    chunkers = {
-        "fixed": FixedChunker(),
-        "semantic": SemanticChunker(),
-        "structural": StructuralChunker(),
-    }
-
-    if selected is None:
-        selected = {k: True for k in chunkers}
-
     OUTPUT.parent.mkdir(parents=True, exist_ok=True)
 
     if not INPUT.exists():
-        logger.warning("No input documents found at %s", INPUT)
+        logger.warning("No input documents found at {}", INPUT)
+        return
+
+    use_cache = settings.CHUNK_CACHE if use_cache is None else use_cache
+    cache_path = CACHE_PATH if use_cache else None
+
+    spans = settings.CHUNK_SPANS if spans is None else spans
+
+    docs = tqdm(load_docs(INPUT), unit="doc")
+    if spans:
+        # iter_chunks prefers OUTPUT or its shards over spans; leaving a
+        # previous run's there would serve stale chunks.
+        OUTPUT.unlink(missing_ok=True)
+        if shard_dir(OUTPUT).is_dir():
+            shutil.rmtree(shard_dir(OUTPUT))
+        with SPANS_OUTPUT.open("w", encoding="utf-8") as out:
+            write_spans(
+                out,
+                chunk_documents(docs, selected, workers, params=params, cache_path=cache_path, as_spans=True),
+            )
         return
 
-    with OUTPUT.open("w", encoding="utf-8") as out:
-        for doc in tqdm(list(load_docs(INPUT))):
-            for name, chunker in chunkers.items():
-                if not selected.get(name, True):
-                    continue
-                for c in chunker.chunk(doc):
-                    out.write(_serialize_doc(c) + "\n")
+    SPANS_OUTPUT.unlink(missing_ok=True)
+    shards = settings.CHUNK_SHARDS if shards is None else shards
+    chunks = chunk_documents(docs, selected, workers, params=params, cache_path=cache_path)
+    if shards:
+        # Readers prefer the shard directory; drop the stale single file.
+        OUTPUT.unlink(missing_ok=True)
+        out = ShardedWriter(shard_dir(OUTPUT))
+    else:
+        if shard_dir(OUTPUT).is_dir():
+            shutil.rmtree(shard_dir(OUTPUT))
+        out = open_writer(OUTPUT)
+    with out:
+        for chunk in chunks:
+            out.write(chunk)
 
 
 if __name__ == "__main__":
@@ -1,10 +1,8 @@
-import nltk
-from typing import List
-
-from nltk.tokenize import sent_tokenize
-import re
+from typing import Any, Dict, List, Optional, Sequence
 
+from chunking.analysis import DocumentAnalysis
 from chunking.base import BaseChunker
+from chunking.sentences import resolve_splitter
 from common.schemas import DocumentSchema
 from chunking.tokenizer import TokenCounter
 
@@ -12,19 +10,16 @@ from chunking.tokenizer import TokenCounter
 class SemanticChunker(BaseChunker):
     """Chunk documents by sentence while keeping chunks under a token limit.
 
-    The class lazily ensures the NLTK punkt model is available to avoid
-    forcing network access at import time in constrained environments.
+    Sentences come from `sentence_splitter` (``"rules"`` or ``"punkt"``, see
+    `chunking.sentences`; defaults to `settings.SENTENCE_SPLITTER`). The
+    built-in rules need no NLTK data, so construction never touches the
+    network.
     """
 
-    def __init__(self, max_tokens: int = 512) -> None:
+    def __init__(self, max_tokens: int = 512, sentence_splitter: Optional[str] = None) -> None:
         self.max_tokens = int(max_tokens)
         self.tokenizer = TokenCounter()
-
-        # Ensure NLTK Punkt tokenizer is available; do not download indiscriminately
-        try:
-            nltk.data.find("tokenizers/punkt")
-        except LookupError:
-            nltk.download("punkt")
+        self.sentence_splitter = resolve_splitter(sentence_splitter)
 
     def chunk(self, document: DocumentSchema) -> List[DocumentSchema]:
         """Return list of `DocumentSchema` chunks built from sentence boundaries.
@@ -33,51 +28,59 @@ class SemanticChunker(BaseChunker):
         - Accumulate sentences until the token count would exceed `max_tokens`.
         - Emit a chunk when the buffer reaches or exceeds the limit.
         - Remaining buffer is emitted as a final chunk.
+
+        Every sentence is tokenized once, so the cost is linear in the
+        document length.
         """
-        # Prefer NLTK sentence tokenizer when available; fall back to a
-        # lightweight regex-based splitter to avoid runtime errors in
-        # environments without NLTK data installed.
-        try:
-            sentences = sent_tokenize(document.content)
-        except LookupError:
-            # Simple splitter: split on sentence-ending punctuation.
-            sentences = [s.strip() for s in re.split(r'(?<=[.!?])\s+', document.content.strip()) if s.strip()]
+        return self.chunk_analysis(DocumentAnalysis(document, self.tokenizer, self.sentence_splitter))
+
+    def chunk_analysis(self, analysis: DocumentAnalysis) -> List[DocumentSchema]:
+        analysis = analysis.for_splitter(self.sentence_splitter)
+        return self.chunk_sentences(analysis.sentences, analysis.sentence_counts, analysis.document.metadata)
+
+    def chunk_sentences(
+        self,
+        sentences: Sequence[str],
+        counts: Sequence[int],
+        metadata: Dict[str, Any],
+    ) -> List[DocumentSchema]:
+        """Pack `sentences` (with their token `counts`) into chunks."""
         chunks: List[DocumentSchema] = []
         buffer: List[str] = []
+        # Token count of " ".join(buffer), maintained incrementally: each
+        # sentence is counted once and joins add a boundary correction.
+        buffer_tokens = 0
 
-        for sentence in sentences:
-            # If adding the sentence would exceed the limit, flush first.
-            candidate = buffer + [sentence]
-            candidate_text = " ".join(candidate)
-            token_count = self.tokenizer.count(candidate_text)
+        for sentence, sentence_tokens in zip(sentences, counts):
+            if buffer:
+                token_count = (
+                    buffer_tokens
+                    + sentence_tokens
+                    + self.tokenizer.join_correction(buffer[-1], sentence)
+                )
+            else:
+                token_count = sentence_tokens
 
+            # If adding the sentence would exceed the limit, flush first.
             if token_count > self.max_tokens and buffer:
-                content = " ".join(buffer)
-                chunks.append(
-                    DocumentSchema(
-                        content=content,
-                        metadata={
-                            **document.metadata,
-                            "chunk_type": "semantic",
-                            "token_count": self.tokenizer.count(content),
-                        },
-                    )
-                )
+                chunks.append(self._make_chunk(metadata, buffer, buffer_tokens))
                 buffer = [sentence]
+                buffer_tokens = sentence_tokens
             else:
                 buffer.append(sentence)
+                buffer_tokens = token_count
 
         if buffer:
-            content = " ".join(buffer)
-            chunks.append(
-                DocumentSchema(
-                    content=content,
-                    metadata={
-                        **document.metadata,
-                        "chunk_type": "semantic",
-                        "token_count": self.tokenizer.count(content),
-                    },
-                )
-            )
+            chunks.append(self._make_chunk(metadata, buffer, buffer_tokens))
 
         return chunks
+
+    def _make_chunk(self, metadata: Dict[str, Any], sentences: List[str], token_count: int) -> DocumentSchema:
+        return DocumentSchema(
+            content=" ".join(sentences),
+            metadata={
+                **metadata,
+                "chunk_type": "semantic",
+                "token_count": token_count,
+            },
+        )
@@ -0,0 +1,179 @@
+"""Sentence segmentation for the sentence-based chunkers.
+
+Two splitters are available, selected per chunker or with the
+``SENTENCE_SPLITTER`` setting:
+
+- ``"rules"`` (default): a built-in, dependency-free segmenter. One
+  precompiled regex finds candidate boundaries (``.``, ``!``, ``?`` or an
+  ellipsis, optional closing quotes/brackets, then whitespace) and a few
+  rules reject the ones punkt would also reject: known abbreviations,
+  initials, dotted abbreviations such as ``e.g.``, list markers at the
+  start of a line and boundaries followed by a lowercase word. Decimals
+  never match since no whitespace follows their dot.
+- ``"punkt"``: NLTK's punkt model. NLTK is imported on first use and its
+  data (``punkt_tab`` on current NLTK) is never downloaded; when either is
+  missing the rules splitter is used instead, with a warning.
+
+Before ``SENTENCE_SPLITTER`` existed the sentence-based chunkers used punkt
+whenever its data was installed, so switching to ``"rules"`` changes chunk
+boundaries; set ``SENTENCE_SPLITTER=punkt`` to keep them.
+
+Splitters return character spans of stripped, non-empty sentences.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from common.config import settings
+from common.logger import logger
+
+
+Span = Tuple[int, int]
+
+ABBREVIATIONS = frozenset(
+    """
+    mr mrs ms dr prof sr jr st mt ft rev gen col lt sgt capt hon gov pres
+    inc ltd co corp llc plc dept univ assn bros
+    vs etc al approx est min max avg no nos vol vols fig figs eq eqs ch sec secs pp p para art
+    ref refs ed eds repr trans cf ibid op cit viz
+    jan feb mar apr jun jul aug sep sept oct nov dec
+    mon tue tues wed thu thur thurs fri sat sun
+    """.split()
+)
+
+_ROMAN = re.compile(r"[ivxlcdm]+")
+
+# A candidate boundary: the token ending in sentence punctuation, optional
+# closing quotes or brackets, then whitespace and the next character.
+_CANDIDATE = re.compile(
+    r"(?<!\S)(?P<token>\S*?)(?P<punct>[.!?]+|…)(?P<close>[\"'”’)\]]*)"
+    r"(?=\s+(?P<next>\S))"
+)
+
+
+def _is_list_marker(text: str, token_start: int, word: str) -> bool:
+    """``1.``, ``iv.`` or ``b.`` as the first token on its line."""
+    if not (word.isdigit() or (len(word) == 1 and word.isalpha()) or _ROMAN.fullmatch(word)):
+        return False
+    line_start = text.rfind("\n", 0, token_start) + 1
+    return not text[line_start:token_start].strip()
+
+
+def _is_boundary(text: str, match: "re.Match[str]") -> bool:
+    if match.group("next").islower():
+        return False
+    if match.group("punct") != ".":
+        return True
+    word = match.group("token").lstrip("([\"'“‘").lower()
+    if not word:
+        return True
+    if word in ABBREVIATIONS or "." in word:
+        return False
+    if len(word) == 1 and word.isalpha():
+        # Initials ("J. Smith").
+        return False
+    return not _is_list_marker(text, match.start("token"), word)
+
+
+def rule_spans(text: str) -> List[Span]:
+    """Sentence spans of `text` from the built-in rules."""
+    spans: List[Span] = []
+    start = 0
+    for match in _CANDIDATE.finditer(text):
+        if _is_boundary(text, match):
+            spans.append((start, match.end()))
+            start = match.start("next")
+    spans.append((start, len(text)))
+    return _clean(text, spans)
+
+
+def substring_spans(text: str, pieces: Iterable[str]) -> List[Span]:
+    """Spans of `pieces`, substrings of `text` in order (e.g. punkt output)."""
+    spans = []
+    pos = 0
+    for piece in pieces:
+        start = text.find(piece, pos)
+        if start < 0:
+            start = pos
+        spans.append((start, start + len(piece)))
+        pos = start + len(piece)
+    return spans
+
+
+def punkt_spans(text: str) -> List[Span]:
+    """Sentence spans of `text` from NLTK punkt, or from the rules if punkt
+    turns out to be unavailable."""
+    global _punkt_available
+    try:
+        from nltk.tokenize import sent_tokenize
+
+        sentences = sent_tokenize(text)
+    except (ImportError, LookupError) as e:
+        if _punkt_available is not False:
+            logger.warning("NLTK punkt is unavailable ({}); using the built-in sentence splitter", e)
+            _punkt_available = False
+        return rule_spans(text)
+    return substring_spans(text, sentences)
+
+
+def _clean(text: str, spans: Iterable[Span]) -> List[Span]:
+    out = []
+    for start, end in spans:
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start < end:
+            out.append((start, end))
+    return out
+
+
+SPLITTERS: Dict[str, Callable[[str], List[Span]]] = {
+    "rules": rule_spans,
+    "punkt": punkt_spans,
+}
+
+_punkt_available: Optional[bool] = None
+
+
+def punkt_available() -> bool:
+    """Whether NLTK and its punkt data are installed (checked once).
+
+    Probes with a real `sent_tokenize` call, since which resource it loads
+    depends on the NLTK version (``punkt_tab`` since 3.8.2, ``punkt``
+    before).
+    """
+    global _punkt_available
+    if _punkt_available is None:
+        try:
+            from nltk.tokenize import sent_tokenize
+
+            sent_tokenize("One. Two.")
+            _punkt_available = True
+        except (ImportError, LookupError):
+            logger.warning("NLTK punkt data is not installed; using the built-in sentence splitter")
+            _punkt_available = False
+    return _punkt_available
+
+
+def resolve_splitter(name: Optional[str] = None) -> str:
+    """The splitter that will run for `name` (default `settings.SENTENCE_SPLITTER`)."""
+    name = name or settings.SENTENCE_SPLITTER
+    if name not in SPLITTERS:
+        raise ValueError(f"Unknown sentence splitter {name!r}; expected one of {sorted(SPLITTERS)}")
+    if name == "punkt" and not punkt_available():
+        return "rules"
+    return name
+
+
+def sentence_spans(text: str, splitter: Optional[str] = None) -> List[Span]:
+    """Sentence boundaries of `text` as character spans."""
+    return SPLITTERS[resolve_splitter(splitter)](text)
+
+
+def split_sentences(texts: Sequence[str], splitter: Optional[str] = None) -> List[List[str]]:
+    """Split a batch of texts into sentences with one splitter lookup."""
+    split = SPLITTERS[resolve_splitter(splitter)]
+    return [[text[s:e] for s, e in split(text)] for text in texts]
@@ -0,0 +1,217 @@
+"""Offset-based chunk representation and a lazy resolver.
+
+A `ChunkSpan` records where a chunk's text sits in its parent document
+(``document_key``, a short hash of the parent's content, character
+``start``/``end``) plus the chunk's strategy and token count, instead of a
+copy of the text and of the parent's metadata. `ChunkResolver` turns spans
+back into chunk documents on demand from the documents file, so span
+storage and memory grow with the number of chunks rather than with
+duplicated text. The content hash ties a span to the exact version of the
+document it was cut from; resolving against any other version raises
+instead of returning the wrong slice.
+
+Chunkers normalize whitespace in a few places (e.g. `FixedChunker` joins
+words with single spaces), so a span also says how to recover the text
+from the slice: verbatim (``"exact"``) or with whitespace collapsed
+(``"words"``). The rare chunk that neither reproduces keeps its text
+inline.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from bisect import bisect_left
+from dataclasses import asdict, dataclass
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from common.records import iter_documents
+from common.schemas import DocumentSchema, document_key
+
+
+SPAN_MODES = {"exact", "words"}
+
+_WORD = re.compile(r"\S+")
+# Occurrences of a chunk's first word tried before keeping its text inline.
+_MAX_CANDIDATES = 64
+
+
+def doc_hash(text: str) -> str:
+    """Short content hash identifying the version of a document."""
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=8).hexdigest()
+
+
+@dataclass
+class ChunkSpan:
+    """A chunk as a reference into its parent document."""
+
+    doc_id: str
+    start: int
+    end: int
+    strategy: str
+    token_count: int
+    mode: str = "exact"
+    text: Optional[str] = None
+    doc_hash: Optional[str] = None
+
+    def to_record(self) -> dict:
+        record = asdict(self)
+        if self.mode == "exact":
+            del record["mode"]
+        for key in ("text", "doc_hash"):
+            if record[key] is None:
+                del record[key]
+        return record
+
+    @classmethod
+    def from_record(cls, record: dict) -> "ChunkSpan":
+        return cls(**record)
+
+
+class SpanLocator:
+    """Map the chunks of one document to spans of its text.
+
+    Chunks of each strategy are expected in document order (overlap is
+    fine); the search for each chunk starts just after the previous
+    chunk of the same strategy, so locating is linear in practice. At
+    most `_MAX_CANDIDATES` occurrences of a chunk's first word are tried
+    (from the cursor on, then before it), so a chunk that cannot be found
+    costs bounded time and is kept inline.
+    """
+
+    def __init__(self, document: DocumentSchema) -> None:
+        self.document = document
+        self.doc_id = document_key(document)
+        self.doc_hash = doc_hash(document.content)
+        self.text = document.content
+        self._words: Optional[List[str]] = None
+        self._spans: List[Tuple[int, int]] = []
+        self._positions: Dict[str, List[int]] = {}
+        self._cursors: Dict[str, int] = {}
+
+    def _index_words(self) -> None:
+        if self._words is None:
+            matches = list(_WORD.finditer(self.text))
+            self._words = [m.group() for m in matches]
+            self._spans = [m.span() for m in matches]
+            for i, word in enumerate(self._words):
+                self._positions.setdefault(word, []).append(i)
+
+    def _find_words(self, words: List[str], cursor: int) -> Optional[int]:
+        doc_words = self._words
+        k = len(words)
+        positions = self._positions.get(words[0], [])
+        split = bisect_left(positions, cursor)
+        candidates = positions[split:split + _MAX_CANDIDATES]
+        candidates += positions[max(0, split - (_MAX_CANDIDATES - len(candidates))):split][::-1]
+        for i in candidates:
+            if doc_words[i:i + k] == words:
+                return i
+        return None
+
+    def locate(self, chunk: DocumentSchema) -> ChunkSpan:
+        strategy = str(chunk.metadata.get("chunk_type", "chunk"))
+        token_count = int(chunk.metadata.get("token_count", 0))
+        content = chunk.content
+
+        span = partial(ChunkSpan, self.doc_id, strategy=strategy, token_count=token_count, doc_hash=self.doc_hash)
+        words = content.split()
+        if not words:
+            return span(0, 0, text=content or None)
+
+        self._index_words()
+        index = self._find_words(words, self._cursors.get(strategy, 0))
+        if index is not None:
+            self._cursors[strategy] = index + 1
+            start = self._spans[index][0]
+            end = self._spans[index + len(words) - 1][1]
+            piece = self.text[start:end]
+            if piece == content:
+                return span(start, end)
+            if " ".join(words) == content:
+                return span(start, end, mode="words")
+            return span(start, end, text=content)
+
+        return span(0, 0, text=content)
+
+
+def to_spans(document: DocumentSchema, chunks: Iterable[DocumentSchema]) -> List[ChunkSpan]:
+    locator = SpanLocator(document)
+    return [locator.locate(c) for c in chunks]
+
+
+class ChunkResolver:
+    """Materialize `ChunkSpan`s against their parent documents.
+
+    Documents are indexed by `document_key` and content hash, so a span
+    resolves against the version of the document it was cut from even when
+    a key repeats (e.g. a source re-ingested with new content). A span
+    whose version is gone, or whose offsets fall outside its parent,
+    raises `ValueError`; re-run chunking to refresh the spans. Spans
+    written without a hash resolve only when their key is unambiguous.
+    """
+
+    def __init__(self, documents: Iterable[DocumentSchema]) -> None:
+        self.documents: Dict[str, Dict[str, DocumentSchema]] = {}
+        for d in documents:
+            self.documents.setdefault(document_key(d), {})[doc_hash(d.content)] = d
+
+    @classmethod
+    def from_path(cls, path: Path) -> "ChunkResolver":
+        return cls(iter_documents(path, on_error="skip"))
+
+    def parent(self, span: ChunkSpan) -> DocumentSchema:
+        """The document `span` was cut from."""
+        versions = self.documents.get(span.doc_id)
+        if not versions:
+            raise KeyError(f"No document {span.doc_id!r} for chunk span")
+        if span.doc_hash is not None:
+            parent = versions.get(span.doc_hash)
+            if parent is None:
+                raise ValueError(f"Document {span.doc_id!r} changed since its chunk spans were computed")
+        elif len(versions) == 1:
+            (parent,) = versions.values()
+        else:
+            raise ValueError(f"Chunk span without a content hash matches {len(versions)} versions of {span.doc_id!r}")
+        if span.end > len(parent.content):
+            raise ValueError(
+                f"Chunk span {span.start}:{span.end} is outside {span.doc_id!r} ({len(parent.content)} characters)"
+            )
+        return parent
+
+    def text(self, span: ChunkSpan) -> str:
+        if span.text is not None:
+            return span.text
+        piece = self.parent(span).content[span.start:span.end]
+        return " ".join(piece.split()) if span.mode == "words" else piece
+
+    def resolve(self, span: ChunkSpan) -> DocumentSchema:
+        parent = self.parent(span)
+        return DocumentSchema(
+            content=self.text(span),
+            metadata={
+                **parent.metadata,
+                "chunk_type": span.strategy,
+                "token_count": span.token_count,
+            },
+        )
+
+    def iter_resolved(self, spans: Iterable[ChunkSpan]) -> Iterator[DocumentSchema]:
+        for span in spans:
+            yield self.resolve(span)
+
+
+def write_spans(out, spans: Iterable[ChunkSpan]) -> None:
+    """Write spans as compact JSON lines to the text file `out`."""
+    for span in spans:
+        out.write(json.dumps(span.to_record(), ensure_ascii=False, separators=(",", ":")) + "\n")
+
+
+def iter_spans(path: Path) -> Iterator[ChunkSpan]:
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield ChunkSpan.from_record(json.loads(line))
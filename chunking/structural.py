@@ -1,6 +1,6 @@
-import re
-from typing import List
+from typing import List, Optional
 
+from chunking.analysis import DocumentAnalysis
 from chunking.base import BaseChunker
 from common.schemas import DocumentSchema
 from chunking.tokenizer import TokenCounter
@@ -12,17 +12,22 @@ class StructuralChunker(BaseChunker):
     semantic chunking for large sections.
     """
 
-    def __init__(self, max_tokens: int = 512) -> None:
+    def __init__(self, max_tokens: int = 512, sentence_splitter: Optional[str] = None) -> None:
         self.max_tokens = int(max_tokens)
         self.tokenizer = TokenCounter()
+        self._semantic = SemanticChunker(self.max_tokens, sentence_splitter)
+        self.sentence_splitter = self._semantic.sentence_splitter
 
     def chunk(self, document: DocumentSchema) -> List[DocumentSchema]:
+        return self.chunk_analysis(DocumentAnalysis(document, self.tokenizer, self.sentence_splitter))
+
+    def chunk_analysis(self, analysis: DocumentAnalysis) -> List[DocumentSchema]:
+        analysis = analysis.for_splitter(self.sentence_splitter)
         # Split on markdown headers while keeping text content readable.
-        sections = [s for s in re.split(r"\n#{1,6}\s+", document.content) if s.strip()]
+        document = analysis.document
         chunks: List[DocumentSchema] = []
 
-        for section in sections:
-            token_count = self.tokenizer.count(section)
+        for span, section, token_count in zip(analysis.section_spans, analysis.sections, analysis.section_counts):
             if token_count <= self.max_tokens:
                 chunks.append(
                     DocumentSchema(
@@ -35,10 +40,12 @@ class StructuralChunker(BaseChunker):
                     )
                 )
             else:
-                # Fallback: delegate to semantic chunker for overly large sections.
+                # Fallback: semantic chunking of the section, reusing the
+                # document's sentence boundaries.
+                sentences = analysis.sentences_in(span)
                 chunks.extend(
-                    SemanticChunker(self.max_tokens).chunk(
-                        DocumentSchema(content=section, metadata=document.metadata)
+                    self._semantic.chunk_sentences(
+                        sentences, self.tokenizer.count_many(sentences), document.metadata
                     )
                 )
 
@@ -1,4 +1,11 @@
-from typing import Optional
+import re
+from typing import List, Optional, Sequence
+
+from common.tokenizer import TokenizerService, get_tokenizer
+
+
+_LAST_WORD = re.compile(r"\S*\s*$")
+_FIRST_WORD = re.compile(r"\s*\S*")
 
 
 class TokenCounter:
@@ -6,34 +13,71 @@ class TokenCounter:
 
     Falls back to a simple word-based token count if `tiktoken` is not
     installed or the requested model encoding is not available.
+
+    Counters are thin views over the process-wide `TokenizerService` for
+    the model's encoding, so every chunker shares one encoder and one
+    cache of counts.
     """
 
-    def __init__(self, model_name: str = "gpt-4") -> None:
+    def __init__(self, model_name: str = "gpt-4", service: Optional[TokenizerService] = None) -> None:
         self.model_name = model_name
-        self._encoder = None
-
-        try:
-            import tiktoken
-
-            self._tiktoken = tiktoken
-        except Exception:
-            self._tiktoken = None
-
-    def _ensure_encoder(self):
-        if self._encoder is None and self._tiktoken:
-            try:
-                self._encoder = self._tiktoken.encoding_for_model(self.model_name)
-            except Exception:
-                # model not found; fallback to a base encoding
-                try:
-                    self._encoder = self._tiktoken.get_encoding("cl100k_base")
-                except Exception:
-                    self._encoder = None
+        self.service = service or get_tokenizer(model_name)
+
+    def fingerprint(self) -> str:
+        """Name of the counting scheme actually in use (encoding or "words")."""
+        return self.service.encoding_name if self.service.encoder is not None else "words"
 
     def count(self, text: str) -> int:
-        self._ensure_encoder()
-        if self._encoder:
-            return len(self._encoder.encode(text))
+        return self.service.count(text)
+
+    def count_many(self, texts: Sequence[str]) -> List[int]:
+        return self.service.count_many(texts)
+
+    def join_correction(self, left: str, right: str, sep: str = " ") -> int:
+        """Tokens gained or lost by joining `left` and `right` with `sep`.
+
+            count(left + sep + right) == count(left) + count(right) + join_correction(left, right, sep)
+
+        tiktoken pre-tokens never span a word and the whitespace before the
+        previous word, so only the last word of `left` and the first word
+        of `right` (with adjacent whitespace) need encoding.
+        """
+        if self.service.encoder is None:
+            # Word counts are additive across whitespace.
+            return 0 if sep.isspace() else self.count(left + sep + right) - self.count(left) - self.count(right)
+
+        tail = _LAST_WORD.search(left).group()
+        head = _FIRST_WORD.match(right).group()
+        return self.count(tail + sep + head) - self.count(tail) - self.count(head)
+
+    def segment_counts(self, words: Sequence[str]) -> List[int]:
+        """Token counts of each word as it appears in ``" ".join(words)``.
+
+        Entry 0 counts the first word; entry ``i > 0`` counts word ``i``
+        together with the space before it. tiktoken's pre-tokenizer only
+        attaches a space to the following word, so for any slice
+
+            count(" ".join(words[s:e])) == count(words[s]) + sum(segments[s + 1:e])
+
+        The whole text is encoded once and tokens are assigned to words by
+        their character offsets.
+        """
+        if not words:
+            return []
+        encoder = self.service.encoder
+        if encoder is None:
+            return [1] * len(words)
+
+        tokens = encoder.encode_ordinary(" ".join(words))
+        _, offsets = encoder.decode_with_offsets(tokens)
 
-        # Fallback: simple heuristic (words)
-        return max(0, len(text.split()))
+        counts = [0] * len(words)
+        word = 0
+        # Character offset where segment `word + 1` (its leading space) starts.
+        boundary = len(words[0])
+        for offset in offsets:
+            while word + 1 < len(words) and offset >= boundary:
+                word += 1
+                boundary += 1 + len(words[word])
+            counts[word] += 1
+        return counts
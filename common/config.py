@@ -23,6 +23,63 @@ class Settings:
     DATA_DIR: Path = Path(os.getenv("DATA_DIR", "data"))
     ENV: str = os.getenv("ENV", "dev")
 
+    # On-disk format for documents/chunks: "jsonl" or the compact "egpr"
+    RECORD_FORMAT: str = os.getenv("RECORD_FORMAT", "jsonl")
+
+    # Ingestion settings
+    INGEST_WORKERS: int = int(os.getenv("INGEST_WORKERS", "1"))
+    # Record resumable progress every N completed source files; 0 disables
+    INGEST_CHECKPOINT_EVERY: int = int(os.getenv("INGEST_CHECKPOINT_EVERY", "25"))
+    # Poll interval in seconds for `ingest --watch`
+    INGEST_WATCH_INTERVAL: float = float(os.getenv("INGEST_WATCH_INTERVAL", "5"))
+    # Page-parallel extraction of single large PDFs (used when INGEST_WORKERS == 1)
+    PDF_WORKERS: int = int(os.getenv("PDF_WORKERS", "1"))
+    PDF_PARALLEL_MIN_PAGES: int = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "64"))
+    # Per-page extraction budget in seconds; 0 disables the limit
+    PDF_PAGE_TIMEOUT: float = float(os.getenv("PDF_PAGE_TIMEOUT", "0"))
+    # Near-duplicate elimination; 0 disables, mode is "drop" or "tag"
+    DEDUP_THRESHOLD: float = float(os.getenv("DEDUP_THRESHOLD", "0"))
+    DEDUP_MODE: str = os.getenv("DEDUP_MODE", "drop")
+
+    # Chunking worker processes for `run_chunking`
+    CHUNK_WORKERS: int = int(os.getenv("CHUNK_WORKERS", "1"))
+    # Reuse chunks of unchanged (document, chunker config) pairs across runs;
+    # entries kept before the least recently used are evicted
+    CHUNK_CACHE: bool = os.getenv("CHUNK_CACHE", "1") == "1"
+    CHUNK_CACHE_MAX_ENTRIES: int = int(os.getenv("CHUNK_CACHE_MAX_ENTRIES", "200000"))
+    # Write chunks as offsets into their documents (chunk_spans.jsonl)
+    CHUNK_SPANS: bool = os.getenv("CHUNK_SPANS", "0") == "1"
+    # Write chunks as per-strategy, size-bounded shards with an index (chunks/)
+    CHUNK_SHARDS: bool = os.getenv("CHUNK_SHARDS", "0") == "1"
+    CHUNK_SHARD_MB: int = int(os.getenv("CHUNK_SHARD_MB", "64"))
+    # Comma-separated chunk strategies read by indexing, retrieval and the
+    # graph builder; empty reads all
+    CHUNK_STRATEGIES: str = os.getenv("CHUNK_STRATEGIES", "")
+    # Sentence splitter for semantic/structural chunking: "rules" or "punkt".
+    # Earlier versions used punkt whenever its data was installed; "rules"
+    # gives different chunk boundaries, so set "punkt" to keep them
+    SENTENCE_SPLITTER: str = os.getenv("SENTENCE_SPLITTER", "rules")
+
+    # Texts per SentenceTransformer forward pass
+    EMBED_BATCH_SIZE: int = int(os.getenv("EMBED_BATCH_SIZE", "32"))
+    # Disk cache of embeddings by (model, text hash) for get_embedder; rows
+    # kept per model before least-recently-used vectors are overwritten
+    EMBED_CACHE: bool = os.getenv("EMBED_CACHE", "0") == "1"
+    EMBED_CACHE_MAX_ENTRIES: int = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", "1000000"))
+
+    # OpenAI embedding requests: tokens and inputs per request, requests in
+    # flight, rate limits per minute (0 disables) and retries of transient errors
+    OPENAI_EMBED_BATCH_TOKENS: int = int(os.getenv("OPENAI_EMBED_BATCH_TOKENS", "100000"))
+    OPENAI_EMBED_BATCH_INPUTS: int = int(os.getenv("OPENAI_EMBED_BATCH_INPUTS", "2048"))
+    OPENAI_EMBED_CONCURRENCY: int = int(os.getenv("OPENAI_EMBED_CONCURRENCY", "4"))
+    OPENAI_EMBED_RPM: int = int(os.getenv("OPENAI_EMBED_RPM", "3000"))
+    OPENAI_EMBED_TPM: int = int(os.getenv("OPENAI_EMBED_TPM", "1000000"))
+    OPENAI_EMBED_MAX_RETRIES: int = int(os.getenv("OPENAI_EMBED_MAX_RETRIES", "5"))
+
+    # Tokenizer service: cached token counts (0 disables) and encode_batch threads
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", "65536"))
+    TOKENIZER_THREADS: int = int(os.getenv("TOKENIZER_THREADS", "8"))
+
     # Neo4j AuraDB settings
     NEO4J_URI: str = os.getenv("NEO4J_URI", "")
     NEO4J_USER: str = os.getenv("NEO4J_USER", "")
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Deque, Iterable, Iterator, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def ordered_map(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    workers: int = 1,
+    window: Optional[int] = None,
+    initializer: Optional[Callable[..., Any]] = None,
+    initargs: Sequence[Any] = (),
+) -> Iterator[R]:
+    """Apply `fn` to `items` on a process pool, yielding results in input order.
+
+    Unlike `Executor.map`, items are consumed lazily and at most `window`
+    tasks are in flight at once, so memory stays bounded for long or
+    generator-backed inputs. With `workers <= 1` everything runs in-process
+    (the initializer is still called once) which keeps debugging simple.
+
+    `fn`, the items and the results must be picklable when `workers > 1`.
+    """
+    workers = max(1, int(workers))
+
+    if workers == 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for item in items:
+            yield fn(item)
+        return
+
+    window = max(workers, int(window or workers * 4))
+    pending: Deque[Future] = deque()
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=initializer, initargs=tuple(initargs)
+    ) as executor:
+        for item in items:
+            pending.append(executor.submit(fn, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
@@ -12,3 +12,12 @@ class DocumentSchema(BaseModel):
     content: str = Field(..., description="Text content of the document")
     metadata: Dict[str, Any] = Field(default_factory=dict)
     id: Optional[str] = Field(None, description="Optional document identifier")
+
+
+def document_key(doc: DocumentSchema) -> str:
+    """Stable identifier for a document: its `id`, else ``source#page=N``."""
+    if doc.id:
+        return doc.id
+    source = str(doc.metadata.get("source", ""))
+    page = doc.metadata.get("page")
+    return source if page is None else f"{source}#page={page}"
@@ -0,0 +1,316 @@
+"""Sharded record sets: one file series per key, plus a byte-offset index.
+
+A shard directory holds the records of one logical file (e.g.
+``chunks.jsonl``) split by a metadata key (``chunk_type`` for chunks) and
+into size-bounded shards::
+
+    chunks/
+        index.json
+        fixed-00000.jsonl
+        fixed-00001.jsonl
+        semantic-00000.jsonl
+        ...
+
+``index.json`` lists every shard with its key, record count, size and a
+checkpoint (byte offset, record number) every `index_every` records, so a
+reader can count records without opening shards, skip strategies it does
+not use, seek straight to a record range, or hand shards to parallel
+workers. Shards are ordinary JSON lines or EGPR files (see
+`common.records`); EGPR blocks are aligned with the checkpoints.
+
+Readers locate the directory from the canonical file path by dropping its
+suffix (``chunks.jsonl`` -> ``chunks/``), so `iter_chunks` reads whichever
+of the two exists. When neither does but ``chunk_spans.jsonl`` (written
+with ``CHUNK_SPANS=1``) sits next to them, `iter_chunks` resolves the
+spans against the ``documents`` file in the same directory.
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from common.config import settings
+from common.parallel import ordered_map
+from common.records import EGPR_SUFFIX, Record, RecordLike, RecordWriter, iter_records, open_writer, records_path
+from common.schemas import DocumentSchema
+
+
+INDEX_FILE = "index.json"
+INDEX_VERSION = 1
+SPANS_FILE = "chunk_spans.jsonl"
+DOCUMENTS_FILE = "documents.jsonl"
+
+
+@dataclass
+class Shard:
+    """One shard file as described by the index."""
+
+    path: Path
+    key: str
+    records: int = 0
+    bytes: int = 0
+    checkpoints: List[Tuple[int, int]] = field(default_factory=list)
+
+    def to_entry(self) -> Dict[str, Any]:
+        return {
+            "path": self.path.name,
+            "key": self.key,
+            "records": self.records,
+            "bytes": self.bytes,
+            "checkpoints": [list(c) for c in self.checkpoints],
+        }
+
+
+def shard_dir(path: Path) -> Path:
+    """The shard directory standing in for the record file `path`."""
+    return path.with_suffix("")
+
+
+def is_sharded(directory: Path) -> bool:
+    return (directory / INDEX_FILE).is_file()
+
+
+class ShardIndex:
+    """The parsed ``index.json`` of a shard directory."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+        with (self.directory / INDEX_FILE).open("r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported shard index version: {data.get('version')}")
+        self.format: str = data["format"]
+        self.key: str = data["key"]
+        self.all_shards = [
+            Shard(
+                path=self.directory / entry["path"],
+                key=entry["key"],
+                records=entry["records"],
+                bytes=entry["bytes"],
+                checkpoints=[tuple(c) for c in entry["checkpoints"]],
+            )
+            for entry in data["shards"]
+        ]
+
+    @property
+    def keys(self) -> List[str]:
+        return list(dict.fromkeys(s.key for s in self.all_shards))
+
+    def shards(self, keys: Optional[Sequence[str]] = None) -> List[Shard]:
+        """Shards of the given keys (all when `None`), in index order."""
+        if keys is None:
+            return list(self.all_shards)
+        wanted = set(keys)
+        return [s for s in self.all_shards if s.key in wanted]
+
+    def records(self, keys: Optional[Sequence[str]] = None) -> int:
+        return sum(s.records for s in self.shards(keys))
+
+
+class ShardedWriter:
+    """Write records into per-key, size-bounded shards and an index.
+
+    The target directory is owned by the writer: any previous contents are
+    removed when it opens. The index is written by `close()`, so readers
+    never see a half-written shard set described as complete.
+
+    Args:
+        directory: shard directory to (re)create.
+        fmt: ``"jsonl"`` or ``"egpr"``; defaults to `settings.RECORD_FORMAT`.
+        key: metadata key that selects the shard series of a record.
+        shard_bytes: start a new shard once one reaches this size (checked
+            at checkpoints); defaults to `settings.CHUNK_SHARD_MB`.
+        index_every: records between index checkpoints (and per EGPR block).
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        fmt: Optional[str] = None,
+        key: str = "chunk_type",
+        shard_bytes: Optional[int] = None,
+        index_every: int = 1024,
+    ) -> None:
+        self.directory = Path(directory)
+        self.format = fmt or settings.RECORD_FORMAT
+        self.key = key
+        self.shard_bytes = int(shard_bytes or settings.CHUNK_SHARD_MB * 2**20)
+        self.index_every = max(1, int(index_every))
+        self.suffix = EGPR_SUFFIX if self.format == "egpr" else ".jsonl"
+        self.shards: List[Shard] = []
+        self._writers: Dict[str, Tuple[Shard, RecordWriter]] = {}
+        self._counts: Dict[str, int] = {}
+
+        if self.directory.exists():
+            shutil.rmtree(self.directory)
+        self.directory.mkdir(parents=True)
+
+    def _open_shard(self, key: str) -> Tuple[Shard, RecordWriter]:
+        number = self._counts.get(key, 0)
+        self._counts[key] = number + 1
+        shard = Shard(path=self.directory / f"{_safe_name(key)}-{number:05d}{self.suffix}", key=key)
+        writer = open_writer(shard.path, self.format, block_records=self.index_every)
+        self.shards.append(shard)
+        self._writers[key] = (shard, writer)
+        return shard, writer
+
+    def _close_shard(self, shard: Shard, writer: RecordWriter) -> None:
+        writer.close()
+        shard.bytes = shard.path.stat().st_size
+
+    def write(self, record: RecordLike) -> None:
+        metadata = record.metadata if isinstance(record, DocumentSchema) else record.get("metadata") or {}
+        key = str(metadata.get(self.key, ""))
+        current = self._writers.get(key)
+        if current is None:
+            current = self._open_shard(key)
+        shard, writer = current
+
+        if shard.records % self.index_every == 0:
+            writer.flush()
+            if shard.records and writer.tell() >= self.shard_bytes:
+                self._close_shard(shard, writer)
+                shard, writer = self._open_shard(key)
+            shard.checkpoints.append((writer.tell(), shard.records))
+
+        writer.write(record)
+        shard.records += 1
+
+    def close(self) -> None:
+        for shard, writer in self._writers.values():
+            self._close_shard(shard, writer)
+        self._writers = {}
+        rank = {key: i for i, key in enumerate(self._counts)}
+        index = {
+            "version": INDEX_VERSION,
+            "format": self.format,
+            "key": self.key,
+            "index_every": self.index_every,
+            # Grouped by key, so reading every shard in index order yields
+            # each key's records contiguously and in write order.
+            "shards": [s.to_entry() for s in sorted(self.shards, key=lambda s: rank[s.key])],
+        }
+        tmp = self.directory / (INDEX_FILE + ".tmp")
+        tmp.write_text(json.dumps(index, indent=1), encoding="utf-8")
+        tmp.replace(self.directory / INDEX_FILE)
+
+    def __enter__(self) -> "ShardedWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _safe_name(key: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in key) or "none"
+
+
+def iter_shard(
+    shard: Shard,
+    fields: Optional[Sequence[str]] = None,
+    start: int = 0,
+    stop: Optional[int] = None,
+) -> Iterator[Record]:
+    """Records ``start:stop`` of `shard`, seeking to the nearest checkpoint."""
+    stop = shard.records if stop is None else min(stop, shard.records)
+    if start >= stop:
+        return
+    offset, first = 0, 0
+    for cp_offset, cp_record in shard.checkpoints:
+        if cp_record > start:
+            break
+        offset, first = cp_offset, cp_record
+    records = iter_records(shard.path, fields, offset=offset)
+    yield from islice(records, start - first, stop - first)
+
+
+def iter_sharded(
+    directory: Path,
+    keys: Optional[Sequence[str]] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> Iterator[Record]:
+    """Records of every shard of `keys` (all when `None`), shard by shard."""
+    for shard in ShardIndex(directory).shards(keys):
+        yield from iter_shard(shard, fields)
+
+
+def map_shards(
+    fn: Callable[[Shard], Any],
+    directory: Path,
+    keys: Optional[Sequence[str]] = None,
+    workers: int = 1,
+) -> Iterator[Any]:
+    """Apply `fn` to each shard on `workers` processes, in index order."""
+    return ordered_map(fn, ShardIndex(directory).shards(keys), workers=workers)
+
+
+def iter_chunks(
+    path: Path,
+    fields: Optional[Sequence[str]] = None,
+    strategies: Optional[Sequence[str]] = None,
+    on_error: str = "raise",
+) -> Iterator[Record]:
+    """Chunk records from `path` or, when it exists, its shard directory.
+
+    Without either, chunk spans next to `path` (see `spans_path`) are
+    resolved against their documents. `strategies` restricts the output to
+    chunks whose ``chunk_type`` is listed; with shards or spans the other
+    strategies are never resolved. Sharded chunks come strategy by strategy
+    rather than interleaved.
+    """
+    directory = path if path.is_dir() else shard_dir(path)
+    if is_sharded(directory):
+        yield from iter_sharded(directory, strategies, fields)
+        return
+    if not path.exists() and spans_path(path).exists():
+        yield from _iter_span_chunks(path, fields, strategies)
+        return
+
+    if strategies is None:
+        yield from iter_records(path, fields, on_error)
+        return
+
+    wanted = set(strategies)
+    read = tuple(dict.fromkeys((*(fields or ("content", "metadata", "id")), "metadata")))
+    for record in iter_records(path, read, on_error):
+        if record["metadata"].get("chunk_type") in wanted:
+            yield {k: record[k] for k in fields} if fields else record
+
+
+def spans_path(path: Path) -> Path:
+    """Where chunk spans stand in for the chunk file `path`."""
+    return path.parent / SPANS_FILE
+
+
+def _iter_span_chunks(
+    path: Path, fields: Optional[Sequence[str]], strategies: Optional[Sequence[str]]
+) -> Iterator[Record]:
+    from chunking.spans import ChunkResolver, iter_spans
+
+    resolver = ChunkResolver.from_path(records_path(path.parent / DOCUMENTS_FILE))
+    wanted = set(strategies) if strategies is not None else None
+    content_only = fields is not None and set(fields) == {"content"}
+    for span in iter_spans(spans_path(path)):
+        if wanted is not None and span.strategy not in wanted:
+            continue
+        if content_only:
+            yield {"content": resolver.text(span)}
+            continue
+        chunk = resolver.resolve(span)
+        record = {"content": chunk.content, "metadata": chunk.metadata, "id": chunk.id}
+        yield {k: record[k] for k in fields} if fields else record
+
+
+def chunks_exist(path: Path) -> bool:
+    return path.exists() or is_sharded(shard_dir(path)) or spans_path(path).exists()
+
+
+def configured_strategies() -> Optional[List[str]]:
+    """`settings.CHUNK_STRATEGIES` as a list, or `None` for every strategy."""
+    names = [s.strip() for s in settings.CHUNK_STRATEGIES.split(",") if s.strip()]
+    return names or None
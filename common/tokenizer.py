@@ -0,0 +1,179 @@
+"""Process-wide tiktoken service shared by chunking and monitoring.
+
+Encoders are loaded lazily, once per encoding, and every caller asking for
+the same encoding gets the same `TokenizerService`, including its LRU
+cache of token counts. A failed load (tiktoken missing, BPE ranks not
+cached and no network) is remembered so it is not retried on every call;
+the service then reports `encoder is None` and counts words instead.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+from common.config import settings
+from common.logger import logger
+
+
+DEFAULT_ENCODING = "cl100k_base"
+
+# Model names tiktoken does not know (or that we pin on purpose).
+ENCODING_MAP = {
+    "gpt-4": "cl100k_base",
+    "gpt-4o": "cl100k_base",
+    "gpt-4o-mini": "cl100k_base",
+    "gpt-3.5-turbo": "cl100k_base",
+    "text-embedding-ada-002": "cl100k_base",
+    "text-davinci-003": "p50k_base",
+    "text-curie-001": "p50k_base",
+    "text-babbage-001": "p50k_base",
+    "text-ada-001": "p50k_base",
+}
+
+_lock = threading.Lock()
+_services: Dict[str, "TokenizerService"] = {}
+
+
+def encoding_name_for(model: str) -> str:
+    """Return the tiktoken encoding name used for `model`."""
+    if model in ENCODING_MAP:
+        return ENCODING_MAP[model]
+    try:
+        import tiktoken
+
+        return tiktoken.encoding_name_for_model(model)
+    except Exception:
+        return DEFAULT_ENCODING
+
+
+def _text_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+class TokenizerService:
+    """Token counting for one encoding with a bounded LRU cache.
+
+    Args:
+        encoding_name: tiktoken encoding loaded on first use.
+        cache_size: maximum number of cached counts, keyed by a 128-bit
+            BLAKE2b hash of the text; `0` disables caching. Defaults to
+            `settings.TOKEN_CACHE_SIZE`.
+        encoder: use this encoder instead of loading `encoding_name`.
+    """
+
+    def __init__(
+        self,
+        encoding_name: str = DEFAULT_ENCODING,
+        cache_size: Optional[int] = None,
+        encoder: Any = None,
+    ) -> None:
+        self.encoding_name = encoding_name
+        self.cache_size = settings.TOKEN_CACHE_SIZE if cache_size is None else int(cache_size)
+        self.hits = 0
+        self.misses = 0
+        self._encoder = encoder
+        self._loaded = encoder is not None
+        self._cache: "OrderedDict[bytes, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def encoder(self) -> Any:
+        """The tiktoken encoding, or `None` if it could not be loaded."""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._encoder = self._load()
+                    self._loaded = True
+        return self._encoder
+
+    def _load(self) -> Any:
+        try:
+            import tiktoken
+
+            return tiktoken.get_encoding(self.encoding_name)
+        except Exception as e:
+            logger.warning("Failed to load tiktoken encoding {}: {}. Counting words instead.", self.encoding_name, e)
+            return None
+
+    def _uncached_count(self, text: str) -> int:
+        encoder = self.encoder
+        if encoder is None:
+            return len(text.split())
+        return len(encoder.encode(text))
+
+    def _lookup(self, key: bytes) -> Optional[int]:
+        with self._lock:
+            count = self._cache.get(key)
+            if count is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return count
+
+    def _store(self, key: bytes, count: int) -> None:
+        with self._lock:
+            self._cache[key] = count
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def count(self, text: str) -> int:
+        if not self.cache_size:
+            return self._uncached_count(text)
+        key = _text_key(text)
+        count = self._lookup(key)
+        if count is None:
+            count = self._uncached_count(text)
+            self._store(key, count)
+        return count
+
+    def count_many(self, texts: Sequence[str], num_threads: Optional[int] = None) -> List[int]:
+        """Count tokens of many texts; cache misses are encoded in one
+        `encode_batch` call spread over `num_threads` threads (defaults to
+        `settings.TOKENIZER_THREADS`)."""
+        counts: List[Optional[int]] = [None] * len(texts)
+        keys: List[Optional[bytes]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+
+        for i, text in enumerate(texts):
+            if self.cache_size:
+                keys[i] = _text_key(text)
+                counts[i] = self._lookup(keys[i])
+            if counts[i] is None:
+                missing.setdefault(text, []).append(i)
+
+        if missing:
+            todo = list(missing)
+            encoder = self.encoder
+            if encoder is None:
+                fresh = [len(t.split()) for t in todo]
+            else:
+                threads = settings.TOKENIZER_THREADS if num_threads is None else num_threads
+                fresh = [len(tokens) for tokens in encoder.encode_batch(todo, num_threads=max(1, threads))]
+            for text, count in zip(todo, fresh):
+                positions = missing[text]
+                if self.cache_size:
+                    self._store(keys[positions[0]], count)
+                for i in positions:
+                    counts[i] = count
+
+        return counts  # type: ignore[return-value]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.misses = 0
+
+
+def get_tokenizer(model: str = "gpt-4") -> TokenizerService:
+    """Return the process-wide `TokenizerService` for `model`'s encoding."""
+    name = encoding_name_for(model)
+    service = _services.get(name)
+    if service is None:
+        with _lock:
+            service = _services.setdefault(name, TokenizerService(name))
+    return service
@@ -1,12 +1,15 @@
 """Embeddings package for text vectorization."""
 
 from .base import BaseEmbedder
+from .cache import CachedEmbedder, EmbeddingCache
 from .embedder_factory import get_embedder
 from .hf_embedder import HuggingFaceEmbedder
 from .openai_embedder import OpenAIEmbedder
 
 __all__ = [
     "BaseEmbedder",
+    "CachedEmbedder",
+    "EmbeddingCache",
     "get_embedder",
     "HuggingFaceEmbedder",
     "OpenAIEmbedder",
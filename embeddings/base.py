@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 from typing import List
 
+import numpy as np
+
 
 class BaseEmbedder(ABC):
     """Abstract base class for text embedders.
@@ -19,3 +21,12 @@ class BaseEmbedder(ABC):
             List of embedding vectors, one per input text.
         """
         raise NotImplementedError
+
+    def embed_array(self, texts: List[str]) -> np.ndarray:
+        """Embed texts into a C-contiguous float32 array of shape ``(len(texts), dim)``.
+
+        Vector stores take this array without copying. The default converts
+        `embed`'s lists; providers that compute arrays natively override it
+        to skip the Python floats entirely.
+        """
+        return np.ascontiguousarray(self.embed(texts), dtype=np.float32)
@@ -0,0 +1,180 @@
+"""Concurrent, rate-limited batching of embedding API requests.
+
+`plan_batches` splits texts into requests that respect a token budget and
+an input count; `RateLimiter` spaces requests so they stay under
+requests-per-minute and tokens-per-minute limits; `embed_batches` sends
+the batches concurrently with asyncio, retries transient failures with
+exponential backoff, and reassembles the vectors in input order.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from typing import Awaitable, Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from common.logger import logger
+
+
+# Sends one batch of texts and returns its vectors, in batch order.
+EmbedRequest = Callable[[List[str]], Awaitable[Sequence[Sequence[float]]]]
+
+
+def plan_batches(counts: Sequence[int], max_tokens: int, max_inputs: int) -> List[Tuple[int, int]]:
+    """Split texts with token `counts` into consecutive ``(start, stop)`` batches.
+
+    A batch holds at most `max_inputs` texts and `max_tokens` tokens; a text
+    over the token budget on its own gets a batch to itself (the API then
+    decides whether to accept it).
+    """
+    batches = []
+    start, tokens = 0, 0
+    for i, count in enumerate(counts):
+        if i > start and (tokens + count > max_tokens or i - start >= max_inputs):
+            batches.append((start, i))
+            start, tokens = i, 0
+        tokens += count
+    if start < len(counts):
+        batches.append((start, len(counts)))
+    return batches
+
+
+class RateLimiter:
+    """Token buckets for requests and tokens per minute, shared by coroutines.
+
+    Each bucket holds up to one minute's allowance and refills continuously,
+    so short bursts are allowed and the long-run rate stays under the limit.
+    A limit of 0 disables that bucket. The state is plain numbers behind a
+    thread lock, so one limiter can serve successive event loops.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._clock = clock
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+
+    def reserve(self, tokens: int) -> float:
+        """Take one request and `tokens` if available; else seconds to wait."""
+        with self._lock:
+            self._refill(self._clock())
+            # A request larger than a minute's budget waits for a full bucket.
+            tokens = min(tokens, self.tokens_per_minute) if self.tokens_per_minute else 0
+            wait = 0.0
+            if self.requests_per_minute and self._requests < 1:
+                wait = (1 - self._requests) * 60 / self.requests_per_minute
+            if self.tokens_per_minute and self._tokens < tokens:
+                wait = max(wait, (tokens - self._tokens) * 60 / self.tokens_per_minute)
+            if wait:
+                return wait
+            if self.requests_per_minute:
+                self._requests -= 1
+            self._tokens -= tokens
+            return 0.0
+
+    async def acquire(self, tokens: int) -> None:
+        while True:
+            wait = self.reserve(tokens)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    response = getattr(error, "response", None)
+    value = getattr(response, "headers", {}).get("retry-after") if response is not None else None
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+def is_transient(error: BaseException) -> bool:
+    """True for timeouts, connection errors, 408/409/429 and 5xx responses."""
+    import openai
+
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return isinstance(error, (asyncio.TimeoutError, ConnectionError))
+
+
+async def embed_batches(
+    request: EmbedRequest,
+    texts: Sequence[str],
+    counts: Sequence[int],
+    max_tokens: int,
+    max_inputs: int,
+    concurrency: int = 4,
+    limiter: Optional[RateLimiter] = None,
+    max_retries: int = 5,
+    backoff: float = 1.0,
+) -> np.ndarray:
+    """Embed `texts` through `request`, returning a float32 ``(n, dim)`` array.
+
+    Batches come from `plan_batches`; at most `concurrency` are in flight,
+    each first acquiring its tokens from `limiter`. Transient failures (see
+    `is_transient`) are retried up to `max_retries` times, waiting the
+    server's ``Retry-After`` or ``backoff * 2**attempt`` seconds with jitter.
+    """
+    batches = plan_batches(counts, max_tokens, max_inputs)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    limiter = limiter or RateLimiter()
+    out: Optional[np.ndarray] = None
+
+    async def run(start: int, stop: int) -> None:
+        nonlocal out
+        tokens = sum(counts[start:stop])
+        async with semaphore:
+            for attempt in range(max_retries + 1):
+                await limiter.acquire(tokens)
+                try:
+                    vectors = await request(list(texts[start:stop]))
+                    break
+                except Exception as e:
+                    if attempt == max_retries or not is_transient(e):
+                        raise
+                    delay = _retry_after(e)
+                    if delay is None:
+                        delay = backoff * 2 ** attempt * (0.5 + random.random())
+                    logger.warning(
+                        "Embedding batch {}-{} failed ({}); retry {}/{} in {:.2f}s",
+                        start, stop, e, attempt + 1, max_retries, delay,
+                    )
+                    await asyncio.sleep(delay)
+        if len(vectors) != stop - start:
+            raise RuntimeError(f"Expected {stop - start} embeddings, got {len(vectors)}")
+        if out is None:
+            out = np.empty((len(texts), len(vectors[0])), dtype=np.float32)
+        out[start:stop] = vectors
+
+    tasks = [asyncio.ensure_future(run(start, stop)) for start, stop in batches]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    return out if out is not None else np.empty((0, 0), dtype=np.float32)
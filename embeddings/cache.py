@@ -0,0 +1,346 @@
+"""Persistent, content-addressed cache of embedding vectors.
+
+Vectors are keyed by (model key, BLAKE2b hash of the text), so re-indexing
+a corpus only embeds chunks whose text is new, whichever provider produced
+them. Each model's vectors live in one float32 file, ``<model>.f32``, that
+is memory-mapped as a ``(rows, dim)`` array and grows by doubling up to
+`max_entries` rows. A SQLite index (WAL mode, like the chunk cache) maps
+each key to its row and records when it was last used; once a model's
+file is full, the least recently used rows are overwritten.
+
+The row map is transactional but the vector file is not, so each row's key
+is also stored next to it in ``<model>.keys``. Writers clear a row's key,
+write the vector, then set the key; readers accept a row only if its key
+matches before and after copying the vector, so a row reused by another
+process mid-read is a miss rather than someone else's vector. Lookups
+record use in memory; `last_used` is written with the next `put_many`,
+every `_TOUCH_BATCH` hits, or on `flush`/`close`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from common.config import settings
+from common.logger import logger
+from embeddings.base import BaseEmbedder
+
+
+_MIN_ROWS = 1024
+# Keys per SQL "IN (...)" query, below SQLite's variable limit.
+_SQL_BATCH = 500
+# Buffered cache hits that trigger a `last_used` write.
+_TOUCH_BATCH = 4096
+_KEY_BYTES = 16
+
+
+def text_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=_KEY_BYTES).digest()
+
+
+class EmbeddingCache:
+    """Disk-backed LRU store of float32 vectors per (model, text).
+
+    Args:
+        directory: where the index and vector files live.
+        max_entries: rows kept per model before LRU eviction; defaults to
+            `settings.EMBED_CACHE_MAX_ENTRIES`.
+    """
+
+    def __init__(self, directory: Path, max_entries: Optional[int] = None, timeout: float = 60.0) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max(1, int(max_entries or settings.EMBED_CACHE_MAX_ENTRIES))
+        self.hits = 0
+        self.misses = 0
+        self._arrays: Dict[str, Tuple[np.memmap, np.memmap]] = {}
+        self._touched: Dict[Tuple[str, bytes], None] = {}
+        self._conn = sqlite3.connect(str(self.directory / "index.sqlite"), timeout=timeout)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS models ("
+            " model TEXT PRIMARY KEY,"
+            " file TEXT NOT NULL,"
+            " dim INTEGER NOT NULL,"
+            " rows INTEGER NOT NULL,"
+            " used INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " model TEXT NOT NULL,"
+            " key BLOB NOT NULL,"
+            " slot INTEGER NOT NULL,"
+            " last_used INTEGER NOT NULL,"
+            " PRIMARY KEY (model, key))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (model, last_used)")
+        self._conn.commit()
+        self._tick = self._conn.execute("SELECT COALESCE(MAX(last_used), 0) FROM entries").fetchone()[0]
+
+    def _next_tick(self) -> int:
+        self._tick += 1
+        return self._tick
+
+    def _model(self, model: str) -> Optional[Tuple[str, int, int, int]]:
+        return self._conn.execute(
+            "SELECT file, dim, rows, used FROM models WHERE model = ?", (model,)
+        ).fetchone()
+
+    def _array(self, model: str, file: str, dim: int, rows: int) -> Tuple[np.memmap, np.memmap]:
+        """The model's ``(rows, dim)`` vectors and the ``(rows, 16)`` keys beside them."""
+        arrays = self._arrays.get(model)
+        if arrays is None or arrays[0].shape[0] != rows:
+            if arrays is not None:
+                for array in arrays:
+                    array.flush()
+            arrays = self._arrays[model] = (
+                _open_map(self.directory / file, (rows, dim), np.float32),
+                _open_map(self.directory / _keys_file(file), (rows, _KEY_BYTES), np.uint8),
+            )
+        return arrays
+
+    def _slots(self, model: str, keys: Sequence[bytes]) -> Dict[bytes, int]:
+        """Rows of the cached `keys` of `model` (missing keys are absent)."""
+        slots: Dict[bytes, int] = {}
+        unique = list(dict.fromkeys(keys))
+        for i in range(0, len(unique), _SQL_BATCH):
+            batch = unique[i:i + _SQL_BATCH]
+            marks = ",".join("?" * len(batch))
+            slots.update(self._conn.execute(
+                f"SELECT key, slot FROM entries WHERE model = ? AND key IN ({marks})", (model, *batch)
+            ).fetchall())
+        return slots
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Cached vectors of `texts` (copies), `None` for misses."""
+        out: List[Optional[np.ndarray]] = [None] * len(texts)
+        if not texts:
+            return out
+        keys = [text_key(t) for t in texts]
+        # One read transaction, so the model's size and the slots agree.
+        self._conn.execute("BEGIN")
+        try:
+            info = self._model(model)
+            slots = self._slots(model, keys) if info is not None else {}
+            found = [(i, slots[key]) for i, key in enumerate(keys) if key in slots]
+            if found:
+                vectors, stored = self._array(model, info[0], info[1], info[2])
+                rows = np.fromiter((slot for _, slot in found), dtype=np.int64, count=len(found))
+                expected = np.frombuffer(b"".join(keys[i] for i, _ in found), dtype=np.uint8).reshape(-1, _KEY_BYTES)
+                # One fancy-indexed read copies every hit out of the map;
+                # rows whose key changed around the copy were being reused.
+                before = (stored[rows] == expected).all(axis=1)
+                block = vectors[rows]
+                valid = before & (stored[rows] == expected).all(axis=1)
+                found = [hit for hit, ok in zip(found, valid) if ok]
+                for (i, _), vector in zip(found, block[valid]):
+                    out[i] = vector
+        finally:
+            self._conn.rollback()
+
+        self.hits += len(found)
+        self.misses += len(texts) - len(found)
+        for i, _ in found:
+            self._touched[(model, keys[i])] = None
+        if len(self._touched) >= _TOUCH_BATCH:
+            self.flush()
+        return out
+
+    def flush(self) -> None:
+        """Write buffered `last_used` updates from `get_many`."""
+        if not self._touched:
+            return
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._write_touched()
+        except BaseException:
+            self._conn.rollback()
+            raise
+        self._conn.commit()
+
+    def _write_touched(self) -> None:
+        if self._touched:
+            tick = self._next_tick()
+            self._conn.executemany(
+                "UPDATE entries SET last_used = ? WHERE model = ? AND key = ?",
+                [(tick, model, key) for model, key in self._touched],
+            )
+            self._touched.clear()
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: np.ndarray) -> None:
+        """Store `vectors` (one row per text), evicting LRU rows if full."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(texts):
+            return
+        entries: Dict[bytes, np.ndarray] = {}
+        for text, vector in zip(texts, vectors):
+            entries[text_key(text)] = vector
+        if len(entries) > self.max_entries:
+            entries = dict(list(entries.items())[-self.max_entries:])
+
+        # Hold SQLite's write lock from reading `used` and the existing
+        # slots until the rows are written and recorded, so processes
+        # sharing the directory never hand out the same row.
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Recent hits count for the LRU choice below.
+            self._write_touched()
+            dim = vectors.shape[1]
+            info = self._model(model)
+            if info is None:
+                file = f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', model)}-{dim}.f32"
+                rows, used = 0, 0
+                self._conn.execute(
+                    "INSERT INTO models (model, file, dim, rows, used) VALUES (?, ?, ?, 0, 0)", (model, file, dim)
+                )
+            else:
+                file, stored_dim, rows, used = info
+                if stored_dim != dim:
+                    raise ValueError(f"Cached vectors for {model!r} have dimension {stored_dim}, not {dim}")
+
+            existing = self._slots(model, list(entries))
+            new = [key for key in entries if key not in existing]
+
+            free = min(len(new), self.max_entries - used)
+            slots = list(range(used, used + free))
+            used += free
+            if len(new) > free:
+                victims = self._lru_victims(model, set(existing), len(new) - free)
+                self._conn.executemany(
+                    "DELETE FROM entries WHERE model = ? AND key = ?", [(model, key) for key, _ in victims]
+                )
+                slots.extend(slot for _, slot in victims)
+                logger.debug("Evicted {} cached embeddings for {}", len(victims), model)
+
+            if used > rows:
+                rows = min(self.max_entries, max(_MIN_ROWS, rows * 2, used))
+            array, stored = self._array(model, file, dim, rows)
+
+            placed = {**existing, **dict(zip(new, slots))}
+            rows_placed = np.fromiter(placed.values(), dtype=np.int64, count=len(placed))
+            stored[rows_placed] = 0
+            array[rows_placed] = np.stack([entries[key] for key in placed])
+            stored[rows_placed] = np.frombuffer(b"".join(placed), dtype=np.uint8).reshape(-1, _KEY_BYTES)
+            array.flush()
+            stored.flush()
+
+            tick = self._next_tick()
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entries (model, key, slot, last_used) VALUES (?, ?, ?, ?)",
+                [(model, key, slot, tick) for key, slot in placed.items()],
+            )
+            self._conn.execute("UPDATE models SET rows = ?, used = ? WHERE model = ?", (rows, used, model))
+        except BaseException:
+            self._conn.rollback()
+            raise
+        self._conn.commit()
+
+    def _lru_victims(self, model: str, keep: set, count: int) -> List[Tuple[bytes, int]]:
+        victims = []
+        for key, slot in self._conn.execute(
+            "SELECT key, slot FROM entries WHERE model = ? ORDER BY last_used", (model,)
+        ):
+            if key in keep:
+                continue
+            victims.append((key, slot))
+            if len(victims) == count:
+                break
+        return victims
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def clear(self) -> None:
+        self.close_arrays()
+        self._touched.clear()
+        for (file,) in self._conn.execute("SELECT file FROM models").fetchall():
+            (self.directory / file).unlink(missing_ok=True)
+            (self.directory / _keys_file(file)).unlink(missing_ok=True)
+        self._conn.execute("DELETE FROM entries")
+        self._conn.execute("DELETE FROM models")
+        self._conn.commit()
+
+    def close_arrays(self) -> None:
+        for arrays in self._arrays.values():
+            for array in arrays:
+                array.flush()
+        self._arrays = {}
+
+    def close(self) -> None:
+        self.flush()
+        self.close_arrays()
+        self._conn.close()
+
+
+def _keys_file(file: str) -> str:
+    return str(Path(file).with_suffix(".keys"))
+
+
+def _open_map(path: Path, shape: Tuple[int, int], dtype) -> np.memmap:
+    nbytes = shape[0] * shape[1] * np.dtype(dtype).itemsize
+    if not path.exists() or path.stat().st_size < nbytes:
+        with path.open("ab") as f:
+            f.truncate(nbytes)
+    return np.memmap(path, dtype=dtype, mode="r+", shape=shape)
+
+
+class CachedEmbedder(BaseEmbedder):
+    """Wrap any `BaseEmbedder` so unchanged texts are served from a cache.
+
+    Only texts missing from the cache (deduplicated) reach the wrapped
+    embedder. Returned vectors are float32 values whether they were cached
+    or freshly computed, so results do not depend on cache state.
+
+    Args:
+        embedder: the provider to wrap.
+        cache: the store to use; defaults to one under
+            ``settings.DATA_DIR / "cache" / "embeddings"``.
+        model_key: identifies the model in the cache; defaults to the
+            embedder's class and model name.
+    """
+
+    def __init__(
+        self,
+        embedder: BaseEmbedder,
+        cache: Optional[EmbeddingCache] = None,
+        model_key: Optional[str] = None,
+    ) -> None:
+        self.embedder = embedder
+        self.cache = cache if cache is not None else EmbeddingCache(settings.DATA_DIR / "cache" / "embeddings")
+        self.model_key = model_key or model_key_for(embedder)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_array(texts).tolist()
+
+    def embed_array(self, texts: List[str]) -> np.ndarray:
+        vectors = self.cache.get_many(self.model_key, texts)
+        missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+        computed: Dict[str, np.ndarray] = {}
+        if missing:
+            fresh = self.embedder.embed_array(missing)
+            self.cache.put_many(self.model_key, missing, fresh)
+            computed = dict(zip(missing, fresh))
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        first = vectors[0] if vectors[0] is not None else computed[texts[0]]
+        out = np.empty((len(texts), first.shape[0]), dtype=np.float32)
+        for i, (text, vector) in enumerate(zip(texts, vectors)):
+            out[i] = computed[text] if vector is None else vector
+        return out
+
+
+def model_key_for(embedder: BaseEmbedder) -> str:
+    """``<class>:<model>`` for embedders with a ``model_name`` or ``model`` string."""
+    name = getattr(embedder, "model_name", None)
+    if not isinstance(name, str):
+        name = getattr(embedder, "model", None)
+    if not isinstance(name, str):
+        raise ValueError(f"Cannot derive a cache key for {type(embedder).__name__}; pass model_key")
+    return f"{type(embedder).__name__}:{name}"
@@ -1,15 +1,19 @@
 from typing import Optional
 
+from common.config import settings
 from embeddings.base import BaseEmbedder
+from embeddings.cache import CachedEmbedder
 from embeddings.hf_embedder import HuggingFaceEmbedder
 from embeddings.openai_embedder import OpenAIEmbedder
 
 
-def get_embedder(provider: str = "hf", **kwargs) -> BaseEmbedder:
+def get_embedder(provider: str = "hf", cache: Optional[bool] = None, **kwargs) -> BaseEmbedder:
     """Factory function to create an embedder instance.
 
     Args:
         provider: 'hf' for HuggingFace or 'openai' for OpenAI.
+        cache: wrap the embedder in a `CachedEmbedder` that stores vectors on
+            disk by (model, text hash); defaults to `settings.EMBED_CACHE`.
         **kwargs: Additional arguments passed to the embedder constructor.
 
     Returns:
@@ -19,8 +23,12 @@ def get_embedder(provider: str = "hf", **kwargs) -> BaseEmbedder:
         ValueError: If provider is not supported.
     """
     if provider == "openai":
-        return OpenAIEmbedder(**kwargs)
+        embedder: BaseEmbedder = OpenAIEmbedder(**kwargs)
     elif provider == "hf":
-        return HuggingFaceEmbedder(**kwargs)
+        embedder = HuggingFaceEmbedder(**kwargs)
     else:
         raise ValueError(f"Unsupported embedder provider: {provider}")
+
+    if settings.EMBED_CACHE if cache is None else cache:
+        return CachedEmbedder(embedder)
+    return embedder
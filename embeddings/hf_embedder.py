@@ -1,23 +1,84 @@
-from typing import List
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Sequence
 
-from sentence_transformers import SentenceTransformer
+import numpy as np
 
+from common.config import settings
 from embeddings.base import BaseEmbedder
+from embeddings.models import SharedModel
 
 
 class HuggingFaceEmbedder(BaseEmbedder):
-    """Embedder using HuggingFace Sentence Transformers."""
+    """Embedder using HuggingFace Sentence Transformers.
 
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    Each call is one `SentenceTransformer.encode` with `batch_size` texts
+    per forward pass (encode sorts the whole input by length itself);
+    results come back as float32 in input order. `iter_embed` and
+    `iter_embed_arrays` stream an input of any length window by window,
+    so memory stays bounded.
+
+    Args:
+        model_name: SentenceTransformer model to load.
+        batch_size: texts per forward pass; defaults to
+            `settings.EMBED_BATCH_SIZE`.
+        lazy: load the model on first use rather than now.
+
+    The model comes from the process-wide registry in `embeddings.models`,
+    so every embedder and retriever of the same model shares one copy.
+    """
+
+    model = SharedModel()
+
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        batch_size: Optional[int] = None,
+        lazy: bool = False,
+    ):
         self.model_name = model_name
-        try:
-            self.model = SentenceTransformer(model_name)
-        except Exception as e:
-            raise RuntimeError(f"Failed to load SentenceTransformer model '{model_name}': {e}") from e
+        self.batch_size = max(1, int(batch_size or settings.EMBED_BATCH_SIZE))
+        if not lazy:
+            try:
+                self.model
+            except Exception as e:
+                raise RuntimeError(f"Failed to load SentenceTransformer model '{model_name}': {e}") from e
 
-    def embed(self, texts: List[str]) -> List[List[float]]:
+    def _encode(self, texts: Sequence[str]) -> np.ndarray:
+        """Embeddings of `texts` as one float32 array, rows in input order."""
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        vectors = self.model.encode(
+            list(texts),
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+
+    def embed_array(self, texts: List[str]) -> np.ndarray:
         try:
-            embeddings = self.model.encode(texts, convert_to_numpy=True)
-            return embeddings.tolist()
+            return self._encode(texts)
         except Exception as e:
             raise RuntimeError(f"Failed to embed texts with HuggingFace: {e}") from e
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_array(texts).tolist()
+
+    def iter_embed(self, texts: Iterable[str], window: Optional[int] = None) -> Iterator[List[float]]:
+        """Yield embeddings of an arbitrarily long stream of texts, in order.
+
+        Texts are read `window` at a time (default 64 batches) and encoded
+        one window per call, so memory stays bounded.
+        """
+        for block in self.iter_embed_arrays(texts, window):
+            yield from block.tolist()
+
+    def iter_embed_arrays(self, texts: Iterable[str], window: Optional[int] = None) -> Iterator[np.ndarray]:
+        """Like `iter_embed`, but yield one float32 array per window."""
+        window = max(1, int(window or self.batch_size * 64))
+        it = iter(texts)
+        while True:
+            chunk = list(islice(it, window))
+            if not chunk:
+                return
+            yield self.embed_array(chunk)
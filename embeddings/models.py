@@ -0,0 +1,79 @@
+"""Process-wide registry of SentenceTransformer models.
+
+`HuggingFaceEmbedder` and `VectorRetriever` ask the registry instead of
+constructing `SentenceTransformer` themselves, so a process that both
+embeds and queries loads each model once. Loads are serialized per model
+(two threads asking for the same model wait for one load; different models
+load in parallel). A failed load is not remembered, so a later call can
+retry it. ``sentence_transformers`` is imported on the first load, which
+keeps importing this module cheap.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from common.logger import logger
+
+
+_Key = Tuple[str, Optional[str]]
+
+_lock = threading.Lock()
+_load_locks: Dict[_Key, threading.Lock] = {}
+_models: Dict[_Key, Any] = {}
+
+
+def get_sentence_transformer(model_name: str, device: Optional[str] = None) -> Any:
+    """Return the shared `SentenceTransformer` for `model_name` (and `device`)."""
+    key = (model_name, device)
+    model = _models.get(key)
+    if model is not None:
+        return model
+    with _lock:
+        load_lock = _load_locks.setdefault(key, threading.Lock())
+    with load_lock:
+        model = _models.get(key)
+        if model is None:
+            from sentence_transformers import SentenceTransformer
+
+            logger.info("Loading SentenceTransformer model {}", model_name)
+            model = SentenceTransformer(model_name, device=device) if device else SentenceTransformer(model_name)
+            _models[key] = model
+    return model
+
+
+def loaded_models() -> List[str]:
+    """Names of the models loaded so far."""
+    return [name for name, _ in list(_models)]
+
+
+def clear_models() -> None:
+    """Drop every loaded model (the next request reloads it)."""
+    with _lock:
+        _models.clear()
+        _load_locks.clear()
+
+
+class SharedModel:
+    """Descriptor for a ``model`` attribute served by the registry.
+
+    The owner sets ``model_name`` (and optionally ``device``); the model is
+    fetched on first access and kept on the instance. Assigning the
+    attribute replaces it, e.g. with a test double.
+    """
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self._attr = f"_{name}"
+
+    def __get__(self, instance: Any, owner: Optional[type] = None) -> Any:
+        if instance is None:
+            return self
+        model = instance.__dict__.get(self._attr)
+        if model is None:
+            model = get_sentence_transformer(instance.model_name, getattr(instance, "device", None))
+            instance.__dict__[self._attr] = model
+        return model
+
+    def __set__(self, instance: Any, value: Any) -> None:
+        instance.__dict__[self._attr] = value
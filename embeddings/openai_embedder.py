@@ -1,33 +1,104 @@
 from typing import List, Optional
+import asyncio
 import os
+import threading
 
-from openai import OpenAI
+import numpy as np
+from openai import AsyncOpenAI
 
+from common.config import settings
+from common.tokenizer import get_tokenizer
 from embeddings.base import BaseEmbedder
+from embeddings.batching import RateLimiter, embed_batches
 
 
 class OpenAIEmbedder(BaseEmbedder):
-    """Embedder using OpenAI's embedding models."""
+    """Embedder using OpenAI's embedding models.
 
-    def __init__(self, model: str = "text-embedding-3-small", api_key: Optional[str] = None):
+    Texts are split into requests of at most `batch_tokens` tokens and
+    `batch_inputs` inputs, sent `concurrency` at a time under a shared
+    requests/tokens-per-minute limiter, and retried on transient errors
+    (rate limits, timeouts, 5xx). Vectors come back in input order.
+    Unset arguments default to the ``OPENAI_EMBED_*`` settings.
+
+    Args:
+        model: embedding model name.
+        api_key: defaults to ``OPENAI_API_KEY``.
+        base_url: API base URL, e.g. a proxy or a local stub server.
+    """
+
+    def __init__(
+        self,
+        model: str = "text-embedding-3-small",
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        batch_tokens: Optional[int] = None,
+        batch_inputs: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        backoff: float = 1.0,
+    ):
         self.model = model
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OpenAI API key not provided")
-        self._client = None
+        self.base_url = base_url
+        self.batch_tokens = batch_tokens or settings.OPENAI_EMBED_BATCH_TOKENS
+        self.batch_inputs = batch_inputs or settings.OPENAI_EMBED_BATCH_INPUTS
+        self.concurrency = concurrency or settings.OPENAI_EMBED_CONCURRENCY
+        self.max_retries = settings.OPENAI_EMBED_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff = backoff
+        self.limiter = RateLimiter(
+            settings.OPENAI_EMBED_RPM if requests_per_minute is None else requests_per_minute,
+            settings.OPENAI_EMBED_TPM if tokens_per_minute is None else tokens_per_minute,
+        )
 
-    @property
-    def client(self):
-        if self._client is None:
-            self._client = OpenAI(api_key=self.api_key)
-        return self._client
+    async def aembed_array(self, texts: List[str]) -> np.ndarray:
+        """Embed `texts` concurrently; a float32 ``(len(texts), dim)`` array."""
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        counts = get_tokenizer(self.model).count_many(texts)
+        # Retries are ours (with the limiter), not the SDK's.
+        async with AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0) as client:
 
-    def embed(self, texts: List[str]) -> List[List[float]]:
-        try:
-            response = self.client.embeddings.create(
-                model=self.model,
-                input=texts
+            async def request(batch: List[str]) -> List[List[float]]:
+                response = await client.embeddings.create(model=self.model, input=batch)
+                return [d.embedding for d in sorted(response.data, key=lambda d: d.index)]
+
+            return await embed_batches(
+                request, texts, counts, self.batch_tokens, self.batch_inputs,
+                self.concurrency, self.limiter, self.max_retries, self.backoff,
             )
-            return [d.embedding for d in response.data]
+
+    def embed_array(self, texts: List[str]) -> np.ndarray:
+        try:
+            return _run(self.aembed_array(list(texts)))
         except Exception as e:
             raise RuntimeError(f"Failed to embed texts with OpenAI: {e}") from e
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_array(texts).tolist()
+
+
+def _run(coro):
+    """Run `coro` to completion, from a worker thread if a loop is running here."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    result = {}
+
+    def target() -> None:
+        try:
+            result["value"] = asyncio.run(coro)
+        except BaseException as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
@@ -1,15 +1,19 @@
 """Ingestion package public API."""
 
-from .loaders.pdf_loader import load_pdf
-from .loaders.text_loader import load_text
-from .parsers.cleaner import clean_text
+from .loaders.pdf_loader import iter_pdf, load_pdf
+from .loaders.text_loader import iter_text, load_text
+from .parsers.cleaner import clean_text, clean_texts
 from .metadata.enrich import enrich_metadata
-from .run_ingestion import ingest
+from .run_ingestion import ingest, iter_documents
 
 __all__ = [
+	"iter_pdf",
 	"load_pdf",
+	"iter_text",
 	"load_text",
 	"clean_text",
+	"clean_texts",
 	"enrich_metadata",
 	"ingest",
+	"iter_documents",
 ]
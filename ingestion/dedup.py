@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import zlib
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from common.schemas import DocumentSchema, document_key
+
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+# Shingles permuted per step in `MinHasher.signature` (8 MB at 128 perms).
+_SIGNATURE_BLOCK = 8192
+
+DEDUP_MODES = {"drop", "tag"}
+
+
+class MinHasher:
+    """MinHash signatures over word shingles.
+
+    Shingles are hashed with CRC32 and permuted with `num_perm` universal
+    hash functions `(a*x + b) mod p`; `a`, `b` and `x` all fit in 32 bits so
+    the arithmetic is exact in uint64.
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1) -> None:
+        self.num_perm = int(num_perm)
+        self.shingle_size = max(1, int(shingle_size))
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 32, size=self.num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=self.num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> Set[int]:
+        words = text.lower().split()
+        k = self.shingle_size
+        if len(words) <= k:
+            return {zlib.crc32(" ".join(words).encode("utf-8"))} if words else set()
+        return {
+            zlib.crc32(" ".join(words[i:i + k]).encode("utf-8"))
+            for i in range(len(words) - k + 1)
+        }
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = np.fromiter(self.shingles(text), dtype=np.uint64)
+        signature = np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        # Permute a block of shingles at a time so memory stays at
+        # num_perm x _SIGNATURE_BLOCK however long the text is.
+        for start in range(0, hashes.size, _SIGNATURE_BLOCK):
+            block = hashes[start:start + _SIGNATURE_BLOCK]
+            permuted = (np.outer(self._a, block) % _MERSENNE_PRIME + self._b[:, None]) % _MERSENNE_PRIME
+            np.minimum(signature, (permuted & _MAX_HASH).min(axis=1), out=signature)
+        return signature
+
+
+def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return float(np.count_nonzero(sig_a == sig_b)) / len(sig_a)
+
+
+def _band_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """Pick (bands, rows) whose LSH S-curve midpoint is closest to `threshold`."""
+    best = (1, num_perm)
+    best_err = float("inf")
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        midpoint = (1.0 / bands) ** (1.0 / rows)
+        err = abs(midpoint - threshold)
+        if err < best_err:
+            best, best_err = (bands, rows), err
+    return best
+
+
+class LSHIndex:
+    """Banded locality-sensitive hashing index over MinHash signatures."""
+
+    def __init__(self, threshold: float = 0.9, num_perm: int = 128) -> None:
+        self.bands, self.rows = _band_params(threshold, num_perm)
+        self._buckets: List[Dict[bytes, List[str]]] = [defaultdict(list) for _ in range(self.bands)]
+        self._signatures: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _band_keys(self, signature: np.ndarray) -> Iterator[Tuple[int, bytes]]:
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, signature[start:start + self.rows].tobytes()
+
+    def insert(self, key: str, signature: np.ndarray) -> None:
+        self._signatures[key] = signature
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band][band_key].append(key)
+
+    def query(self, signature: np.ndarray) -> Set[str]:
+        candidates: Set[str] = set()
+        for band, band_key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(band_key, ()))
+        return candidates
+
+    def signature(self, key: str) -> np.ndarray:
+        return self._signatures[key]
+
+
+class NearDuplicateFilter:
+    """Detect near-duplicate documents in a stream, keeping the first seen.
+
+    Args:
+        threshold: estimated Jaccard similarity at or above which a
+            document is a near-duplicate of an earlier one.
+        mode: ``"drop"`` removes duplicates; ``"tag"`` keeps them with
+            ``duplicate_of`` and ``duplicate_similarity`` metadata.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        mode: str = "drop",
+        num_perm: int = 128,
+        shingle_size: int = 5,
+    ) -> None:
+        if mode not in DEDUP_MODES:
+            raise ValueError(f"Unsupported dedup mode: {mode}")
+        self.threshold = float(threshold)
+        self.mode = mode
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+        self.index = LSHIndex(threshold=self.threshold, num_perm=num_perm)
+        self.duplicates = 0
+        # Key and similarity of the document the last `process` call matched.
+        self.last_match: Optional[Tuple[str, float]] = None
+        self._sources: Dict[str, str] = {}
+
+    def find_duplicate(self, signature: np.ndarray) -> Optional[Tuple[str, float]]:
+        best: Optional[Tuple[str, float]] = None
+        for key in self.index.query(signature):
+            score = similarity(signature, self.index.signature(key))
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (key, score)
+        return best
+
+    def _insert(self, doc: DocumentSchema, signature: np.ndarray) -> None:
+        key = document_key(doc)
+        self.index.insert(key, signature)
+        self._sources[key] = str(doc.metadata.get("source", ""))
+
+    def source_of(self, key: str) -> str:
+        """The ``source`` metadata of the indexed document `key`."""
+        return self._sources.get(key, "")
+
+    def add(self, doc: DocumentSchema) -> None:
+        """Index `doc` without checking it (e.g. documents already deduped)."""
+        self._insert(doc, self.hasher.signature(doc.content))
+
+    def process(self, doc: DocumentSchema) -> Optional[DocumentSchema]:
+        """Return `doc` (tagged if needed), or `None` if it should be dropped.
+
+        The matched document, if any, is left in `last_match`.
+        """
+        signature = self.hasher.signature(doc.content)
+        match = self.last_match = self.find_duplicate(signature)
+        if match is None:
+            self._insert(doc, signature)
+            return doc
+
+        self.duplicates += 1
+        if self.mode == "drop":
+            return None
+        doc.metadata = {
+            **doc.metadata,
+            "duplicate_of": match[0],
+            "duplicate_similarity": round(match[1], 4),
+        }
+        return doc
+
+    def filter(self, documents: Iterable[DocumentSchema]) -> Iterator[DocumentSchema]:
+        for doc in documents:
+            kept = self.process(doc)
+            if kept is not None:
+                yield kept
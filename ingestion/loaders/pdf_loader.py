@@ -1,34 +1,188 @@
-from typing import List
+from __future__ import annotations
+
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
 from pathlib import Path
 
 from PyPDF2 import PdfReader
 
+from common.logger import logger
+from common.parallel import ordered_map
 from common.schemas import DocumentSchema
 
 
-def load_pdf(path: Path) -> List[DocumentSchema]:
+class PageTimeout(BaseException):
+    """Raised inside a page extraction that exceeded its time budget.
+
+    A `BaseException` so that PyPDF2's own ``except Exception`` handlers,
+    which wrap much of its text extraction, cannot swallow it.
+    """
+
+
+@dataclass
+class PdfExtraction:
+    """Result of `extract_pdf`: the page documents plus pages skipped for
+    exceeding the per-page time budget."""
+
+    documents: List[DocumentSchema] = field(default_factory=list)
+    skipped_pages: List[int] = field(default_factory=list)
+
+
+def _can_interrupt() -> bool:
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+
+@contextmanager
+def _time_limit(seconds: Optional[float]):
+    """Raise `PageTimeout` in the block after `seconds` of wall time.
+
+    Uses `SIGALRM`, so it only interrupts on POSIX in the main thread (which
+    includes process-pool workers). Elsewhere the block runs unbounded and
+    callers fall back to checking the elapsed time afterwards.
+    """
+    if not seconds or not _can_interrupt():
+        yield
+        return
+
+    def _raise(signum, frame):
+        raise PageTimeout()
+
+    previous = signal.signal(signal.SIGALRM, _raise)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _extract_page(reader: PdfReader, page_num: int, page_timeout: Optional[float]) -> Optional[str]:
+    """Return the text of page `page_num`, `""` on errors, or `None` if the
+    page ran over `page_timeout`. Parsing the page object itself counts
+    against the budget too."""
+    started = time.perf_counter()
+    try:
+        with _time_limit(page_timeout):
+            text = reader.pages[page_num].extract_text() or ""
+    except PageTimeout:
+        return None
+    except Exception:
+        text = ""
+
+    if page_timeout and time.perf_counter() - started > page_timeout:
+        return None
+    return text
+
+
+def _page_document(path: Path, page_num: int, text: str) -> DocumentSchema:
+    return DocumentSchema(
+        content=text,
+        metadata={
+            "source": str(path),
+            "page": page_num,
+        },
+    )
+
+
+def iter_pdf(
+    path: Path,
+    page_timeout: Optional[float] = None,
+    skipped_pages: Optional[List[int]] = None,
+) -> Iterator[DocumentSchema]:
+    """Yield one `DocumentSchema` per non-empty page, extracting lazily.
+
+    Pages that take longer than `page_timeout` seconds are skipped; their
+    numbers are appended to `skipped_pages` when a list is given.
+    """
     try:
         reader = PdfReader(str(path))
+        num_pages = len(reader.pages)
     except Exception:
-        return []
+        return
+
+    for page_num in range(num_pages):
+        text = _extract_page(reader, page_num, page_timeout)
+        if text is None:
+            logger.warning("Skipping page {} of {}: exceeded {}s budget", page_num, path, page_timeout)
+            if skipped_pages is not None:
+                skipped_pages.append(page_num)
+            continue
+
+        if text.strip():
+            yield _page_document(path, page_num, text)
+
+
+def _extract_range(task: Tuple[str, int, int, Optional[float]]) -> Tuple[List[Tuple[int, str]], List[int]]:
+    """Extract pages `[start, stop)` of a PDF; runs inside pool workers."""
+    path, start, stop, page_timeout = task
+    pages: List[Tuple[int, str]] = []
+    skipped: List[int] = []
 
-    docs: List[DocumentSchema] = []
+    try:
+        reader = PdfReader(path)
+    except Exception:
+        return pages, skipped
 
-    for page_num, page in enumerate(reader.pages):
+    for page_num in range(start, stop):
+        text = _extract_page(reader, page_num, page_timeout)
+        if text is None:
+            skipped.append(page_num)
+        elif text.strip():
+            pages.append((page_num, text))
+    return pages, skipped
+
+
+def extract_pdf(
+    path: Path,
+    workers: int = 1,
+    page_timeout: Optional[float] = None,
+    min_parallel_pages: int = 64,
+) -> PdfExtraction:
+    """Extract a PDF, spreading page ranges over `workers` processes.
+
+    Small documents (fewer than `min_parallel_pages` pages) and
+    `workers <= 1` are extracted in-process. Page order is preserved.
+    """
+    extraction = PdfExtraction()
+
+    num_pages = 0
+    if workers > 1:
         try:
-            text = page.extract_text() or ""
+            num_pages = len(PdfReader(str(path)).pages)
         except Exception:
-            text = ""
+            return extraction
 
-        if text.strip():
-            docs.append(
-                DocumentSchema(
-                    content=text,
-                    metadata={
-                        "source": str(path),
-                        "page": page_num,
-                    },
-                )
-            )
-
-    return docs
+    if workers <= 1 or num_pages < min_parallel_pages:
+        extraction.documents = list(
+            iter_pdf(path, page_timeout=page_timeout, skipped_pages=extraction.skipped_pages)
+        )
+        return extraction
+
+    # Several ranges per worker so one slow range does not idle the others.
+    step = max(1, -(-num_pages // (workers * 4)))
+    tasks = [
+        (str(path), start, min(start + step, num_pages), page_timeout)
+        for start in range(0, num_pages, step)
+    ]
+    for pages, skipped in ordered_map(_extract_range, tasks, workers=workers):
+        extraction.documents.extend(_page_document(path, n, text) for n, text in pages)
+        extraction.skipped_pages.extend(skipped)
+
+    if extraction.skipped_pages:
+        logger.warning(
+            "Skipped {} pages of {} that exceeded {}s: {}",
+            len(extraction.skipped_pages), path, page_timeout, extraction.skipped_pages,
+        )
+    return extraction
+
+
+def load_pdf(
+    path: Path,
+    workers: int = 1,
+    page_timeout: Optional[float] = None,
+) -> List[DocumentSchema]:
+    return extract_pdf(path, workers=workers, page_timeout=page_timeout).documents
@@ -1,16 +1,18 @@
-from typing import List
+from typing import Iterator, List
 from pathlib import Path
 
 from common.schemas import DocumentSchema
 
 
-def load_text(path: Path) -> List[DocumentSchema]:
+def iter_text(path: Path) -> Iterator[DocumentSchema]:
     with path.open("r", encoding="utf-8") as f:
         text = f.read()
 
-    return [
-        DocumentSchema(
-            content=text,
-            metadata={"source": str(path)}
-        )
-    ]
+    yield DocumentSchema(
+        content=text,
+        metadata={"source": str(path)}
+    )
+
+
+def load_text(path: Path) -> List[DocumentSchema]:
+    return list(iter_text(path))
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from common.logger import logger
+
+
+# 2: entries record `duplicate_of`; older manifests lack it and are ignored.
+MANIFEST_VERSION = 2
+
+
+def file_sha256(path: Path, block_size: int = 1 << 20) -> str:
+    """Return the hex SHA-256 of a file, read in `block_size` chunks."""
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass
+class SourceEntry:
+    """What a source file looked like when it was ingested, and where its
+    documents live in `documents.jsonl` (a contiguous byte range).
+
+    `duplicate_of` lists the sources whose documents some of this source's
+    documents were near-duplicates of (dropped or tagged); the entry is
+    only valid while those sources are unchanged.
+    """
+
+    path: str
+    size: int
+    mtime_ns: int
+    sha256: str
+    offset: int = 0
+    length: int = 0
+    documents: int = 0
+    skipped_pages: List[int] = field(default_factory=list)
+    duplicate_of: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_path(cls, path: Path, **kwargs) -> "SourceEntry":
+        st = path.stat()
+        return cls(
+            path=str(path),
+            size=st.st_size,
+            mtime_ns=st.st_mtime_ns,
+            sha256=file_sha256(path),
+            **kwargs,
+        )
+
+
+class Manifest:
+    """Per-source record of the last ingestion, keyed by source path.
+
+    Used to skip unchanged files on re-ingestion: a file whose size and
+    mtime match is trusted without reading it; otherwise its content hash
+    decides, so a `touch` does not force a re-parse.
+    """
+
+    def __init__(self, entries: Optional[Dict[str, SourceEntry]] = None) -> None:
+        self.entries: Dict[str, SourceEntry] = dict(entries or {})
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[SourceEntry]:
+        return iter(self.entries.values())
+
+    def get(self, path: Path) -> Optional[SourceEntry]:
+        return self.entries.get(str(path))
+
+    def add(self, entry: SourceEntry) -> None:
+        self.entries[entry.path] = entry
+
+    def unchanged_entry(self, path: Path) -> Optional[SourceEntry]:
+        """Return the recorded entry if `path` still has the same content.
+
+        The returned entry carries the current mtime, so callers can store
+        it back without re-hashing next time.
+        """
+        entry = self.get(path)
+        if entry is None:
+            return None
+
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+
+        if st.st_size != entry.size:
+            return None
+        if st.st_mtime_ns == entry.mtime_ns:
+            return entry
+        if file_sha256(path) == entry.sha256:
+            return replace(entry, mtime_ns=st.st_mtime_ns)
+        return None
+
+    @classmethod
+    def from_records(cls, records: List[dict]) -> "Manifest":
+        return cls({e["path"]: SourceEntry(**e) for e in records})
+
+    def to_records(self) -> List[dict]:
+        return [asdict(e) for e in self.entries.values()]
+
+    @classmethod
+    def load(cls, path: Path) -> "Manifest":
+        """Load a manifest; a missing or unreadable file yields an empty one."""
+        data = _read_versioned(path)
+        return cls.from_records(data["sources"]) if data else cls()
+
+    def save(self, path: Path) -> None:
+        """Write the manifest atomically (temp file + rename)."""
+        _write_versioned(path, {"sources": self.to_records()})
+
+
+@dataclass
+class Checkpoint:
+    """Progress of an interrupted ingestion run.
+
+    `manifest` holds the sources completed so far and `output_offset` the
+    size of `documents.jsonl` once they were written; anything past it
+    belongs to a partially written source and is discarded on resume.
+    """
+
+    output_offset: int
+    manifest: Manifest
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["Checkpoint"]:
+        data = _read_versioned(path)
+        if not data:
+            return None
+        return cls(
+            output_offset=int(data["output_offset"]),
+            manifest=Manifest.from_records(data["sources"]),
+        )
+
+    def save(self, path: Path) -> None:
+        _write_versioned(
+            path,
+            {"output_offset": self.output_offset, "sources": self.manifest.to_records()},
+        )
+
+
+def _read_versioned(path: Path) -> Optional[dict]:
+    if not path.exists():
+        return None
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != MANIFEST_VERSION:
+            logger.warning("Ignoring {} with unknown version", path)
+            return None
+        return data
+    except Exception as e:
+        logger.warning("Ignoring unreadable {}: {}", path, e)
+        return None
+
+
+def _write_versioned(path: Path, data: dict) -> None:
+    """Write JSON atomically (temp file + rename)."""
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump({"version": MANIFEST_VERSION, **data}, f)
+    os.replace(tmp, path)
@@ -1,23 +1,37 @@
 import re
 import unicodedata
-from typing import Optional
+from typing import Iterable, List, Optional
+
+
+_NUL_RUN = re.compile("\x00+")
 
 
 def clean_text(text: Optional[str]) -> str:
     """Normalize and clean raw text.
 
-    - Normalize unicode to NFC
-    - Replace multiple whitespace with single space
+    - Normalize unicode to NFC (skipped when the text already is NFC)
     - Remove null characters
+    - Replace multiple whitespace with single space
     - Strip leading/trailing whitespace
+
+    NULs are dropped before whitespace is collapsed, so a NUL between two
+    whitespace runs does not leave a double space behind.
     """
     if not text:
         return ""
 
-    # Normalize unicode to avoid combining-character surprises
-    normalized = unicodedata.normalize("NFC", text)
-    # Collapse whitespace
-    collapsed = re.sub(r"\s+", " ", normalized)
-    # Remove nulls
-    collapsed = collapsed.replace("\x00", "")
-    return collapsed.strip()
+    # Normalize unicode to avoid combining-character surprises; the check
+    # is a fast scan for the common already-normalized case.
+    if not unicodedata.is_normalized("NFC", text):
+        text = unicodedata.normalize("NFC", text)
+    # Remove nulls (rare, so guard with a cheap membership test)
+    if "\x00" in text:
+        text = _NUL_RUN.sub("", text)
+    # Collapse and strip whitespace in one pass; str.split() uses the same
+    # whitespace definition as the regex `\s`.
+    return " ".join(text.split())
+
+
+def clean_texts(texts: Iterable[Optional[str]]) -> List[str]:
+    """Clean a batch of texts, e.g. all pages of a document."""
+    return [clean_text(t) for t in texts]
@@ -1,56 +1,673 @@
 from __future__ import annotations
 
+import os
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass, field, replace
+from functools import partial
 from pathlib import Path
-from typing import List
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional
 
 from tqdm import tqdm
 
 from common.config import settings
 from common.logger import logger
-from ingestion.loaders.pdf_loader import load_pdf
-from ingestion.loaders.text_loader import load_text
+from common.parallel import ordered_map
+from common.records import RecordWriter, parse_bytes, records_path
+from ingestion.loaders.pdf_loader import extract_pdf, iter_pdf
+from ingestion.loaders.text_loader import iter_text
 from ingestion.parsers.cleaner import clean_text
 from ingestion.metadata.enrich import enrich_metadata
+from ingestion.manifest import Checkpoint, Manifest, SourceEntry
+from ingestion.dedup import NearDuplicateFilter
 from common.schemas import DocumentSchema
 
 
 RAW_DIR = settings.DATA_DIR / "raw"
 OUT_DIR = settings.DATA_DIR / "processed"
+DOCUMENTS_FILE = "documents.jsonl"
+MANIFEST_FILE = "manifest.json"
+CHECKPOINT_FILE = "ingest.checkpoint.json"
 
+PDF_SUFFIXES = {".pdf"}
+TEXT_SUFFIXES = {".txt", ".md"}
 
-def _serialize_doc(doc: DocumentSchema) -> str:
-    if hasattr(doc, "model_dump_json"):
-        return doc.model_dump_json()
-    return doc.json()
 
+@dataclass
+class _SourceResult:
+    """Documents loaded from one source file plus the worker that produced them.
 
-def ingest() -> List[DocumentSchema]:
+    In-process results carry a lazy `documents` iterator and no `seconds`;
+    the consumer times them while draining the iterator.
+    """
+
+    path: Path
+    documents: Iterable[DocumentSchema]
+    worker: int
+    size: int
+    seconds: Optional[float] = None
+    skipped_pages: List[int] = field(default_factory=list)
+
+
+@dataclass
+class _WorkerStats:
+    files: int = 0
+    documents: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+
+def documents_path() -> Path:
+    """Path of the ingestion output in the configured record format."""
+    return records_path(OUT_DIR / DOCUMENTS_FILE)
+
+
+def _is_supported(path: Path) -> bool:
+    suffix = path.suffix.lower()
+    return suffix in PDF_SUFFIXES or suffix in TEXT_SUFFIXES
+
+
+def discover_sources(raw_dir: Path, recursive: bool = False) -> List[Path]:
+    """Return supported source files in `raw_dir`, sorted for a stable output order.
+
+    With `recursive` the whole tree below `raw_dir` is searched.
+    """
+    if not raw_dir.exists():
+        return []
+    candidates = raw_dir.rglob("*") if recursive else raw_dir.iterdir()
+    return sorted(p for p in candidates if p.is_file() and _is_supported(p))
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def _iter_source(
+    path: Path,
+    page_timeout: Optional[float] = None,
+    pdf_workers: int = 1,
+    skipped_pages: Optional[List[int]] = None,
+) -> Iterator[DocumentSchema]:
+    """Yield cleaned documents from a single source file, one page at a time.
+
+    With `pdf_workers > 1` large PDFs are extracted page-parallel instead,
+    which materializes that file's pages before yielding them.
+    """
+    if path.suffix.lower() not in PDF_SUFFIXES:
+        docs: Iterable[DocumentSchema] = iter_text(path)
+    elif pdf_workers > 1:
+        extraction = extract_pdf(
+            path,
+            workers=pdf_workers,
+            page_timeout=page_timeout,
+            min_parallel_pages=settings.PDF_PARALLEL_MIN_PAGES,
+        )
+        if skipped_pages is not None:
+            skipped_pages.extend(extraction.skipped_pages)
+        docs = extraction.documents
+    else:
+        docs = iter_pdf(path, page_timeout=page_timeout, skipped_pages=skipped_pages)
+
+    for doc in docs:
+        doc.content = clean_text(doc.content)
+        yield doc
+
+
+def _load_source(path: Path, page_timeout: Optional[float] = None) -> _SourceResult:
+    """Load and clean a whole source file.
+
+    Runs inside pool workers, so it only depends on module-level callables.
+    """
+    started = time.perf_counter()
+    skipped: List[int] = []
+    docs = list(_iter_source(path, page_timeout=page_timeout, skipped_pages=skipped))
+    return _SourceResult(
+        path=path,
+        documents=docs,
+        worker=os.getpid(),
+        size=_file_size(path),
+        seconds=time.perf_counter() - started,
+        skipped_pages=skipped,
+    )
+
+
+def _iter_results(
+    sources: List[Path],
+    workers: int,
+    page_timeout: Optional[float] = None,
+    pdf_workers: int = 1,
+) -> Iterator[_SourceResult]:
+    if workers > 1:
+        # File-level parallelism already saturates the pool; pool workers
+        # cannot start nested pools, so PDFs are extracted page-serially.
+        load = partial(_load_source, page_timeout=page_timeout)
+        yield from ordered_map(load, sources, workers=workers)
+        return
+
+    # Serial mode stays fully lazy: pages are pulled from the loader only
+    # as the consumer writes them out.
+    for path in sources:
+        skipped: List[int] = []
+        yield _SourceResult(
+            path=path,
+            documents=_iter_source(
+                path,
+                page_timeout=page_timeout,
+                pdf_workers=pdf_workers,
+                skipped_pages=skipped,
+            ),
+            worker=os.getpid(),
+            size=_file_size(path),
+            skipped_pages=skipped,
+        )
+
+
+def _log_worker_stats(stats: Dict[int, _WorkerStats], wall_seconds: float) -> None:
+    for worker, s in sorted(stats.items()):
+        rate = s.documents / s.seconds if s.seconds else 0.0
+        mb_rate = s.bytes / (1024 * 1024) / s.seconds if s.seconds else 0.0
+        logger.info(
+            "Worker {}: {} files, {} documents in {:.2f}s ({:.1f} docs/s, {:.2f} MB/s)",
+            worker, s.files, s.documents, s.seconds, rate, mb_rate,
+        )
+    total_docs = sum(s.documents for s in stats.values())
+    if total_docs and wall_seconds > 0:
+        logger.info(
+            "Ingestion throughput: {:.1f} docs/s over {:.2f}s wall time",
+            total_docs / wall_seconds, wall_seconds,
+        )
+
+
+def _drain(result: _SourceResult, stats: Dict[int, _WorkerStats]) -> Iterator[DocumentSchema]:
+    """Enrich and yield the documents of one source, recording worker stats."""
+    started = time.perf_counter()
+    count = 0
+    for doc in result.documents:
+        doc.metadata = enrich_metadata(doc.metadata)
+        count += 1
+        yield doc
+
+    s = stats.setdefault(result.worker, _WorkerStats())
+    s.files += 1
+    s.documents += count
+    s.bytes += result.size
+    s.seconds += (
+        result.seconds
+        if result.seconds is not None
+        else time.perf_counter() - started
+    )
+
+
+def _page_timeout(page_timeout: Optional[float]) -> Optional[float]:
+    value = settings.PDF_PAGE_TIMEOUT if page_timeout is None else page_timeout
+    return value if value and value > 0 else None
+
+
+def _dedup_filter(
+    threshold: Optional[float], mode: Optional[str]
+) -> Optional[NearDuplicateFilter]:
+    threshold = settings.DEDUP_THRESHOLD if threshold is None else threshold
+    if not threshold or threshold <= 0:
+        return None
+    return NearDuplicateFilter(threshold=threshold, mode=mode or settings.DEDUP_MODE)
+
+
+def _dedup_document(
+    dedup: NearDuplicateFilter, doc: DocumentSchema, duplicate_of: List[str]
+) -> Optional[DocumentSchema]:
+    """`dedup.process(doc)`, adding the matched document's source (if it is
+    another source) to `duplicate_of`."""
+    source = str(doc.metadata.get("source", ""))
+    kept = dedup.process(doc)
+    if dedup.last_match is not None:
+        matched = dedup.source_of(dedup.last_match[0])
+        if matched and matched != source and matched not in duplicate_of:
+            duplicate_of.append(matched)
+    return kept
+
+
+@dataclass
+class _IngestedSource:
+    """One source going through load -> clean -> enrich -> dedup.
+
+    `documents` is lazy and must be drained before the next source is
+    requested; `duplicate_of` is complete once it has been.
+    """
+
+    path: Path
+    documents: Iterator[DocumentSchema]
+    skipped_pages: List[int]
+    duplicate_of: List[str]
+
+
+def _dedup_source(
+    docs: Iterable[DocumentSchema], dedup: Optional[NearDuplicateFilter], duplicate_of: List[str]
+) -> Iterator[DocumentSchema]:
+    for doc in docs:
+        if dedup is not None:
+            doc = _dedup_document(dedup, doc, duplicate_of)
+            if doc is None:
+                continue
+        yield doc
+
+
+def _ingest_sources(
+    sources: List[Path],
+    workers: int,
+    page_timeout: Optional[float],
+    pdf_workers: int,
+    dedup: Optional[NearDuplicateFilter],
+    stats: Dict[int, _WorkerStats],
+) -> Iterator[_IngestedSource]:
+    """The ingestion pipeline for `sources`, one `_IngestedSource` each, in order."""
+    for path, result in zip(sources, _iter_results(sources, workers, _page_timeout(page_timeout), pdf_workers)):
+        duplicate_of: List[str] = []
+        yield _IngestedSource(
+            path=path,
+            documents=_dedup_source(_drain(result, stats), dedup, duplicate_of),
+            skipped_pages=result.skipped_pages,
+            duplicate_of=duplicate_of,
+        )
+
+
+def _log_dedup(dedup: Optional[NearDuplicateFilter]) -> None:
+    if dedup is not None and dedup.duplicates:
+        logger.info(
+            "{} {} near-duplicate documents (threshold {})",
+            "Dropped" if dedup.mode == "drop" else "Tagged", dedup.duplicates, dedup.threshold,
+        )
+
+
+def iter_documents(
+    workers: Optional[int] = None,
+    page_timeout: Optional[float] = None,
+    pdf_workers: Optional[int] = None,
+    dedup_threshold: Optional[float] = None,
+    dedup_mode: Optional[str] = None,
+    recursive: bool = False,
+) -> Iterator[DocumentSchema]:
+    """Yield cleaned, enriched documents for every supported file in `RAW_DIR`.
+
+    Args:
+        workers: number of processes used to load and clean source files.
+            Defaults to `settings.INGEST_WORKERS`; `1` runs in-process and
+            holds a single page in memory at a time, otherwise at most a
+            bounded window of whole files is buffered. Output order is the
+            sorted file order regardless of `workers`.
+        page_timeout: per-page PDF extraction budget in seconds; slower
+            pages are skipped. Defaults to `settings.PDF_PAGE_TIMEOUT`.
+        pdf_workers: processes used to extract a single large PDF page-
+            parallel when `workers` is 1. Defaults to `settings.PDF_WORKERS`.
+        dedup_threshold, dedup_mode: near-duplicate handling, see `ingest`.
+        recursive: also ingest files in subdirectories of `RAW_DIR`.
+    """
+    workers = settings.INGEST_WORKERS if workers is None else workers
+    pdf_workers = settings.PDF_WORKERS if pdf_workers is None else pdf_workers
+    sources = discover_sources(RAW_DIR, recursive=recursive)
+    stats: Dict[int, _WorkerStats] = {}
+    dedup = _dedup_filter(dedup_threshold, dedup_mode)
+
+    started = time.perf_counter()
+    for source in tqdm(_ingest_sources(sources, workers, page_timeout, pdf_workers, dedup, stats), total=len(sources)):
+        yield from source.documents
+
+    total = sum(s.documents for s in stats.values())
+    logger.info("Ingested {} documents from {} files", total, len(sources))
+    _log_dedup(dedup)
+    _log_worker_stats(stats, time.perf_counter() - started)
+
+
+class DocumentWriter:
+    """Append documents to a binary record file, tracking byte offsets.
+
+    JSON lines are flushed per document so a crash loses at most the
+    document in flight; EGPR buffers a source's documents and writes them as
+    one block in `end_source()`. Either way each source occupies a
+    contiguous byte range the manifest can point at for later reuse.
+    """
+
+    def __init__(self, out: BinaryIO, fmt: Optional[str] = None) -> None:
+        self._records = RecordWriter(out, fmt or settings.RECORD_FORMAT)
+
+    @property
+    def format(self) -> str:
+        return self._records.format
+
+    def tell(self) -> int:
+        return self._records.tell()
+
+    def write(self, doc: DocumentSchema) -> None:
+        self._records.write(doc)
+        if self.format == "jsonl":
+            self._records.flush()
+
+    def end_source(self) -> None:
+        """Close the current source's byte range."""
+        self._records.flush()
+
+    def write_source(
+        self, source: _IngestedSource, collect: Optional[List[DocumentSchema]] = None
+    ) -> SourceEntry:
+        """Write all of `source` as one byte range and return its manifest entry.
+
+        Documents are also appended to `collect` when given.
+        """
+        offset = self.tell()
+        count = 0
+        for doc in source.documents:
+            self.write(doc)
+            count += 1
+            if collect is not None:
+                collect.append(doc)
+        self.end_source()
+        return SourceEntry.from_path(
+            source.path,
+            offset=offset,
+            length=self.tell() - offset,
+            documents=count,
+            skipped_pages=source.skipped_pages,
+            duplicate_of=source.duplicate_of,
+        )
+
+    def copy_from(self, src: BinaryIO, offset: int, length: int, keep: bool = False) -> bytes:
+        """Copy `length` raw bytes starting at `offset` in `src`.
+
+        Returns the copied bytes when `keep` is true, otherwise `b""`.
+        """
+        src.seek(offset)
+        remaining = length
+        kept = []
+        while remaining > 0:
+            block = src.read(min(1 << 20, remaining))
+            if not block:
+                raise IOError(f"Unexpected end of file while copying {length} bytes at {offset}")
+            self._records.write_raw(block)
+            if keep:
+                kept.append(block)
+            remaining -= len(block)
+        return b"".join(kept)
+
+
+def _parse_block(block: bytes, fmt: str) -> List[DocumentSchema]:
+    return [DocumentSchema(**record) for record in parse_bytes(block, fmt)]
+
+
+def _reusable_entries(
+    previous: Manifest, pending: List[Path], done: Manifest
+) -> Dict[Path, SourceEntry]:
+    """Entries of `previous` whose output can be carried forward.
+
+    A source qualifies when its content is unchanged and so is every source
+    it was deduplicated against (`duplicate_of`), so documents dropped as
+    near-duplicates come back once the document they duplicated changes or
+    disappears. Sources in `done` (completed before a resume) count as
+    unchanged if their hash matches `previous`.
+    """
+    reusable: Dict[Path, SourceEntry] = {}
+    for path in pending:
+        entry = previous.unchanged_entry(path)
+        if entry is not None:
+            reusable[path] = entry
+
+    stable = set()
+    for entry in done:
+        before = previous.entries.get(entry.path)
+        if before is not None and before.sha256 == entry.sha256:
+            stable.add(entry.path)
+
+    while True:
+        valid = stable | {str(p) for p in reusable}
+        stale = [p for p, e in reusable.items() if not valid.issuperset(e.duplicate_of)]
+        if not stale:
+            return reusable
+        for path in stale:
+            del reusable[path]
+
+
+def _carry_forward(
+    docs: List[DocumentSchema], dedup: Optional[NearDuplicateFilter], collect: Optional[List[DocumentSchema]]
+) -> None:
+    """Index already-written documents for dedup and collect them, unchanged."""
+    for doc in docs:
+        if dedup is not None:
+            dedup.add(doc)
+        if collect is not None:
+            collect.append(doc)
+
+
+def _resumable_checkpoint(checkpoint_path: Path, out_path: Path) -> Optional[Checkpoint]:
+    checkpoint = Checkpoint.load(checkpoint_path)
+    if checkpoint is None:
+        return None
+    if not out_path.exists() or out_path.stat().st_size < checkpoint.output_offset:
+        logger.warning("Discarding checkpoint {}: output is missing or truncated", checkpoint_path)
+        return None
+    return _validate_checkpoint(checkpoint)
+
+
+def _validate_checkpoint(checkpoint: Checkpoint) -> Checkpoint:
+    """Keep the checkpointed sources up to the first one modified or deleted
+    since it was written.
+
+    Sources occupy consecutive output ranges in ingestion order, so cutting
+    the output at the first stale source keeps the rest in order; that
+    source and every later one are ingested again (or dropped, if gone).
+    """
+    kept = Manifest()
+    output_offset = checkpoint.output_offset
+    for entry in sorted(checkpoint.manifest, key=lambda e: e.offset):
+        current = checkpoint.manifest.unchanged_entry(Path(entry.path))
+        if current is None:
+            logger.info("{} changed since the checkpoint; resuming from it", entry.path)
+            output_offset = entry.offset
+            break
+        kept.add(current)
+    return Checkpoint(output_offset=output_offset, manifest=kept)
+
+
+def ingest(
+    workers: Optional[int] = None,
+    collect: bool = False,
+    incremental: bool = False,
+    page_timeout: Optional[float] = None,
+    pdf_workers: Optional[int] = None,
+    dedup_threshold: Optional[float] = None,
+    dedup_mode: Optional[str] = None,
+    resume: bool = True,
+    checkpoint_every: Optional[int] = None,
+    recursive: bool = False,
+) -> Optional[List[DocumentSchema]]:
+    """Ingest `RAW_DIR` into `documents_path()`.
+
+    Documents are streamed to disk as soon as they are cleaned, so memory
+    does not grow with the corpus and a crash keeps everything written so
+    far. A manifest of every source's size, mtime, content hash and byte
+    range in the output is written next to it.
+
+    Args:
+        workers, page_timeout, pdf_workers: see `iter_documents`. Pages
+            skipped for exceeding `page_timeout` are recorded per source in
+            the manifest.
+        collect: also keep every document in memory and return them as a
+            list. Off by default because it reintroduces O(corpus) memory.
+        incremental: reuse the previous run's output for sources whose
+            content is unchanged according to the manifest; only new and
+            modified files are parsed. Deleted files are dropped.
+        dedup_threshold: estimated Jaccard similarity above which a
+            document counts as a near-duplicate of an earlier one (MinHash
+            over word shingles, LSH candidate lookup). Defaults to
+            `settings.DEDUP_THRESHOLD`; `0` disables deduplication.
+            Carried-forward documents are indexed but not re-checked; a
+            source whose documents duplicated another source's is
+            re-ingested whenever that source changes or is deleted.
+        dedup_mode: ``"drop"`` or ``"tag"`` near-duplicates. Defaults to
+            `settings.DEDUP_MODE`.
+        resume: continue an interrupted run from its checkpoint, appending
+            to the existing output. Checkpointed sources are re-validated
+            against the files on disk; from the first one modified or
+            deleted since, the run continues as if it had not been done.
+            With `False` any checkpoint is ignored and the run starts over.
+        checkpoint_every: record progress after this many completed source
+            files. Defaults to `settings.INGEST_CHECKPOINT_EVERY`; `0`
+            disables checkpointing.
+        recursive: also ingest files in subdirectories of `RAW_DIR`.
+
+    Returns:
+        The ingested documents when `collect` is true, otherwise `None`.
+    """
     OUT_DIR.mkdir(parents=True, exist_ok=True)
+    workers = settings.INGEST_WORKERS if workers is None else workers
+    pdf_workers = settings.PDF_WORKERS if pdf_workers is None else pdf_workers
+    if checkpoint_every is None:
+        checkpoint_every = settings.INGEST_CHECKPOINT_EVERY
+
+    out_path = documents_path()
+    manifest_path = OUT_DIR / MANIFEST_FILE
+    checkpoint_path = OUT_DIR / CHECKPOINT_FILE
+    # Previous complete output while an incremental run is in progress.
+    prev_path = out_path.with_name(out_path.name + ".prev")
 
+    checkpoint = _resumable_checkpoint(checkpoint_path, out_path) if resume else None
+    manifest = checkpoint.manifest if checkpoint is not None else Manifest()
+
+    sources = discover_sources(RAW_DIR, recursive=recursive)
+    pending = [p for p in sources if manifest.get(p) is None]
+    if checkpoint is not None:
+        logger.info(
+            "Resuming ingestion: {} sources already done, {} remaining",
+            len(manifest), len(pending),
+        )
+
+    reusable: Dict[Path, SourceEntry] = {}
+    if incremental:
+        previous_output = None
+        if prev_path.exists():
+            previous_output = prev_path
+        elif checkpoint is None and out_path.exists():
+            previous_output = out_path
+
+        if previous_output is not None:
+            previous = Manifest.load(manifest_path)
+            reusable = _reusable_entries(previous, pending, manifest)
+            if reusable and previous_output == out_path:
+                os.replace(out_path, prev_path)
+
+    changed = [p for p in pending if p not in reusable]
+    if incremental:
+        logger.info("{} sources unchanged, {} to ingest", len(reusable), len(changed))
+
+    dedup = _dedup_filter(dedup_threshold, dedup_mode)
     documents: List[DocumentSchema] = []
+    stats: Dict[int, _WorkerStats] = {}
+    ingested = _ingest_sources(changed, workers, page_timeout, pdf_workers, dedup, stats)
 
-    for file in tqdm(list(RAW_DIR.iterdir()) if RAW_DIR.exists() else []):
-        path = file
-        if path.suffix.lower() == ".pdf":
-            docs = load_pdf(path)
-        elif path.suffix.lower() in {".txt", ".md"}:
-            docs = load_text(path)
+    started = time.perf_counter()
+    with ExitStack() as stack:
+        if checkpoint is not None:
+            out = stack.enter_context(out_path.open("r+b"))
+            out.truncate(checkpoint.output_offset)
+            if collect or dedup is not None:
+                _carry_forward(_parse_block(out.read(), settings.RECORD_FORMAT), dedup, documents if collect else None)
+            out.seek(checkpoint.output_offset)
         else:
-            continue
+            out = stack.enter_context(out_path.open("wb"))
+
+        writer = DocumentWriter(out)
+        prev = stack.enter_context(prev_path.open("rb")) if reusable else None
+        since_checkpoint = 0
+
+        for path in tqdm(pending):
+            offset = writer.tell()
+            entry = reusable.get(path)
+
+            if entry is not None:
+                keep = collect or dedup is not None
+                block = writer.copy_from(prev, entry.offset, entry.length, keep=keep)
+                if keep:
+                    _carry_forward(_parse_block(block, writer.format), dedup, documents if collect else None)
+                manifest.add(replace(entry, offset=offset))
+            else:
+                manifest.add(writer.write_source(next(ingested), documents if collect else None))
+
+            since_checkpoint += 1
+            if checkpoint_every and since_checkpoint >= checkpoint_every:
+                Checkpoint(output_offset=writer.tell(), manifest=manifest).save(checkpoint_path)
+                since_checkpoint = 0
+
+    manifest.save(manifest_path)
+    for path in (prev_path, checkpoint_path):
+        if path.exists():
+            path.unlink()
+
+    total = sum(e.documents for e in manifest)
+    logger.info("Ingested {} documents from {} files", total, len(manifest))
+    _log_dedup(dedup)
+    _log_worker_stats(stats, time.perf_counter() - started)
+
+    return documents if collect else None
+
+
+def _seed_dedup(
+    dedup: NearDuplicateFilter, manifest: Manifest, out_path: Path, exclude: List[Path]
+) -> None:
+    """Index the documents `manifest` references in `out_path`, except those
+    of the sources in `exclude` (which are about to be replaced)."""
+    skip = {str(p) for p in exclude}
+    entries = sorted((e for e in manifest if e.path not in skip and e.length), key=lambda e: e.offset)
+    if not entries or not out_path.exists():
+        return
+    with out_path.open("rb") as f:
+        for entry in entries:
+            f.seek(entry.offset)
+            for doc in _parse_block(f.read(entry.length), settings.RECORD_FORMAT):
+                dedup.add(doc)
+
+
+def ingest_paths(
+    paths: List[Path],
+    workers: Optional[int] = None,
+    page_timeout: Optional[float] = None,
+    pdf_workers: Optional[int] = None,
+    dedup_threshold: Optional[float] = None,
+    dedup_mode: Optional[str] = None,
+) -> int:
+    """Append the documents of `paths` to the existing output.
+
+    The manifest entry of each path is replaced by the newly written block,
+    so a modified file's previous documents become unreferenced; they stay
+    in the output until the next full or incremental `ingest()`,
+    which only copies referenced blocks. With deduplication enabled (see
+    `ingest`), the new documents are checked against every document the
+    manifest still references. Returns the number of documents written.
+    """
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+    workers = settings.INGEST_WORKERS if workers is None else workers
+    pdf_workers = settings.PDF_WORKERS if pdf_workers is None else pdf_workers
 
-        for doc in docs:
-            doc.content = clean_text(doc.content)
-            doc.metadata = enrich_metadata(doc.metadata)
-            documents.append(doc)
+    out_path = documents_path()
+    manifest_path = OUT_DIR / MANIFEST_FILE
+    manifest = Manifest.load(manifest_path)
+    stats: Dict[int, _WorkerStats] = {}
+    total = 0
 
-    logger.info("Ingested %d documents", len(documents))
+    dedup = _dedup_filter(dedup_threshold, dedup_mode)
+    if dedup is not None:
+        _seed_dedup(dedup, manifest, out_path, paths)
 
-    out_path = OUT_DIR / "documents.jsonl"
-    with out_path.open("w", encoding="utf-8") as f:
-        for doc in documents:
-            f.write(_serialize_doc(doc) + "\n")
+    with out_path.open("ab") as out:
+        writer = DocumentWriter(out)
+        for source in _ingest_sources(paths, workers, page_timeout, pdf_workers, dedup, stats):
+            entry = writer.write_source(source)
+            manifest.add(entry)
+            total += entry.documents
 
-    return documents
+    manifest.save(manifest_path)
+    logger.info("Appended {} documents from {} files", total, len(paths))
+    _log_dedup(dedup)
+    return total
 
 
 if __name__ == "__main__":
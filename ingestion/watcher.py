@@ -0,0 +1,148 @@
+"""Long-running ingestion that picks up new and modified files in `RAW_DIR`.
+
+The watcher polls the raw tree (recursively by default) and compares each
+file with the ingestion manifest. Files that are new or whose content
+changed are ingested once their size and mtime have been stable for one
+poll, so half-copied files are not parsed, and their documents are
+appended to the ingestion output.
+
+Appending leaves the previous documents of modified files in the output,
+and deleted files keep theirs until the manifest drops them. Downstream
+stages read the whole output, so whenever a poll leaves unreferenced bytes
+or deleted sources behind, the watcher compacts it with an incremental
+`ingest()` (which copies only referenced blocks, without re-parsing them
+unless deduplication needs them).
+"""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from common.config import settings
+from common.logger import logger
+from ingestion import run_ingestion
+from ingestion.manifest import Manifest
+
+
+Snapshot = Dict[Path, Tuple[int, int]]
+
+
+def _snapshot(paths: List[Path]) -> Snapshot:
+    snap: Snapshot = {}
+    for path in paths:
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        snap[path] = (st.st_size, st.st_mtime_ns)
+    return snap
+
+
+def _unreferenced_bytes(manifest: Manifest, out_path: Path) -> int:
+    if not out_path.exists():
+        return 0
+    return out_path.stat().st_size - sum(e.length for e in manifest)
+
+
+def find_changes(manifest: Manifest, snapshot: Snapshot) -> Tuple[List[Path], bool]:
+    """Return paths in `snapshot` that are new or changed since the manifest.
+
+    Files whose mtime moved but whose content hash did not are refreshed in
+    `manifest` so they are not re-hashed on every poll; the returned flag
+    tells the caller the manifest needs saving.
+    """
+    changed = []
+    touched = False
+    for path in snapshot:
+        entry = manifest.unchanged_entry(path)
+        if entry is None:
+            changed.append(path)
+        elif entry.mtime_ns != manifest.get(path).mtime_ns:
+            manifest.add(entry)
+            touched = True
+    return sorted(changed), touched
+
+
+def dependents(manifest: Manifest, changed: List[Path], snapshot: Snapshot) -> List[Path]:
+    """Existing sources deduplicated against any of `changed` (see
+    `SourceEntry.duplicate_of`), which must be ingested again with them."""
+    changed_paths = {str(p) for p in changed}
+    return sorted(
+        Path(e.path) for e in manifest
+        if changed_paths.intersection(e.duplicate_of)
+        and e.path not in changed_paths
+        and Path(e.path) in snapshot
+    )
+
+
+def watch(
+    interval: Optional[float] = None,
+    recursive: bool = True,
+    workers: Optional[int] = None,
+    max_cycles: Optional[int] = None,
+    page_timeout: Optional[float] = None,
+    pdf_workers: Optional[int] = None,
+    dedup_threshold: Optional[float] = None,
+    dedup_mode: Optional[str] = None,
+) -> None:
+    """Poll `RAW_DIR` every `interval` seconds and ingest deltas.
+
+    Args:
+        interval: seconds between polls; defaults to
+            `settings.INGEST_WATCH_INTERVAL`.
+        recursive: discover files in subdirectories as well.
+        workers, page_timeout, pdf_workers, dedup_threshold, dedup_mode:
+            passed to every `ingest()` and `ingest_paths()` call, so
+            appended files are deduplicated like the initial pass.
+        max_cycles: stop after this many polls (for tests and cron-style
+            runs); `None` runs until interrupted.
+    """
+    interval = settings.INGEST_WATCH_INTERVAL if interval is None else interval
+    out_path = run_ingestion.documents_path()
+    manifest_path = run_ingestion.OUT_DIR / run_ingestion.MANIFEST_FILE
+
+    options = dict(
+        workers=workers,
+        page_timeout=page_timeout,
+        pdf_workers=pdf_workers,
+        dedup_threshold=dedup_threshold,
+        dedup_mode=dedup_mode,
+    )
+
+    # Bring the output in line with the tree before watching for deltas.
+    run_ingestion.ingest(incremental=True, recursive=recursive, **options)
+
+    previous: Snapshot = {}
+    cycles = 0
+    logger.info("Watching {} for changes every {}s", run_ingestion.RAW_DIR, interval)
+
+    try:
+        while max_cycles is None or cycles < max_cycles:
+            cycles += 1
+            time.sleep(interval)
+
+            manifest = Manifest.load(manifest_path)
+            snapshot = _snapshot(run_ingestion.discover_sources(run_ingestion.RAW_DIR, recursive=recursive))
+            stable = {p: sig for p, sig in snapshot.items() if previous.get(p) == sig}
+            previous = snapshot
+
+            changed, touched = find_changes(manifest, stable)
+            if touched:
+                manifest.save(manifest_path)
+            if changed:
+                logger.info("Detected {} new or modified files", len(changed))
+                changed += dependents(manifest, changed, snapshot)
+                run_ingestion.ingest_paths(changed, **options)
+                manifest = Manifest.load(manifest_path)
+
+            deleted = [e.path for e in manifest if Path(e.path) not in snapshot]
+            if deleted:
+                logger.info("{} sources were removed", len(deleted))
+
+            if deleted or _unreferenced_bytes(manifest, out_path) > 0:
+                logger.info("Compacting {}", out_path)
+                run_ingestion.ingest(incremental=True, recursive=recursive, **options)
+    except KeyboardInterrupt:
+        logger.info("Stopped watching {}", run_ingestion.RAW_DIR)
@@ -1,9 +1,10 @@
-import json
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Sequence
 
 from common.config import settings
 from common.logger import logger
+from common.records import records_path
+from common.shards import configured_strategies, iter_chunks
 from knowledge_graph.entity_extractor import extract_entities
 from knowledge_graph.graph_client import GraphClient
 
@@ -33,33 +34,36 @@ class GraphBuilder:
             "entity_name": entity_name
         })
 
-    def process_chunks(self, chunks_file: Path) -> None:
-        """Process chunks file and build graph."""
+    def process_chunks(self, chunks_file: Path, strategies: Optional[Sequence[str]] = None) -> None:
+        """Process chunks file (or its shards) and build graph.
+
+        `strategies` limits processing to those chunk types; defaults to
+        `settings.CHUNK_STRATEGIES`.
+        """
         logger.info("Processing chunks from {}", chunks_file)
+        if strategies is None:
+            strategies = configured_strategies()
 
         try:
-            with chunks_file.open("r", encoding="utf-8") as f:
-                for i, line in enumerate(f):
-                    try:
-                        obj = json.loads(line.strip())
-                        text = obj.get("content", "")
-                        doc_id = f"doc_{i}"
-
-                        # Create document node
-                        self.graph.run(
-                            "MERGE (d:Document {id: $id})",
-                            {"id": doc_id}
-                        )
-
-                        entities = extract_entities(text)
-                        for ent in entities:
-                            self.create_entity(ent)
-                            self.link_document(doc_id, ent["name"])
-
-                    except json.JSONDecodeError as e:
-                        logger.warning("Skipping invalid JSON at line {}: {}", i + 1, e)
-                    except Exception as e:
-                        logger.error("Error processing line {}: {}", i + 1, e)
+            records = iter_chunks(chunks_file, fields=("content",), strategies=strategies, on_error="skip")
+            for i, obj in enumerate(records):
+                try:
+                    text = obj.get("content", "")
+                    doc_id = f"doc_{i}"
+
+                    # Create document node
+                    self.graph.run(
+                        "MERGE (d:Document {id: $id})",
+                        {"id": doc_id}
+                    )
+
+                    entities = extract_entities(text)
+                    for ent in entities:
+                        self.create_entity(ent)
+                        self.link_document(doc_id, ent["name"])
+
+                except Exception as e:
+                    logger.error("Error processing record {}: {}", i + 1, e)
 
         except FileNotFoundError:
             logger.error("Chunks file not found: {}", chunks_file)
@@ -75,7 +79,7 @@ class GraphBuilder:
 
 if __name__ == "__main__":
     settings.ensure_data_dir()
-    chunks_file = settings.DATA_DIR / "processed" / "chunks.jsonl"
+    chunks_file = records_path(settings.DATA_DIR / "processed" / "chunks.jsonl")
 
     builder = GraphBuilder()
     try:
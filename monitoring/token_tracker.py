@@ -3,9 +3,9 @@
 import re
 from typing import Dict, List, Optional, Any
 from collections import defaultdict
-import tiktoken
 
 from common.logger import logger
+from common.tokenizer import get_tokenizer
 
 
 class TokenTracker:
@@ -13,41 +13,17 @@ class TokenTracker:
 
     def __init__(self):
         self.usage: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
-        self.encoders: Dict[str, Any] = {}
 
     def _get_encoder(self, model: str) -> Any:
-        """Get or create a tiktoken encoder for the model.
+        """Get the shared tiktoken encoder for the model.
 
         Args:
             model: Model name
 
         Returns:
-            tiktoken encoder
+            tiktoken encoder, or None if it could not be loaded
         """
-        if model not in self.encoders:
-            try:
-                # Map common model names to tiktoken encodings
-                encoding_map = {
-                    "gpt-4": "cl100k_base",
-                    "gpt-4o": "cl100k_base",
-                    "gpt-4o-mini": "cl100k_base",
-                    "gpt-3.5-turbo": "cl100k_base",
-                    "text-embedding-ada-002": "cl100k_base",
-                    "text-davinci-003": "p50k_base",
-                    "text-curie-001": "p50k_base",
-                    "text-babbage-001": "p50k_base",
-                    "text-ada-001": "p50k_base",
-                }
-
-                encoding = encoding_map.get(model, "cl100k_base")  # Default to GPT-4 encoding
-                self.encoders[model] = tiktoken.get_encoding(encoding)
-                logger.debug(f"Created encoder for model: {model} (encoding: {encoding})")
-
-            except Exception as e:
-                logger.warning(f"Failed to create tiktoken encoder for {model}: {e}. Using fallback.")
-                self.encoders[model] = None
-
-        return self.encoders[model]
+        return get_tokenizer(model).encoder
 
     def count_tokens(self, text: str, model: str = "gpt-4o-mini") -> int:
         """Count tokens in text for a specific model.
@@ -62,10 +38,10 @@ class TokenTracker:
         if not text:
             return 0
 
-        encoder = self._get_encoder(model)
-        if encoder:
+        service = get_tokenizer(model)
+        if service.encoder:
             try:
-                return len(encoder.encode(text))
+                return service.count(text)
             except Exception as e:
                 logger.warning(f"Failed to encode text with tiktoken: {e}. Using fallback.")
 
@@ -1,31 +1,40 @@
-import json
 import faiss
 import numpy as np
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence
 from pathlib import Path
 
-from sentence_transformers import SentenceTransformer
-
 from retrieval.base import BaseRetriever
 from common.config import settings
+from common.records import records_path
+from common.shards import configured_strategies, iter_chunks
 from common.logger import logger
+from embeddings.models import SharedModel
 
 
 class VectorRetriever(BaseRetriever):
-    """Retriever using vector similarity search with FAISS."""
+    """Retriever using vector similarity search with FAISS.
+
+    The query model comes from the shared registry in `embeddings.models`,
+    so it is the same instance a `HuggingFaceEmbedder` of that model uses.
+    """
+
+    model = SharedModel()
 
     def __init__(
         self,
         model_name: str = "all-MiniLM-L6-v2",
         index_path: Optional[Path] = None,
-        chunks_path: Optional[Path] = None
+        chunks_path: Optional[Path] = None,
+        strategies: Optional[Sequence[str]] = None
     ):
         self.model_name = model_name
+        # Must match the strategies the index was built from.
+        self.strategies = strategies if strategies is not None else configured_strategies()
         self.index_path = index_path or settings.DATA_DIR / "vector_store" / "faiss.index"
-        self.chunks_path = chunks_path or settings.DATA_DIR / "processed" / "chunks.jsonl"
+        self.chunks_path = chunks_path or records_path(settings.DATA_DIR / "processed" / "chunks.jsonl")
 
         try:
-            self.model = SentenceTransformer(model_name)
+            self.model  # load now so a missing model fails here, not per query
             self.index = faiss.read_index(str(self.index_path))
             self.texts = self._load_texts()
             logger.info(f"Loaded vector retriever with {len(self.texts)} chunks")
@@ -34,17 +43,14 @@ class VectorRetriever(BaseRetriever):
             raise
 
     def _load_texts(self) -> List[str]:
-        """Load text chunks from JSONL file."""
+        """Load text chunks from a JSONL or EGPR chunks file or its shards."""
         texts = []
         try:
-            with open(self.chunks_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    if line.strip():
-                        data = json.loads(line)
-                        texts.append(data.get("content", ""))
+            for record in iter_chunks(self.chunks_path, fields=("content",), strategies=self.strategies):
+                texts.append(record["content"])
         except FileNotFoundError:
             logger.warning(f"Chunks file not found: {self.chunks_path}")
-        except json.JSONDecodeError as e:
+        except ValueError as e:
             logger.error(f"Error parsing chunks file: {e}")
             raise
         return texts
@@ -61,8 +67,8 @@ class VectorRetriever(BaseRetriever):
             List of result dictionaries with content and scores.
         """
         try:
-            query_emb = self.model.encode([query])
-            scores, indices = self.index.search(np.array(query_emb), top_k)
+            query_emb = self.model.encode([query], convert_to_numpy=True, show_progress_bar=False)
+            scores, indices = self.index.search(np.ascontiguousarray(query_emb, dtype=np.float32), top_k)
 
             results = []
             for i, idx in enumerate(indices[0]):
@@ -4,14 +4,16 @@ from pathlib import Path
 
 from common.config import settings
 from common.logger import logger
+from common.records import records_path
+from common.shards import chunks_exist
 from knowledge_graph.graph_builder import GraphBuilder
 
 
 def main():
     settings.ensure_data_dir()
-    chunks_file = settings.DATA_DIR / "processed" / "chunks.jsonl"
+    chunks_file = records_path(settings.DATA_DIR / "processed" / "chunks.jsonl")
 
-    if not chunks_file.exists():
+    if not chunks_exist(chunks_file):
         logger.error("Chunks file not found: {}", chunks_file)
         return
 
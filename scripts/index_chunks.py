@@ -1,26 +1,26 @@
 """Script to index chunked documents into a vector store."""
 
-import json
 from pathlib import Path
 
 from common.config import settings
 from common.logger import logger
+from common.records import records_path
+from common.shards import configured_strategies, iter_chunks
 from vector_store.retriever import Retriever
 
 
 def load_chunks(chunks_file: Path):
-    """Load texts and metadatas from chunks JSONL file."""
+    """Load texts and metadatas from a JSONL or EGPR chunks file or its shards,
+    limited to `settings.CHUNK_STRATEGIES`."""
     texts = []
     metadatas = []
     try:
-        with chunks_file.open("r", encoding="utf-8") as f:
-            for line_num, line in enumerate(f, 1):
-                try:
-                    obj = json.loads(line.strip())
-                    texts.append(obj["content"])
-                    metadatas.append(obj["metadata"])
-                except json.JSONDecodeError as e:
-                    logger.warning("Skipping invalid JSON at line {}: {}", line_num, e)
+        records = iter_chunks(
+            chunks_file, fields=("content", "metadata"), strategies=configured_strategies(), on_error="skip"
+        )
+        for obj in records:
+            texts.append(obj["content"])
+            metadatas.append(obj["metadata"])
     except FileNotFoundError:
         logger.error("Chunks file not found: {}", chunks_file)
         raise
@@ -28,7 +28,7 @@ def load_chunks(chunks_file: Path):
 
 
 def main():
-    chunks_file = settings.DATA_DIR / "processed" / "chunks.jsonl"
+    chunks_file = records_path(settings.DATA_DIR / "processed" / "chunks.jsonl")
     settings.ensure_data_dir()
 
     logger.info("Loading chunks from {}", chunks_file)
@@ -42,7 +42,8 @@ def main():
 
     # Change provider here: "hf" or "openai"
     from embeddings.embedder_factory import get_embedder
-    embedder = get_embedder("hf")  # or "openai"
+    # Cached: only chunks whose text changed since the last run are embedded.
+    embedder = get_embedder("hf", cache=True)  # or "openai"
     retriever = Retriever(embedder=embedder)
     retriever.index(texts, metadatas)
 
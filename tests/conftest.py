@@ -0,0 +1,29 @@
+import pytest
+
+from embeddings.models import clear_models
+
+# cl100k_base's pre-tokenizer pattern.
+CL100K_PATTERN = (
+    r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?+\p{L}++|\p{N}{1,3}+|"""
+    r""" ?[^\s\p{L}\p{N}]++[\r\n]*+|\s++$|\s*[\r\n]|\s+(?!\S)|\s"""
+)
+
+
+@pytest.fixture
+def toy_encoding():
+    """A tiktoken encoding with cl100k's pre-tokenizer and a handful of
+    merges, so token-accounting tests do not need to download BPE ranks."""
+    tiktoken = pytest.importorskip("tiktoken")
+    ranks = {bytes([i]): i for i in range(256)}
+    for piece in [b"th", b"the", b" t", b" the", b"in", b"ing", b" a", b"12", b"123", b"'s", b" 1", b"..", b" \n", b"  "]:
+        ranks[piece] = len(ranks)
+    return tiktoken.Encoding(name="toy", pat_str=CL100K_PATTERN, mergeable_ranks=ranks, special_tokens={})
+
+
+@pytest.fixture(autouse=True)
+def _fresh_model_registry():
+    """Tests patch SentenceTransformer; keep their doubles out of the
+    process-wide model registry."""
+    clear_models()
+    yield
+    clear_models()
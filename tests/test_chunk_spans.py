@@ -0,0 +1,85 @@
+from chunking import run_chunking
+import pytest
+
+from chunking.spans import ChunkResolver, ChunkSpan, SpanLocator, to_spans
+from common.schemas import DocumentSchema
+
+
+def _chunk_records(chunks):
+    return [(c.content, c.metadata) for c in chunks]
+
+
+def test_spans_resolve_to_engine_chunks():
+    engine = run_chunking.build_engine(params={"fixed": {"max_tokens": 20, "overlap": 5}})
+    docs = [
+        DocumentSchema(
+            content="# Intro\nFirst  sentence here.\n\nSecond one   follows. " * 20,
+            metadata={"source": "a.txt", "page": 1},
+        ),
+        DocumentSchema(content="Plain text without headers. " * 30, metadata={"source": "b.txt"}),
+    ]
+
+    spans, expected = [], []
+    for doc in docs:
+        chunks = engine.chunk(doc)
+        expected.extend(chunks)
+        spans.extend(to_spans(doc, chunks))
+
+    assert [s.doc_id for s in spans[:1]] == ["a.txt#page=1"]
+    # Fixed chunks collapse whitespace; structural sections are verbatim.
+    assert "words" in {s.mode for s in spans if s.strategy == "fixed"}
+    assert all(s.text is None for s in spans if s.strategy != "semantic")
+
+    resolver = ChunkResolver(docs)
+    assert _chunk_records(resolver.iter_resolved(spans)) == _chunk_records(expected)
+
+
+def test_unlocatable_chunk_is_kept_inline():
+    doc = DocumentSchema(content="alpha beta gamma", metadata={"source": "x"})
+    chunk = DocumentSchema(content="delta", metadata={"chunk_type": "custom", "token_count": 1})
+    (span,) = to_spans(doc, [chunk])
+    assert span.text == "delta"
+    assert ChunkSpan.from_record(span.to_record()) == span
+    assert ChunkResolver([doc]).resolve(span).content == "delta"
+
+
+def test_spans_resolve_against_their_document_version():
+    old = DocumentSchema(content="alpha beta gamma delta", metadata={"source": "x"})
+    new = DocumentSchema(content="alpha beta", metadata={"source": "x"})
+    chunk = DocumentSchema(content="gamma delta", metadata={"chunk_type": "fixed", "token_count": 2})
+    (span,) = to_spans(old, [chunk])
+
+    # Both versions present (e.g. a re-ingested source): the span keeps its own.
+    assert ChunkResolver([old, new]).text(span) == "gamma delta"
+    assert ChunkResolver([new, old]).text(span) == "gamma delta"
+    with pytest.raises(ValueError, match="changed"):
+        ChunkResolver([new]).text(span)
+
+    legacy = ChunkSpan.from_record({k: v for k, v in span.to_record().items() if k != "doc_hash"})
+    with pytest.raises(ValueError, match="outside"):
+        ChunkResolver([new]).text(legacy)
+    assert ChunkResolver([old]).text(legacy) == "gamma delta"
+
+
+def test_locating_missing_chunks_is_bounded():
+    class CountingWords(list):
+        slices = 0
+
+        def __getitem__(self, index):
+            if isinstance(index, slice):
+                type(self).slices += 1
+            return super().__getitem__(index)
+
+    doc = DocumentSchema(content=" ".join(["the"] * 5000 + ["end"]), metadata={"source": "x"})
+    locator = SpanLocator(doc)
+    locator._index_words()
+    locator._words = CountingWords(locator._words)
+
+    missing = DocumentSchema(content="the missing phrase", metadata={"chunk_type": "fixed"})
+    spans = [locator.locate(missing) for _ in range(50)]
+    assert all(s.text == "the missing phrase" for s in spans)
+    # Each miss tries a bounded number of occurrences, not all 5000.
+    assert CountingWords.slices <= 50 * 64
+
+    nearby = DocumentSchema(content="the the", metadata={"chunk_type": "fixed"})
+    assert locator.locate(nearby).text is None
@@ -0,0 +1,39 @@
+from chunking import ChunkingEngine, FixedChunker, SemanticChunker, StructuralChunker
+from common.schemas import DocumentSchema
+
+
+TEXT = (
+    "Intro line without a header. It has two sentences.\n"
+    "# Short section\nJust one sentence here.\n"
+    "## Long section\n" + " ".join(f"Sentence number {i} is here!" for i in range(60)) + "\n"
+    "### Tail\nThe end."
+)
+
+
+def test_engine_matches_individual_chunkers():
+    doc = DocumentSchema(content=TEXT, metadata={"source": "test"})
+    chunkers = {
+        "fixed": FixedChunker(max_tokens=40, overlap=5),
+        "semantic": SemanticChunker(max_tokens=40),
+        "structural": StructuralChunker(max_tokens=40),
+    }
+    expected = [c for chunker in chunkers.values() for c in chunker.chunk(doc)]
+
+    assert ChunkingEngine(chunkers).chunk(doc) == expected
+
+
+def test_structural_fallback_matches_semantic_on_section():
+    doc = DocumentSchema(content=TEXT, metadata={"source": "test"})
+    chunks = StructuralChunker(max_tokens=40).chunk(doc)
+
+    section = "Long section\n" + TEXT.split("## Long section\n")[1].split("\n### Tail")[0]
+    expected = SemanticChunker(max_tokens=40).chunk(DocumentSchema(content=section, metadata=doc.metadata))
+    semantic = [c for c in chunks if c.metadata["chunk_type"] == "semantic"]
+
+    assert len(expected) > 1
+    assert semantic == expected
+    assert [c.content for c in chunks if c.metadata["chunk_type"] == "structural"] == [
+        "Intro line without a header. It has two sentences.",
+        "Short section\nJust one sentence here.",
+        "Tail\nThe end.",
+    ]
@@ -15,6 +15,16 @@ class TestCLI:
         assert result == 0
         mock_ingest.assert_called_once()
 
+    @patch('ingestion.watcher.watch')
+    def test_ingest_watch_forwards_options(self, mock_watch):
+        """Test ingest --watch passes dedup and PDF options through."""
+        result = main(['ingest', '--watch', '--dedup-threshold', '0.8', '--page-timeout', '5', '--pdf-workers', '2'])
+        assert result == 0
+        kwargs = mock_watch.call_args.kwargs
+        assert kwargs['dedup_threshold'] == 0.8
+        assert kwargs['page_timeout'] == 5
+        assert kwargs['pdf_workers'] == 2
+
     @patch('chunking.run_chunking.run')
     def test_chunk_command(self, mock_run):
         """Test chunk command."""
@@ -0,0 +1,134 @@
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from common.config import settings
+from embeddings.base import BaseEmbedder
+from embeddings.cache import CachedEmbedder, EmbeddingCache, text_key
+from embeddings.embedder_factory import get_embedder
+
+
+class CountingEmbedder(BaseEmbedder):
+    model_name = "fake-model"
+
+    def __init__(self, dim=4):
+        self.dim = dim
+        self.seen = []
+
+    def embed(self, texts):
+        self.seen.extend(texts)
+        return [[len(t) + 0.1 * i for i in range(self.dim)] for t in texts]
+
+
+def test_cached_embedder_only_embeds_new_texts(tmp_path):
+    inner = CountingEmbedder()
+    embedder = CachedEmbedder(inner, EmbeddingCache(tmp_path))
+    first = embedder.embed(["a", "bb", "a"])
+    assert inner.seen == ["a", "bb"]
+    assert first[0] == first[2]
+
+    # A new process (new cache instance) reuses the vectors on disk.
+    reopened = CachedEmbedder(inner, EmbeddingCache(tmp_path))
+    assert reopened.embed(["bb", "ccc", "a"]) == [first[1], reopened.embed(["ccc"])[0], first[0]]
+    assert inner.seen == ["a", "bb", "ccc"]
+    assert reopened.model_key == "CountingEmbedder:fake-model"
+    assert np.allclose(first[1], [2.0, 2.1, 2.2, 2.3])
+
+
+def test_cached_embed_array_mixes_hits_and_misses(tmp_path):
+    inner = CountingEmbedder(dim=3)
+    embedder = CachedEmbedder(inner, EmbeddingCache(tmp_path))
+    embedder.embed(["bb"])
+    array = embedder.embed_array(["a", "bb", "a"])
+    assert array.dtype == np.float32 and array.shape == (3, 3) and array.flags.c_contiguous
+    assert np.allclose(array, [[1.0, 1.1, 1.2], [2.0, 2.1, 2.2], [1.0, 1.1, 1.2]])
+    assert inner.seen == ["bb", "a"]
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = EmbeddingCache(tmp_path, max_entries=3)
+    vectors = np.eye(4, dtype=np.float32)
+    cache.put_many("m", ["a", "b", "c"], vectors[:3])
+    cache.get_many("m", ["a"])  # "b" is now the least recently used
+    cache.put_many("m", ["d"], vectors[3:])
+
+    got = cache.get_many("m", ["a", "b", "c", "d"])
+    assert got[1] is None
+    assert [v.tolist() for v in (got[0], got[2], got[3])] == [vectors[0].tolist(), vectors[2].tolist(), vectors[3].tolist()]
+    assert len(cache) == 3
+
+    with pytest.raises(ValueError):
+        cache.put_many("m", ["e"], np.ones((1, 8)))
+
+
+def test_concurrent_writers_get_distinct_rows(tmp_path):
+    import threading
+
+    def writer(name):
+        cache = EmbeddingCache(tmp_path)
+        for batch in range(20):
+            texts = [f"{name}-{batch}-{i}" for i in range(10)]
+            cache.put_many("m", texts, np.array([[hash(t) % 1000, batch, i] for i, t in enumerate(texts)], dtype=np.float32))
+        cache.close()
+
+    threads = [threading.Thread(target=writer, args=(name,)) for name in "abc"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    cache = EmbeddingCache(tmp_path)
+    assert len(cache) == 600
+    slots = [slot for (slot,) in cache._conn.execute("SELECT slot FROM entries")]
+    assert len(set(slots)) == 600
+    texts = [f"{name}-{batch}-{i}" for name in "abc" for batch in range(20) for i in range(10)]
+    got = cache.get_many("m", texts)
+    assert all(v.tolist() == [hash(t) % 1000, int(t.split("-")[1]), int(t.split("-")[2])] for t, v in zip(texts, got))
+
+
+def test_row_reused_during_lookup_is_a_miss(tmp_path):
+    writer = EmbeddingCache(tmp_path, max_entries=1)
+    writer.put_many("m", ["a"], np.array([[1.0, 1.0]]))
+    reader = EmbeddingCache(tmp_path, max_entries=1)
+    assert reader.get_many("m", ["a"])[0].tolist() == [1.0, 1.0]
+
+    # Another process evicts "a" and reuses its row between the reader's
+    # slot lookup and its copy of the vector.
+    lookup = reader._slots
+
+    def racing_slots(model, keys):
+        slots = lookup(model, keys)
+        writer.put_many("m", ["b"], np.array([[2.0, 2.0]]))
+        return slots
+
+    reader._slots = racing_slots
+    assert reader.get_many("m", ["a"]) == [None]
+    reader._slots = lookup
+    assert reader.get_many("m", ["b"])[0].tolist() == [2.0, 2.0]
+
+
+def test_hits_defer_last_used_writes(tmp_path):
+    cache = EmbeddingCache(tmp_path)
+    cache.put_many("m", ["a", "b"], np.eye(2))
+
+    def last_used():
+        return dict(cache._conn.execute("SELECT key, last_used FROM entries").fetchall())
+
+    before = last_used()
+    cache.get_many("m", ["a"])
+    assert not cache._conn.in_transaction
+    assert last_used() == before
+    cache.flush()
+    after = last_used()
+    assert max(after, key=after.get) == text_key("a") and after[text_key("b")] == before[text_key("b")]
+    cache.close()
+
+
+def test_factory_wraps_when_cache_requested(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_DIR", tmp_path)
+    with patch.dict("os.environ", {"OPENAI_API_KEY": "fake"}, clear=True):
+        embedder = get_embedder("openai", cache=True)
+    assert isinstance(embedder, CachedEmbedder)
+    assert embedder.model_key == "OpenAIEmbedder:text-embedding-3-small"
+    assert (tmp_path / "cache" / "embeddings" / "index.sqlite").exists()
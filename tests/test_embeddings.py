@@ -1,3 +1,4 @@
+import threading
 from unittest.mock import patch
 from embeddings.hf_embedder import HuggingFaceEmbedder
 from embeddings.openai_embedder import OpenAIEmbedder
@@ -34,4 +35,60 @@ def test_embedder_factory():
         get_embedder("invalid")
         assert False
     except ValueError:
-        pass
\ No newline at end of file
+        pass
+
+class _FakeModel:
+    loads = 0
+
+    def __init__(self, name):
+        type(self).loads += 1
+        self.batches = []
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, show_progress_bar=None):
+        import numpy as np
+
+        self.batches.append((list(texts), batch_size))
+        return np.array([[len(t), t.count("a")] for t in texts], dtype=np.float32)
+
+
+def test_hf_embedder_encodes_once_per_call_and_keeps_order():
+    texts = ["a" * n + "b" * (n % 3) for n in (5, 40, 1, 17, 3, 28, 9)]
+    with patch("sentence_transformers.SentenceTransformer", _FakeModel):
+        embedder = HuggingFaceEmbedder(batch_size=3)
+
+    vectors = embedder.embed(texts)
+    assert vectors == [[float(len(t)), float(t.count("a"))] for t in texts]
+    assert embedder.model.batches == [(texts, 3)]
+
+    assert list(embedder.iter_embed(iter(texts), window=2)) == vectors
+    assert [len(batch) for batch, _ in embedder.model.batches[1:]] == [2, 2, 2, 1]
+    assert embedder.embed([]) == []
+
+    array = embedder.embed_array(texts)
+    assert array.dtype == "float32" and array.flags.c_contiguous
+    assert array.tolist() == vectors
+
+
+def test_embedders_and_retriever_share_one_model():
+    from embeddings.models import get_sentence_transformer, loaded_models
+    from retrieval.vector_retriever import VectorRetriever
+
+    _FakeModel.loads = 0
+    with patch("sentence_transformers.SentenceTransformer", _FakeModel), \
+            patch("faiss.read_index"), \
+            patch("retrieval.vector_retriever.VectorRetriever._load_texts", return_value=[]):
+        lazy = HuggingFaceEmbedder(lazy=True)
+        assert _FakeModel.loads == 0
+        first, second = HuggingFaceEmbedder(), HuggingFaceEmbedder(batch_size=4)
+        retriever = VectorRetriever()
+        assert first.model is second.model is retriever.model is lazy.model
+        assert _FakeModel.loads == 1
+        assert loaded_models() == ["all-MiniLM-L6-v2"]
+
+        # Concurrent first requests for another model still load it once.
+        threads = [threading.Thread(target=get_sentence_transformer, args=("other",)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert _FakeModel.loads == 2
@@ -1,6 +1,12 @@
+import random
+
+import pytest
+
 from chunking.fixed import FixedChunker
 from chunking.structural import StructuralChunker
+from chunking.tokenizer import TokenCounter
 from common.schemas import DocumentSchema
+from common.tokenizer import TokenizerService
 
 
 def test_fixed_chunker_basic():
@@ -14,6 +20,37 @@ def test_fixed_chunker_basic():
     assert total_words >= 200
 
 
+def _reference_fixed_chunks(counter, words, max_tokens, overlap):
+    """The original word-at-a-time algorithm, re-tokenizing every candidate."""
+    out = []
+    start = 0
+    while start < len(words):
+        end = start + 1
+        while end <= len(words):
+            if counter.count(" ".join(words[start:end])) >= max_tokens or end == len(words):
+                break
+            end += 1
+        content = " ".join(words[start:end])
+        out.append((content, counter.count(content)))
+        start = max(end - overlap, start + 1)
+    return out
+
+
+@pytest.mark.parametrize("max_tokens,overlap", [(7, 2), (25, 5), (1, 0), (40, 60)])
+def test_fixed_chunker_matches_reference(max_tokens, overlap, toy_encoding):
+    rng = random.Random(max_tokens)
+    vocab = ["the", "thing", "it's", "'s", "123456", "1", "a", "...", "élan", "😀", "x.y", "(the)", "--", "ing"]
+    text = " \n ".join(" ".join(rng.choice(vocab) for _ in range(rng.randint(1, 12))) for _ in range(30))
+    doc = DocumentSchema(content=text, metadata={"source": "test"})
+
+    chunker = FixedChunker(max_tokens=max_tokens, overlap=overlap)
+    chunker.tokenizer = TokenCounter(service=TokenizerService(encoder=toy_encoding))
+    chunks = chunker.chunk(doc)
+
+    expected = _reference_fixed_chunks(chunker.tokenizer, text.split(), max_tokens, overlap)
+    assert [(c.content, c.metadata["token_count"]) for c in chunks] == expected
+
+
 def test_structural_chunker_basic():
     text = "# Heading\n" + "Paragraph one. " * 10 + "\n## Sub\n" + "Another. " * 30
     doc = DocumentSchema(content=text, metadata={"source": "test"})
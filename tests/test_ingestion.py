@@ -0,0 +1,285 @@
+import json
+import os
+
+import pytest
+
+from common.config import settings
+from common.records import iter_records
+from ingestion import run_ingestion
+from ingestion.manifest import Manifest
+
+
+@pytest.fixture
+def raw_tree(tmp_path, monkeypatch):
+    raw = tmp_path / "raw"
+    out = tmp_path / "processed"
+    raw.mkdir()
+    for i in range(6):
+        (raw / f"doc_{i}.txt").write_text(f"Document   {i}\n\nbody" + chr(0), encoding="utf-8")
+    (raw / "ignored.csv").write_text("a,b", encoding="utf-8")
+
+    monkeypatch.setattr(run_ingestion, "RAW_DIR", raw)
+    monkeypatch.setattr(run_ingestion, "OUT_DIR", out)
+    return raw, out
+
+
+def _read_output(out):
+    with (out / "documents.jsonl").open(encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_ingest_serial(raw_tree):
+    _, out = raw_tree
+    docs = run_ingestion.ingest(workers=1, collect=True)
+
+    assert [d.content for d in docs] == [f"Document {i} body" for i in range(6)]
+    records = _read_output(out)
+    assert len(records) == 6
+    assert all("ingested_at" in r["metadata"] for r in records)
+
+
+def test_ingest_parallel_keeps_order(raw_tree):
+    _, out = raw_tree
+    serial = [d.content for d in run_ingestion.ingest(workers=1, collect=True)]
+    parallel = [d.content for d in run_ingestion.ingest(workers=3, collect=True)]
+
+    assert parallel == serial
+    assert [r["content"] for r in _read_output(out)] == serial
+
+
+def test_ingest_streams_without_collecting(raw_tree):
+    _, out = raw_tree
+    assert run_ingestion.ingest(workers=1) is None
+    assert len(_read_output(out)) == 6
+
+
+def test_iter_documents_is_lazy(raw_tree):
+    stream = run_ingestion.iter_documents(workers=1)
+    first = next(stream)
+    assert first.content == "Document 0 body"
+    stream.close()
+
+
+def test_ingest_writes_manifest(raw_tree):
+    _, out = raw_tree
+    run_ingestion.ingest(workers=1)
+
+    manifest = Manifest.load(out / run_ingestion.MANIFEST_FILE)
+    assert len(manifest) == 6
+    data = (out / "documents.jsonl").read_bytes()
+    for entry in manifest:
+        block = data[entry.offset:entry.offset + entry.length]
+        assert json.loads(block)["metadata"]["source"] == entry.path
+
+
+def test_incremental_ingest_only_parses_changed_files(raw_tree, monkeypatch):
+    raw, out = raw_tree
+    run_ingestion.ingest(workers=1)
+
+    (raw / "doc_2.txt").write_text("Changed  body", encoding="utf-8")
+    (raw / "doc_9.txt").write_text("New file", encoding="utf-8")
+    (raw / "doc_4.txt").unlink()
+    # Touch without changing content: must be detected by hash.
+    os.utime(raw / "doc_0.txt", ns=(1, 1))
+
+    loaded = []
+    original = run_ingestion.iter_text
+
+    def tracking_iter_text(path):
+        loaded.append(path.name)
+        return original(path)
+
+    monkeypatch.setattr(run_ingestion, "iter_text", tracking_iter_text)
+    docs = run_ingestion.ingest(workers=1, collect=True, incremental=True)
+
+    assert sorted(loaded) == ["doc_2.txt", "doc_9.txt"]
+    expected = ["Document 0 body", "Document 1 body", "Changed body",
+                "Document 3 body", "Document 5 body", "New file"]
+    assert [d.content for d in docs] == expected
+    assert [r["content"] for r in _read_output(out)] == expected
+    assert not (out / "documents.jsonl.prev").exists()
+
+
+def test_incremental_ingest_with_egpr_output(raw_tree, monkeypatch):
+    raw, out = raw_tree
+    monkeypatch.setattr(settings, "RECORD_FORMAT", "egpr")
+    run_ingestion.ingest(workers=1)
+    assert run_ingestion.documents_path() == out / "documents.egpr"
+
+    (raw / "doc_2.txt").write_text("Changed  body", encoding="utf-8")
+    docs = run_ingestion.ingest(workers=1, collect=True, incremental=True)
+
+    expected = [f"Document {i} body" for i in range(6)]
+    expected[2] = "Changed body"
+    assert [d.content for d in docs] == expected
+    stored = iter_records(out / "documents.egpr", fields=("content",))
+    assert [r["content"] for r in stored] == expected
+
+
+def test_ingest_drops_near_duplicates(raw_tree):
+    raw, out = raw_tree
+    body = " ".join(f"clause {i} requires approval by the data owner" for i in range(40))
+    (raw / "policy_v1.txt").write_text(body, encoding="utf-8")
+    (raw / "policy_v2.txt").write_text(body + " minor edit", encoding="utf-8")
+
+    docs = run_ingestion.ingest(workers=1, collect=True, dedup_threshold=0.8)
+    sources = [d.metadata["source"] for d in docs]
+    assert str(raw / "policy_v1.txt") in sources
+    assert str(raw / "policy_v2.txt") not in sources
+
+    tagged = run_ingestion.ingest(workers=1, collect=True, dedup_threshold=0.8, dedup_mode="tag")
+    v2 = [d for d in tagged if d.metadata["source"] == str(raw / "policy_v2.txt")]
+    assert v2[0].metadata["duplicate_of"] == str(raw / "policy_v1.txt")
+
+    # iter_documents runs the same pipeline as ingest.
+    streamed = run_ingestion.iter_documents(workers=1, dedup_threshold=0.8, dedup_mode="tag")
+    assert [(d.content, d.metadata.get("duplicate_of")) for d in streamed] == [
+        (d.content, d.metadata.get("duplicate_of")) for d in tagged
+    ]
+
+
+def test_incremental_dedup_restores_duplicate_when_original_goes(raw_tree):
+    raw, out = raw_tree
+    for path in raw.glob("doc_*.txt"):
+        path.unlink()
+    body = " ".join(f"clause {i} requires approval by the data owner" for i in range(40))
+    (raw / "a.txt").write_text(body, encoding="utf-8")
+    (raw / "b.txt").write_text(body + " minor edit", encoding="utf-8")
+
+    docs = run_ingestion.ingest(workers=1, collect=True, dedup_threshold=0.8)
+    assert [d.metadata["source"] for d in docs] == [str(raw / "a.txt")]
+    entry = Manifest.load(out / run_ingestion.MANIFEST_FILE).get(raw / "b.txt")
+    assert entry.documents == 0 and entry.duplicate_of == [str(raw / "a.txt")]
+
+    (raw / "a.txt").unlink()
+    docs = run_ingestion.ingest(workers=1, collect=True, incremental=True, dedup_threshold=0.8)
+    assert [d.metadata["source"] for d in docs] == [str(raw / "b.txt")]
+    assert [r["metadata"]["source"] for r in _read_output(out)] == [str(raw / "b.txt")]
+
+
+def test_interrupted_ingest_resumes_from_checkpoint(raw_tree, monkeypatch):
+    raw, out = raw_tree
+    original = run_ingestion.iter_text
+
+    def failing_iter_text(path):
+        if path.name == "doc_3.txt":
+            raise MemoryError("simulated crash")
+        return original(path)
+
+    monkeypatch.setattr(run_ingestion, "iter_text", failing_iter_text)
+    with pytest.raises(MemoryError):
+        run_ingestion.ingest(workers=1, checkpoint_every=1)
+    assert (out / run_ingestion.CHECKPOINT_FILE).exists()
+
+    loaded = []
+
+    def tracking_iter_text(path):
+        loaded.append(path.name)
+        return original(path)
+
+    monkeypatch.setattr(run_ingestion, "iter_text", tracking_iter_text)
+    docs = run_ingestion.ingest(workers=1, collect=True, checkpoint_every=1)
+
+    assert loaded == ["doc_3.txt", "doc_4.txt", "doc_5.txt"]
+    expected = [f"Document {i} body" for i in range(6)]
+    assert [d.content for d in docs] == expected
+    assert [r["content"] for r in _read_output(out)] == expected
+    assert not (out / run_ingestion.CHECKPOINT_FILE).exists()
+    assert len(Manifest.load(out / run_ingestion.MANIFEST_FILE)) == 6
+
+
+def test_resume_reingests_sources_changed_after_checkpoint(raw_tree, monkeypatch):
+    raw, out = raw_tree
+    original = run_ingestion.iter_text
+
+    def failing_iter_text(path):
+        if path.name == "doc_4.txt":
+            raise MemoryError("simulated crash")
+        return original(path)
+
+    monkeypatch.setattr(run_ingestion, "iter_text", failing_iter_text)
+    with pytest.raises(MemoryError):
+        run_ingestion.ingest(workers=1, checkpoint_every=1)
+    monkeypatch.setattr(run_ingestion, "iter_text", original)
+
+    (raw / "doc_1.txt").write_text("Edited body", encoding="utf-8")
+    (raw / "doc_2.txt").unlink()
+    docs = run_ingestion.ingest(workers=1, collect=True, checkpoint_every=1)
+
+    expected = ["Document 0 body", "Edited body", "Document 3 body", "Document 4 body", "Document 5 body"]
+    assert [d.content for d in docs] == expected
+    assert [r["content"] for r in _read_output(out)] == expected
+    manifest = Manifest.load(out / run_ingestion.MANIFEST_FILE)
+    assert manifest.get(raw / "doc_2.txt") is None
+    assert manifest.get(raw / "doc_1.txt").documents == 1
+
+
+def test_recursive_discovery(raw_tree):
+    raw, _ = raw_tree
+    (raw / "nested" / "deeper").mkdir(parents=True)
+    (raw / "nested" / "deeper" / "inner.md").write_text("# Inner", encoding="utf-8")
+
+    flat = run_ingestion.discover_sources(raw)
+    deep = run_ingestion.discover_sources(raw, recursive=True)
+    assert len(flat) == 6
+    assert deep[-1] == raw / "nested" / "deeper" / "inner.md"
+    assert len(deep) == 7
+
+
+def test_watch_ingests_new_and_modified_files(raw_tree, monkeypatch):
+    from ingestion import watcher
+
+    raw, out = raw_tree
+    polls = []
+
+    def fake_sleep(seconds):
+        polls.append(seconds)
+        if len(polls) == 1:
+            (raw / "sub").mkdir()
+            (raw / "sub" / "fresh.txt").write_text("Fresh policy", encoding="utf-8")
+            (raw / "doc_1.txt").write_text("Revised body", encoding="utf-8")
+
+    monkeypatch.setattr(watcher.time, "sleep", fake_sleep)
+    watcher.watch(interval=0, max_cycles=3)
+
+    contents = [r["content"] for r in _read_output(out)]
+    assert "Fresh policy" in contents
+    assert "Revised body" in contents
+    # The superseded version is compacted away, so chunking never sees it.
+    assert "Document 1 body" not in contents
+    assert len(contents) == 7
+
+    manifest = Manifest.load(out / run_ingestion.MANIFEST_FILE)
+    data = (out / "documents.jsonl").read_bytes()
+    entry = manifest.get(raw / "doc_1.txt")
+    assert json.loads(data[entry.offset:entry.offset + entry.length])["content"] == "Revised body"
+
+
+def test_watch_deduplicates_appended_files(raw_tree, monkeypatch):
+    from ingestion import watcher
+
+    raw, out = raw_tree
+    body = " ".join(f"clause {i} requires approval by the data owner" for i in range(40))
+    (raw / "policy_v1.txt").write_text(body, encoding="utf-8")
+    polls = []
+
+    def fake_sleep(seconds):
+        polls.append(seconds)
+        if len(polls) == 1:
+            (raw / "policy_v2.txt").write_text(body + " minor edit", encoding="utf-8")
+        elif len(polls) == 3:
+            (raw / "policy_v1.txt").write_text("Withdrawn policy", encoding="utf-8")
+
+    monkeypatch.setattr(watcher.time, "sleep", fake_sleep)
+    watcher.watch(interval=0, max_cycles=2, dedup_threshold=0.8)
+    manifest = Manifest.load(out / run_ingestion.MANIFEST_FILE)
+    assert manifest.get(raw / "policy_v2.txt").documents == 0
+
+    # Once the original changes, its former duplicate is ingested again.
+    watcher.watch(interval=0, max_cycles=2, dedup_threshold=0.8)
+    manifest = Manifest.load(out / run_ingestion.MANIFEST_FILE)
+    assert manifest.get(raw / "policy_v2.txt").documents == 1
+    data = (out / "documents.jsonl").read_bytes()
+    entry = manifest.get(raw / "policy_v1.txt")
+    assert json.loads(data[entry.offset:entry.offset + entry.length])["content"] == "Withdrawn policy"
+    assert body not in [r["content"] for r in _read_output(out)]
@@ -1,4 +1,4 @@
-from ingestion.parsers.cleaner import clean_text
+from ingestion.parsers.cleaner import clean_text, clean_texts
 from ingestion.metadata.enrich import enrich_metadata
 
 
@@ -9,9 +9,37 @@ def test_clean_text_normalization():
     assert "  " not in cleaned
 
 
+def test_clean_texts_batch():
+    raw = ["  a\n\tb  ", None, "x \x00 y", "e\u0301"]
+    assert clean_texts(raw) == ["a b", "", "x y", "\u00e9"]
+
+
 def test_enrich_metadata_non_mutating():
     base = {"a": 1}
     out = enrich_metadata(base)
     assert out.get("ingested_at") is not None
     # original dict should not be mutated
     assert "ingested_at" not in base
+
+
+def test_minhash_similarity_tracks_overlap():
+    from ingestion.dedup import MinHasher, similarity
+
+    hasher = MinHasher(num_perm=128, shingle_size=3)
+    base = " ".join(f"word{i}" for i in range(200))
+    near = base.replace("word100", "changed")
+    other = " ".join(f"term{i}" for i in range(200))
+
+    assert similarity(hasher.signature(base), hasher.signature(near)) > 0.8
+    assert similarity(hasher.signature(base), hasher.signature(other)) < 0.2
+
+
+def test_minhash_signature_is_blockwise(monkeypatch):
+    from ingestion import dedup
+
+    hasher = dedup.MinHasher(num_perm=16, shingle_size=2)
+    text = " ".join(f"word{i}" for i in range(500))
+    whole = hasher.signature(text)
+    monkeypatch.setattr(dedup, "_SIGNATURE_BLOCK", 7)
+    assert (hasher.signature(text) == whole).all()
+    assert (hasher.signature("") == dedup._MAX_HASH).all()
@@ -0,0 +1,123 @@
+import asyncio
+import base64
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+from common.tokenizer import get_tokenizer
+from embeddings.batching import RateLimiter, plan_batches
+from embeddings.openai_embedder import OpenAIEmbedder
+
+
+class _StubEmbeddings(BaseHTTPRequestHandler):
+    """POST /v1/embeddings: vector [len(text), index in batch]; fails on demand."""
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.batches.append(body["input"])
+            status = server.failures.pop(0) if server.failures else 200
+        if status != 200:
+            self._reply(status, {"error": {"message": "try again", "type": "server_error"}}, {"retry-after": "0"})
+            return
+        data = []
+        for i, text in enumerate(body["input"]):
+            vector = [float(len(text)), float(i)]
+            if body.get("encoding_format") == "base64":
+                vector = base64.b64encode(np.array(vector, dtype=np.float32).tobytes()).decode()
+            data.append({"object": "embedding", "index": i, "embedding": vector})
+        # Out of order on purpose: clients must sort by index.
+        self._reply(200, {
+            "object": "list",
+            "data": data[::-1],
+            "model": body["model"],
+            "usage": {"prompt_tokens": 0, "total_tokens": 0},
+        })
+
+    def _reply(self, status, payload, headers=None):
+        raw = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubEmbeddings)
+    server.lock = threading.Lock()
+    server.batches = []
+    server.failures = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_openai_embedder_batches_retries_and_keeps_order(stub_server):
+    stub_server.failures = [500, 429]
+    embedder = OpenAIEmbedder(
+        api_key="fake",
+        base_url=f"http://127.0.0.1:{stub_server.server_port}/v1",
+        batch_tokens=10,
+        batch_inputs=3,
+        concurrency=3,
+        max_retries=3,
+        backoff=0.01,
+    )
+    texts = [" ".join(["word"] * n) for n in (1, 2, 3, 9, 1, 1, 1, 1, 4)]
+
+    array = embedder.embed_array(texts)
+    assert array.dtype == np.float32
+    assert array[:, 0].tolist() == [float(len(t)) for t in texts]
+
+    counts = get_tokenizer(embedder.model).count_many(texts)
+    batches = plan_batches(counts, 10, 3)
+    assert len(batches) > 1
+    # Second column is the position within its request, reassembled in order.
+    assert array[:, 1].tolist() == [float(i - start) for start, stop in batches for i in range(start, stop)]
+    # Every batch was sent once, plus the two retried failures.
+    assert len(stub_server.batches) == len(batches) + 2
+    assert sorted(map(tuple, stub_server.batches[2:])) == sorted(tuple(texts[a:b]) for a, b in batches)
+
+
+def test_openai_embedder_gives_up_on_client_errors(stub_server):
+    stub_server.failures = [400]
+    embedder = OpenAIEmbedder(
+        api_key="fake", base_url=f"http://127.0.0.1:{stub_server.server_port}/v1", backoff=0.01,
+    )
+    with pytest.raises(RuntimeError, match="Failed to embed texts with OpenAI"):
+        embedder.embed(["a"])
+    assert len(stub_server.batches) == 1
+
+
+def test_plan_batches_respects_token_and_input_limits():
+    assert plan_batches([4, 4, 4, 20, 1, 1, 1], max_tokens=10, max_inputs=2) == [(0, 2), (2, 3), (3, 4), (4, 6), (6, 7)]
+    assert plan_batches([], 10, 2) == []
+
+
+def test_rate_limiter_waits_for_budget():
+    now = [0.0]
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=600, clock=lambda: now[0])
+    assert limiter.reserve(500) == 0.0
+    assert limiter.reserve(200) == pytest.approx(10.0)  # 100 tokens left, 10/s
+    now[0] += 10
+    assert limiter.reserve(200) == 0.0
+
+    # acquire() sleeps until the budget is back: 1 request/s, one left.
+    limiter = RateLimiter(requests_per_minute=60)
+    for _ in range(59):
+        limiter.reserve(0)
+    asyncio.run(limiter.acquire(0))
+    assert limiter.reserve(0) > 0.9
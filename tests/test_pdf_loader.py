@@ -0,0 +1,80 @@
+import time
+
+from ingestion.loaders import pdf_loader
+from ingestion.loaders.pdf_loader import extract_pdf, load_pdf
+
+
+def _make_pdf(path, pages):
+    """Write a minimal single-font PDF with one line of text per page."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # pages tree, filled in below
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (i, obj)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for off in offsets:
+        out += b"%010d 00000 n \n" % off
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(bytes(out))
+    return path
+
+
+def test_load_pdf_pages(tmp_path):
+    pdf = _make_pdf(tmp_path / "a.pdf", ["First page", "Second page"])
+    docs = load_pdf(pdf)
+    assert [d.metadata["page"] for d in docs] == [0, 1]
+    assert "Second page" in docs[1].content
+
+
+def test_page_parallel_extraction_matches_serial(tmp_path):
+    pdf = _make_pdf(tmp_path / "b.pdf", [f"Page number {i}" for i in range(12)])
+    serial = extract_pdf(pdf)
+    parallel = extract_pdf(pdf, workers=3, min_parallel_pages=1)
+
+    assert [d.content for d in parallel.documents] == [d.content for d in serial.documents]
+    assert [d.metadata for d in parallel.documents] == [d.metadata for d in serial.documents]
+    assert parallel.skipped_pages == []
+
+
+def test_slow_page_is_skipped():
+    class SlowPage:
+        def extract_text(self):
+            time.sleep(1)
+            return "too late"
+
+    class SwallowingPage:
+        # PyPDF2 wraps much of its extraction in `except Exception`.
+        def extract_text(self):
+            deadline = time.perf_counter() + 1
+            while time.perf_counter() < deadline:
+                try:
+                    time.sleep(0.01)
+                except Exception:
+                    pass
+            return "too late"
+
+    class Reader:
+        pages = [SlowPage(), SwallowingPage()]
+
+    for page_num in (0, 1):
+        started = time.perf_counter()
+        assert pdf_loader._extract_page(Reader(), page_num, page_timeout=0.05) is None
+        assert time.perf_counter() - started < 0.5
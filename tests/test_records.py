@@ -0,0 +1,56 @@
+import pytest
+
+from common import records
+from common.schemas import DocumentSchema
+
+
+RECORDS = [
+    {"content": f"chunk {i} – ünïcode", "metadata": {"source": "a.pdf", "page": i // 2, "strategy": "fixed"}, "id": None}
+    for i in range(5)
+] + [
+    {"content": "", "metadata": {"nested": {"k": [1, 2]}}, "id": "doc-1"},
+    # Equal-comparing values of different types stay distinct.
+    {"content": "x", "metadata": {"page": -1, "flag": True, "count": 1, "ratio": 1.0}, "id": None},
+    {"content": "y", "metadata": {"page": 1, "flag": 1, "count": True, "ratio": 1}, "id": None},
+]
+
+
+@pytest.mark.parametrize("fmt", ["jsonl", "egpr"])
+def test_round_trip(tmp_path, fmt):
+    path = records.records_path(tmp_path / "chunks.jsonl", fmt)
+    with records.open_writer(path, block_records=4) as writer:
+        for record in RECORDS:
+            writer.write(record)
+
+    assert records.detect_format(path) == fmt
+    assert list(records.iter_records(path)) == RECORDS
+    assert [r["content"] for r in records.iter_records(path, fields=("content",))] == [
+        r["content"] for r in RECORDS
+    ]
+    docs = list(records.iter_documents(path))
+    assert all(isinstance(d, DocumentSchema) for d in docs)
+    assert [type(v) for v in docs[-2].metadata.values()] == [int, bool, int, float]
+
+
+def test_egpr_is_smaller_than_jsonl(tmp_path):
+    rows = [
+        {"content": f"text {i}", "metadata": {"source": "/data/raw/report.pdf", "strategy": "semantic"}}
+        for i in range(500)
+    ]
+    jsonl, egpr = tmp_path / "c.jsonl", tmp_path / "c.egpr"
+    for path in (jsonl, egpr):
+        with records.open_writer(path) as writer:
+            for row in rows:
+                writer.write(row)
+    assert egpr.stat().st_size * 4 < jsonl.stat().st_size
+    assert records.convert(egpr, tmp_path / "back.jsonl") == 500
+    assert list(records.iter_records(tmp_path / "back.jsonl")) == list(records.iter_records(jsonl))
+
+
+def test_jsonl_skips_bad_lines(tmp_path):
+    path = tmp_path / "c.jsonl"
+    path.write_text('{"content": "a"}\nnot json\n\n{"content": "b"}\n', encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        list(records.iter_records(path))
+    assert [r["content"] for r in records.iter_records(path, on_error="skip")] == ["a", "b"]
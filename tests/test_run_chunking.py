@@ -0,0 +1,126 @@
+from chunking import run_chunking
+from chunking.spans import ChunkResolver, iter_spans
+from common.records import iter_records, open_writer
+from common.schemas import DocumentSchema
+from common.shards import chunks_exist, iter_chunks, shard_dir
+
+
+def _write_docs(path, count):
+    with open_writer(path) as out:
+        for i in range(count):
+            text = f"# Title {i}\n" + " ".join(f"Sentence {j} of doc {i}." for j in range(40))
+            out.write({"content": text, "metadata": {"source": f"doc_{i}.txt"}})
+
+
+def test_parallel_chunking_matches_serial(tmp_path, monkeypatch):
+    docs = tmp_path / "documents.jsonl"
+    _write_docs(docs, 7)
+    monkeypatch.setattr(run_chunking, "INPUT", docs)
+    monkeypatch.setattr(run_chunking, "CACHE_PATH", tmp_path / "cache.sqlite")
+
+    outputs = []
+    for workers in (1, 3):
+        out = tmp_path / f"chunks_{workers}.jsonl"
+        monkeypatch.setattr(run_chunking, "OUTPUT", out)
+        run_chunking.run(workers=workers)
+        outputs.append(list(iter_records(out)))
+
+    serial, parallel = outputs
+    assert serial == parallel
+    assert {r["metadata"]["chunk_type"] for r in serial} == {"fixed", "semantic", "structural"}
+    assert [r["metadata"]["source"] for r in serial] == sorted(r["metadata"]["source"] for r in serial)
+
+
+def test_chunk_documents_respects_selection(tmp_path):
+    docs = tmp_path / "documents.jsonl"
+    _write_docs(docs, 2)
+    chunks = list(run_chunking.chunk_documents(run_chunking.load_docs(docs), {"semantic": False, "structural": False}))
+    assert chunks and {c.metadata["chunk_type"] for c in chunks} == {"fixed"}
+
+
+def test_chunk_cache_evicts_least_recently_used(tmp_path):
+    from chunking.cache import ChunkCache
+
+    docs = [DocumentSchema(content=f"text {i}", metadata={"source": f"{i}.md"}) for i in range(4)]
+    chunks = [[DocumentSchema(content=d.content, metadata=d.metadata)] for d in docs]
+    cache = ChunkCache(tmp_path / "cache.sqlite", max_entries=3, commit_every=2)
+    cache.put(docs[0], "k", chunks[0])
+    assert cache.get(docs[0], "k")[0].content == "text 0"  # served before commit
+    cache.put(docs[1], "k", chunks[1])  # second put flushes
+    assert len(cache) == 2
+
+    cache.put(docs[2], "k", chunks[2])
+    cache.get(docs[0], "k")
+    cache.flush()  # "text 1" is now the least recently used
+    cache.put(docs[3], "k", chunks[3])
+    cache.close()
+
+    reopened = ChunkCache(tmp_path / "cache.sqlite", max_entries=3)
+    assert len(reopened) == 3
+    assert reopened.get(docs[1], "k") is None
+    assert all(reopened.get(docs[i], "k") is not None for i in (0, 2, 3))
+
+
+def test_chunk_cache_reuses_unchanged_strategies(tmp_path):
+    docs = tmp_path / "documents.jsonl"
+    _write_docs(docs, 3)
+    cache_path = tmp_path / "cache.sqlite"
+
+    def chunk(params):
+        engine = run_chunking.build_engine(params=params, cache_path=cache_path)
+        chunks = [c for doc in run_chunking.load_docs(docs) for c in engine.chunk(doc)]
+        return chunks, engine.cache
+
+    first, cache = chunk({})
+    assert (cache.hits, cache.misses) == (0, 9)
+
+    # Only the fixed strategy's configuration changed.
+    swept, cache = chunk({"fixed": {"max_tokens": 64}})
+    assert (cache.hits, cache.misses) == (6, 3)
+
+    again, cache = chunk({})
+    assert cache.hits == 9
+    assert again == first
+    assert [c for c in swept if c.metadata["chunk_type"] != "fixed"] == [
+        c for c in first if c.metadata["chunk_type"] != "fixed"
+    ]
+
+    # Re-ingested text keeps its cache entries but takes the new metadata.
+    doc = next(iter(run_chunking.load_docs(docs)))
+    doc.metadata["ingested_at"] = "later"
+    cache_engine = run_chunking.build_engine(cache_path=cache_path)
+    chunks = cache_engine.chunk(doc)
+    assert cache_engine.cache.hits == 3
+    assert all(c.metadata["ingested_at"] == "later" for c in chunks)
+
+
+def test_run_writes_spans(tmp_path, monkeypatch):
+    docs = tmp_path / "documents.jsonl"
+    _write_docs(docs, 3)
+    monkeypatch.setattr(run_chunking, "INPUT", docs)
+    monkeypatch.setattr(run_chunking, "OUTPUT", tmp_path / "chunks.jsonl")
+    monkeypatch.setattr(run_chunking, "SPANS_OUTPUT", tmp_path / "chunk_spans.jsonl")
+
+    run_chunking.run(use_cache=False)
+    expected = list(run_chunking.load_docs(tmp_path / "chunks.jsonl"))
+    chunks_size = (tmp_path / "chunks.jsonl").stat().st_size
+    run_chunking.run(use_cache=False, shards=True)
+    run_chunking.run(use_cache=False, spans=True)
+
+    resolver = ChunkResolver.from_path(docs)
+    resolved = list(resolver.iter_resolved(iter_spans(tmp_path / "chunk_spans.jsonl")))
+    assert [(c.content, c.metadata) for c in resolved] == [(c.content, c.metadata) for c in expected]
+    assert (tmp_path / "chunk_spans.jsonl").stat().st_size < chunks_size
+    # Earlier full-chunk outputs are removed; the shared chunk reader
+    # resolves the spans instead.
+    assert not (tmp_path / "chunks.jsonl").exists() and not shard_dir(tmp_path / "chunks.jsonl").exists()
+    assert chunks_exist(tmp_path / "chunks.jsonl")
+    records = list(iter_chunks(tmp_path / "chunks.jsonl"))
+    assert [(r["content"], r["metadata"]) for r in records] == [(c.content, c.metadata) for c in expected]
+    assert [r["content"] for r in iter_chunks(tmp_path / "chunks.jsonl", ("content",), ["fixed"])] == [
+        c.content for c in expected if c.metadata["chunk_type"] == "fixed"
+    ]
+
+    # Writing full chunks again drops the spans.
+    run_chunking.run(use_cache=False)
+    assert not (tmp_path / "chunk_spans.jsonl").exists()
@@ -1,5 +1,10 @@
+import pytest
+
+from chunking import sentences as splitters
 from chunking.semantic import SemanticChunker
+from chunking.tokenizer import TokenCounter
 from common.schemas import DocumentSchema
+from common.tokenizer import TokenizerService
 
 
 def test_semantic_chunker_basic():
@@ -22,3 +27,66 @@ def test_semantic_chunker_empty():
     chunker = SemanticChunker(max_tokens=50)
     chunks = chunker.chunk(doc)
     assert chunks == [] or (len(chunks) == 1 and chunks[0].content == "")
+
+
+def test_semantic_chunker_counts_incrementally(toy_encoding, monkeypatch):
+    sentences = [
+        "The thing is 123456 long.", "It's  done...", "  Then\nthe end!", "a", "Ingesting 12 items?",
+        "(the) other\n", "x.y \u2014 \U0001F600 ok.", "",
+    ] * 6
+    monkeypatch.setitem(splitters.SPLITTERS, "rules", lambda text: splitters.substring_spans(text, sentences))
+    chunker = SemanticChunker(max_tokens=30, sentence_splitter="rules")
+    chunker.tokenizer = TokenCounter(service=TokenizerService(encoder=toy_encoding))
+    counter = chunker.tokenizer
+
+    # The original algorithm: re-count the joined buffer for every sentence.
+    expected, buffer = [], []
+    for sentence in sentences:
+        if counter.count(" ".join(buffer + [sentence])) > 30 and buffer:
+            expected.append(" ".join(buffer))
+            buffer = [sentence]
+        else:
+            buffer.append(sentence)
+    expected.append(" ".join(buffer))
+
+    chunks = chunker.chunk(DocumentSchema(content=" ".join(sentences), metadata={}))
+    assert [c.content for c in chunks] == expected
+    assert [c.metadata["token_count"] for c in chunks] == [counter.count(t) for t in expected]
+
+
+def test_rule_splitter_handles_abbreviations_decimals_and_lists():
+    text = (
+        "Dr. Smith paid $3.50, e.g. for coffee. Then he left! Did he?\n"
+        "1. First item.\n2. Second item. J. Doe agreed (see Fig. 2). the end."
+    )
+    spans = splitters.rule_spans(text)
+    assert [text[s:e] for s, e in spans] == [
+        "Dr. Smith paid $3.50, e.g. for coffee.",
+        "Then he left!",
+        "Did he?",
+        "1. First item.",
+        "2. Second item.",
+        "J. Doe agreed (see Fig. 2). the end.",
+    ]
+
+
+def test_unknown_splitter_is_rejected():
+    with pytest.raises(ValueError):
+        SemanticChunker(sentence_splitter="spacy")
+
+
+def test_punkt_falls_back_to_rules_without_its_data(monkeypatch):
+    pytest.importorskip("nltk")
+    import nltk.tokenize
+
+    def missing(text):
+        raise LookupError("Resource punkt_tab not found.")
+
+    monkeypatch.setattr(nltk.tokenize, "sent_tokenize", missing)
+    monkeypatch.setattr(splitters, "_punkt_available", None)
+    text = "First one. Second one."
+    assert splitters.resolve_splitter("punkt") == "rules"
+    # Even if the probe passed earlier, a failing call degrades to the rules.
+    monkeypatch.setattr(splitters, "_punkt_available", True)
+    assert splitters.punkt_spans(text) == splitters.rule_spans(text)
+    assert splitters.punkt_available() is False
@@ -0,0 +1,79 @@
+import pytest
+
+from chunking import run_chunking
+from common import shards
+from common.records import iter_records, open_writer
+
+
+RECORDS = [
+    {"content": f"chunk {i} " + "text " * (i % 7), "metadata": {"source": f"d{i // 3}", "chunk_type": t}, "id": None}
+    for i in range(120)
+    for t in (("fixed", "semantic", "structural")[i % 3],)
+]
+
+
+def _by_type(records, chunk_type):
+    return [r for r in records if r["metadata"]["chunk_type"] == chunk_type]
+
+
+@pytest.mark.parametrize("fmt", ["jsonl", "egpr"])
+def test_sharded_round_trip_and_seek(tmp_path, fmt):
+    directory = tmp_path / "chunks"
+    with shards.ShardedWriter(directory, fmt, shard_bytes=200, index_every=8) as writer:
+        for record in RECORDS:
+            writer.write(record)
+
+    index = shards.ShardIndex(directory)
+    assert index.keys == ["fixed", "semantic", "structural"]
+    assert index.records() == len(RECORDS)
+    fixed = index.shards(["fixed"])
+    assert len(fixed) > 1, "small shard_bytes should roll over"
+    assert sum(s.bytes for s in index.shards()) == sum(s.path.stat().st_size for s in index.shards())
+
+    assert list(shards.iter_sharded(directory, ["fixed"])) == _by_type(RECORDS, "fixed")
+    assert list(shards.iter_sharded(directory)) == [
+        r for t in index.keys for r in _by_type(RECORDS, t)
+    ]
+
+    shard = fixed[0]
+    expected = list(shards.iter_shard(shard))
+    assert len(expected) == shard.records
+    assert list(shards.iter_shard(shard, ("content",), 9, 13)) == [{"content": r["content"]} for r in expected[9:13]]
+
+
+def test_iter_chunks_prefers_shards_and_filters_single_file(tmp_path):
+    path = tmp_path / "chunks.jsonl"
+    with open_writer(path) as writer:
+        for record in RECORDS:
+            writer.write(record)
+
+    assert list(shards.iter_chunks(path)) == RECORDS
+    assert [r["content"] for r in shards.iter_chunks(path, ("content",), ["semantic"])] == [
+        r["content"] for r in _by_type(RECORDS, "semantic")
+    ]
+
+    with shards.ShardedWriter(shards.shard_dir(path), "jsonl") as writer:
+        for record in _by_type(RECORDS, "structural"):
+            writer.write(record)
+    path.unlink()
+    assert shards.chunks_exist(path)
+    assert list(shards.iter_chunks(path)) == _by_type(RECORDS, "structural")
+
+
+def test_run_chunking_writes_shards(tmp_path, monkeypatch):
+    docs = tmp_path / "documents.jsonl"
+    with open_writer(docs) as out:
+        for i in range(4):
+            out.write({"content": f"# Doc {i}\n" + "Some sentence here. " * 50, "metadata": {"source": f"{i}.txt"}})
+    output = tmp_path / "chunks.jsonl"
+    monkeypatch.setattr(run_chunking, "INPUT", docs)
+    monkeypatch.setattr(run_chunking, "OUTPUT", output)
+
+    run_chunking.run(use_cache=False)
+    single = list(iter_records(output))
+    run_chunking.run(use_cache=False, shards=True)
+
+    assert not output.exists()
+    assert list(shards.iter_chunks(output)) == [
+        r for t in ("fixed", "semantic", "structural") for r in _by_type(single, t)
+    ]
@@ -0,0 +1,33 @@
+from chunking.fixed import FixedChunker
+from chunking.semantic import SemanticChunker
+from common.tokenizer import TokenizerService, get_tokenizer
+from monitoring.token_tracker import TokenTracker
+
+
+def test_tokenizer_is_shared_per_encoding():
+    assert get_tokenizer("gpt-4") is get_tokenizer("gpt-4o-mini")
+    assert FixedChunker().tokenizer.service is SemanticChunker().tokenizer.service
+    assert TokenTracker()._get_encoder("gpt-4") is get_tokenizer("gpt-4").encoder
+
+
+def test_count_cache_is_bounded_lru(toy_encoding):
+    service = TokenizerService(encoder=toy_encoding, cache_size=2)
+    assert service.count("the thing") == len(toy_encoding.encode("the thing"))
+    service.count("a")
+    service.count("the thing")  # hit, now most recent
+    service.count("b")  # evicts "a"
+    assert (service.hits, service.misses) == (1, 3)
+
+    service.count("a")
+    assert service.misses == 4
+    assert len(service._cache) == 2
+
+
+def test_count_many_matches_count(toy_encoding):
+    service = TokenizerService(encoder=toy_encoding)
+    texts = ["the thing", "", "12345 items", "the thing", "😀 ok"]
+    service.count("12345 items")
+
+    assert service.count_many(texts, num_threads=2) == [len(toy_encoding.encode(t)) for t in texts]
+    assert service.hits == 1
+    assert service.count_many(texts) == service.count_many(texts[::-1])[::-1]
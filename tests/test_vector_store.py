@@ -1,3 +1,6 @@
+import numpy as np
+
+from vector_store.base import as_float32_matrix
 from vector_store.faiss_store import FaissVectorStore
 from vector_store.retriever import Retriever
 
@@ -13,6 +16,18 @@ def test_faiss_store():
     assert results[0]["id"] == 1
 
 
+def test_faiss_store_accepts_arrays(tmp_path):
+    store = FaissVectorStore(dim=2, index_path=tmp_path / "faiss.index")
+    embeddings = np.eye(2, dtype=np.float32)
+    store.add(embeddings, [{"id": 1}, {"id": 2}])
+
+    assert store.search(np.array([0.0, 1.0], dtype=np.float32), k=1) == [{"id": 2}]
+    # float32 C-contiguous input goes to FAISS as-is; anything else is converted.
+    assert as_float32_matrix(embeddings) is embeddings
+    assert as_float32_matrix([1, 2]).shape == (1, 2)
+    assert as_float32_matrix(np.eye(2)).dtype == np.float32
+
+
 def test_retriever():
     retriever = Retriever(store=FaissVectorStore(dim=384))
     texts = ["Test document"]
@@ -1,8 +1,10 @@
 """Small CLI to run ingestion, chunking, graph building, checking, retrieval, generation, evaluation, monitoring, and testing tasks.
 
 Usage:
-    python -m tools.cli ingest
-    python -m tools.cli chunk
+    python -m tools.cli ingest [--workers N] [--incremental] [--pdf-workers N] [--page-timeout S]
+                             [--dedup-threshold T] [--dedup-mode drop|tag] [--no-resume]
+                             [--recursive] [--watch [--interval S]]
+    python -m tools.cli chunk [--workers N] [--no-cache]
     python -m tools.cli graph
     python -m tools.cli check
     python -m tools.cli retrieve <query>
@@ -12,6 +14,7 @@ Usage:
     python -m tools.cli test
     python -m tools.cli api
 """
+import argparse
 import sys
 from typing import Sequence
 
@@ -20,6 +23,86 @@ def _usage():
     print("Usage: python -m tools.cli [ingest|chunk|graph|check|retrieve|generate|evaluate|monitor|test] [args]")
 
 
+def _parse_ingest_args(args: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m tools.cli ingest")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="number of ingestion worker processes (default: INGEST_WORKERS)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only re-parse sources that changed since the last run",
+    )
+    parser.add_argument(
+        "--pdf-workers",
+        type=int,
+        default=None,
+        help="processes for page-parallel extraction of large PDFs (default: PDF_WORKERS)",
+    )
+    parser.add_argument(
+        "--page-timeout",
+        type=float,
+        default=None,
+        help="skip PDF pages whose extraction exceeds this many seconds (default: PDF_PAGE_TIMEOUT)",
+    )
+    parser.add_argument(
+        "--dedup-threshold",
+        type=float,
+        default=None,
+        help="near-duplicate similarity threshold, 0 to disable (default: DEDUP_THRESHOLD)",
+    )
+    parser.add_argument(
+        "--dedup-mode",
+        choices=["drop", "tag"],
+        default=None,
+        help="drop or tag near-duplicate documents (default: DEDUP_MODE)",
+    )
+    parser.add_argument(
+        "--no-resume",
+        dest="resume",
+        action="store_false",
+        help="ignore any checkpoint left by an interrupted run and start over",
+    )
+    parser.add_argument(
+        "--recursive",
+        action="store_true",
+        help="also ingest files in subdirectories of data/raw",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running and ingest new or modified files (always recursive)",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=None,
+        help="poll interval in seconds for --watch (default: INGEST_WATCH_INTERVAL)",
+    )
+    return parser.parse_args(list(args))
+
+
+def _parse_chunk_args(args: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m tools.cli chunk")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="number of chunking worker processes (default: CHUNK_WORKERS)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="cache",
+        action="store_false",
+        default=None,
+        help="recompute every chunk instead of reusing the chunk cache",
+    )
+    return parser.parse_args(list(args))
+
+
 def main(argv: Sequence[str] | None = None) -> int:
     argv = list(argv or sys.argv[1:])
     if not argv:
@@ -29,14 +112,38 @@ def main(argv: Sequence[str] | None = None) -> int:
     cmd = argv[0]
 
     if cmd == "ingest":
+        opts = _parse_ingest_args(argv[1:])
+        if opts.watch:
+            from ingestion.watcher import watch
+
+            watch(
+                interval=opts.interval,
+                workers=opts.workers,
+                page_timeout=opts.page_timeout,
+                pdf_workers=opts.pdf_workers,
+                dedup_threshold=opts.dedup_threshold,
+                dedup_mode=opts.dedup_mode,
+            )
+            return 0
+
         from ingestion.run_ingestion import ingest
 
-        ingest()
+        ingest(
+            workers=opts.workers,
+            incremental=opts.incremental,
+            pdf_workers=opts.pdf_workers,
+            page_timeout=opts.page_timeout,
+            dedup_threshold=opts.dedup_threshold,
+            dedup_mode=opts.dedup_mode,
+            resume=opts.resume,
+            recursive=opts.recursive,
+        )
         return 0
     elif cmd == "chunk":
+        opts = _parse_chunk_args(argv[1:])
         from chunking.run_chunking import run
 
-        run()
+        run(workers=opts.workers, use_cache=opts.cache)
         return 0
     elif cmd == "graph":
         from scripts.build_graph import main as build_graph
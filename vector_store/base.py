@@ -1,5 +1,24 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Sequence, Union
+
+import numpy as np
+
+
+# A 2-D float32 array (as from `BaseEmbedder.embed_array`) or nested lists.
+Embeddings = Union[np.ndarray, Sequence[Sequence[float]]]
+Embedding = Union[np.ndarray, Sequence[float]]
+
+
+def as_float32_matrix(embeddings: Embeddings) -> np.ndarray:
+    """`embeddings` as a C-contiguous float32 ``(n, dim)`` array.
+
+    Arrays that already are one are returned as-is, without a copy; a
+    single 1-D vector becomes one row.
+    """
+    vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors.reshape(1, -1)
+    return vectors
 
 
 class BaseVectorStore(ABC):
@@ -10,21 +29,21 @@ class BaseVectorStore(ABC):
     """
 
     @abstractmethod
-    def add(self, embeddings: List[List[float]], metadatas: List[Dict[str, Any]]) -> None:
+    def add(self, embeddings: Embeddings, metadatas: List[Dict[str, Any]]) -> None:
         """Add embeddings with associated metadata to the store.
 
         Args:
-            embeddings: List of embedding vectors.
+            embeddings: ``(n, dim)`` float32 array or list of embedding vectors.
             metadatas: List of metadata dictionaries, one per embedding.
         """
         raise NotImplementedError
 
     @abstractmethod
-    def search(self, query_embedding: List[float], k: int) -> List[Dict[str, Any]]:
+    def search(self, query_embedding: Embedding, k: int) -> List[Dict[str, Any]]:
         """Search for the k most similar embeddings.
 
         Args:
-            query_embedding: The query vector.
+            query_embedding: The query vector (array or list).
             k: Number of results to return.
 
         Returns:
@@ -2,9 +2,8 @@ from typing import List, Dict, Any, Optional
 from pathlib import Path
 
 import faiss
-import numpy as np
 
-from vector_store.base import BaseVectorStore
+from vector_store.base import BaseVectorStore, Embedding, Embeddings, as_float32_matrix
 from common.config import settings
 
 
@@ -28,16 +27,14 @@ class FaissVectorStore(BaseVectorStore):
             with open(self.metadata_path, 'r') as f:
                 self.metadatas = json.load(f)
 
-    def add(self, embeddings: List[List[float]], metadatas: List[Dict[str, Any]]) -> None:
+    def add(self, embeddings: Embeddings, metadatas: List[Dict[str, Any]]) -> None:
         if len(embeddings) != len(metadatas):
             raise ValueError("Number of embeddings must match number of metadatas")
-        vectors = np.array(embeddings).astype("float32")
-        self.index.add(vectors)
+        self.index.add(as_float32_matrix(embeddings))
         self.metadatas.extend(metadatas)
 
-    def search(self, query_embedding: List[float], k: int) -> List[Dict[str, Any]]:
-        query = np.array([query_embedding]).astype("float32")
-        distances, indices = self.index.search(query, k)
+    def search(self, query_embedding: Embedding, k: int) -> List[Dict[str, Any]]:
+        distances, indices = self.index.search(as_float32_matrix(query_embedding), k)
 
         results = []
         for idx in indices[0]:
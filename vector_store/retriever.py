@@ -15,10 +15,10 @@ class Retriever:
 
     def index(self, texts: List[str], metadatas: List[Dict[str, Any]]) -> None:
         """Index texts by embedding them and adding to the store."""
-        embeddings = self.embedder.embed(texts)
+        embeddings = self.embedder.embed_array(texts)
         self.store.add(embeddings, metadatas)
 
     def query(self, query_text: str, k: int = 5) -> List[Dict[str, Any]]:
         """Query the store with text and return top-k metadata."""
-        query_embedding = self.embedder.embed([query_text])[0]
+        query_embedding = self.embedder.embed_array([query_text])[0]
         return self.store.search(query_embedding, k)